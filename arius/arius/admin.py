@@ -1,7 +1,18 @@
 """Admin classes"""
 
+import contextvars
+import csv
+import io
+import math
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
 from import_export.resources import ModelResource
 
+# Optional callback which receives the number of rows exported so far (e.g. for background export jobs)
+export_progress_callback = contextvars.ContextVar('export_progress_callback', default=None)
+
 
 class AriusResource(ModelResource):
     """Custom subclass of the ModelResource class provided by django-import-export"
@@ -31,3 +42,181 @@ class AriusResource(ModelResource):
                 row[idx] = val
 
         return row
+
+    def iter_export_rows(self, queryset):
+        """Export each object in the queryset, yielding one row at a time.
+
+        - The queryset is iterated in chunks (see Resource.iter_queryset)
+        - Progress is reported via the export_progress_callback context variable (if set)
+        """
+
+        callback = export_progress_callback.get()
+        chunk_size = self.get_chunk_size()
+
+        count = 0
+
+        for obj in self.iter_queryset(queryset):
+            yield self.export_resource(obj)
+
+            count += 1
+
+            if callback and count % chunk_size == 0:
+                callback(count)
+
+        if callback:
+            callback(count)
+
+    def export_stream(self, queryset, export_format: str, *args, **kwargs):
+        """Export the queryset as a stream of file data, rather than constructing a complete dataset in memory.
+
+        Arguments:
+            queryset: The queryset to export
+            export_format: File format (csv / tsv / xlsx). Other formats fall back to a standard dataset export.
+
+        Note that after_export is called with data=None, as the exported rows are not retained.
+
+        Yields:
+            bytes: Chunks of the exported file
+        """
+
+        export_format = str(export_format).lower()
+
+        if export_format not in ['csv', 'tsv', 'xlsx']:
+            # No streaming support for this format
+            yield self.export(queryset, *args, **kwargs).export(export_format)
+            return
+
+        self.before_export(queryset, *args, **kwargs)
+
+        headers = self.get_export_headers()
+        rows = self.iter_export_rows(queryset)
+
+        if export_format == 'xlsx':
+            yield from self.stream_xlsx(headers, rows)
+        else:
+            yield from self.stream_csv(headers, rows, delimiter='\t' if export_format == 'tsv' else ',')
+
+        self.after_export(queryset, None, *args, **kwargs)
+
+    def stream_csv(self, headers, rows, delimiter=','):
+        """Write rows in CSV format, yielding encoded data for each chunk of rows"""
+
+        chunk_size = self.get_chunk_size()
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=delimiter)
+
+        writer.writerow(headers)
+
+        for idx, row in enumerate(rows):
+            writer.writerow(row)
+
+            if idx % chunk_size == 0:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate(0)
+
+        yield buffer.getvalue().encode('utf-8')
+
+    def stream_xlsx(self, headers, rows):
+        """Write rows in XLSX format, yielding data for each chunk of rows.
+
+        The workbook structure (styles, relationships, etc) is generated by openpyxl for an empty worksheet.
+        The worksheet rows are then written directly into a streamed (deflated) zip file,
+        so that data are sent to the client while the export is in progress.
+        """
+
+        from openpyxl import Workbook
+
+        chunk_size = self.get_chunk_size()
+
+        template = io.BytesIO()
+        workbook = Workbook(write_only=True)
+        workbook.create_sheet()
+        workbook.save(template)
+
+        buffer = ExportBuffer()
+
+        with zipfile.ZipFile(template) as source, zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as output:
+            for filename in source.namelist():
+                data = source.read(filename)
+
+                if filename != XLSX_SHEET_FILE:
+                    output.writestr(filename, data)
+                    continue
+
+                prefix, suffix = data.decode('utf-8').split('<sheetData />', 1)
+
+                with output.open(filename, 'w', force_zip64=True) as sheet:
+                    sheet.write(f'{prefix}<sheetData>'.encode('utf-8'))
+                    sheet.write(xlsx_row(1, headers))
+
+                    for idx, row in enumerate(rows):
+                        sheet.write(xlsx_row(idx + 2, row))
+
+                        if idx % chunk_size == 0:
+                            yield buffer.pop()
+
+                    sheet.write(f'</sheetData>{suffix}'.encode('utf-8'))
+
+                yield buffer.pop()
+
+        yield buffer.pop()
+
+
+# Worksheet file within a single-sheet XLSX workbook
+XLSX_SHEET_FILE = 'xl/worksheets/sheet1.xml'
+
+# Control characters which cannot be written to an XLSX worksheet (as per openpyxl)
+XLSX_ILLEGAL_CHARACTERS = re.compile(r'[\000-\010]|[\013-\014]|[\016-\037]')
+
+
+class ExportBuffer:
+    """Write-only file object which collects written data, so that it can be streamed"""
+
+    def __init__(self):
+        """Initialize the buffer"""
+        self.chunks = []
+
+    def write(self, data):
+        """Store the provided data"""
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        """Data are held until pop() is called"""
+
+    def pop(self) -> bytes:
+        """Return (and discard) all data written since the last call"""
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def xlsx_cell(ref, value) -> str:
+    """Return the worksheet XML for a single cell.
+
+    - Numeric and boolean values are written as numbers
+    - Empty (None) values are written as empty strings, so that every row has the same number of cells
+    - All other values are written as (inline) strings
+    """
+
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+
+    if isinstance(value, (int, float)) and math.isfinite(value):
+        return f'<c r="{ref}"><v>{value!r}</v></c>'
+
+    value = XLSX_ILLEGAL_CHARACTERS.sub('', '' if value is None else str(value))
+
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{escape(value)}</t></is></c>'
+
+
+def xlsx_row(idx, values) -> bytes:
+    """Return the (encoded) worksheet XML for a single row"""
+
+    from openpyxl.utils import get_column_letter
+
+    cells = ''.join(xlsx_cell(f'{get_column_letter(col + 1)}{idx}', value) for col, value in enumerate(values))
+
+    return f'<row r="{idx}">{cells}</row>'.encode('utf-8')
@@ -1,18 +1,23 @@
 """Main JSON interface views."""
 
+from urllib.parse import urlparse
+
 from django.conf import settings
 from django.db import transaction
-from django.http import JsonResponse
+from django.http import HttpRequest, JsonResponse, QueryDict
+from django.utils.module_loading import import_string
 from django.utils.translation import gettext_lazy as _
 
 from django_q.models import OrmQ
-from rest_framework import permissions
+from rest_framework import permissions, status
+from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
 from rest_framework.views import APIView
 
 import users.models
 from arius.filters import SEARCH_ORDER_FILTER
+from arius.helpers import str2bool
 from arius.mixins import ListCreateAPI
 from arius.permissions import RolePermission
 from part.templatetags.arius_extras import plugins_info
@@ -20,11 +25,72 @@ from plugin.serializers import MetadataSerializer
 
 from .mixins import RetrieveUpdateAPI
 from .status import is_worker_running
+from .tasks import offload_task
 from .version import (ariusApiVersion, ariusInstanceName,
                       ariusVersion)
 from .views import AjaxView
 
 
+class BackgroundRequest(HttpRequest):
+    """HttpRequest which is constructed by the background worker, to replay a request made against the API.
+
+    The scheme and host of the original request are preserved,
+    so that any absolute URLs are generated correctly.
+    """
+
+    def __init__(self, base_url=None):
+        """Initialize the request, using the provided base URL (e.g. 'https://arius.example.com/')"""
+        super().__init__()
+
+        self.method = 'GET'
+        self.base_scheme = 'http'
+
+        if base_url:
+            url = urlparse(base_url)
+
+            self.base_scheme = url.scheme or 'http'
+            self.META['HTTP_HOST'] = url.netloc
+
+    def _get_scheme(self):
+        """Return the scheme of the original request"""
+        return self.base_scheme
+
+
+def construct_api_view(endpoint: str, user, params: dict = None, kwargs: dict = None, base_url: str = None):
+    """Construct an instance of the provided API view, for processing a request via the background worker.
+
+    Arguments:
+        endpoint: Import path of the API view class
+        user: The user who made the original request
+        params: Query parameters of the original request (each key maps to a list of values)
+        kwargs: URL keyword arguments of the original request
+        base_url: Base URL of the original request
+
+    Returns:
+        An API view instance, with the 'request' attribute set
+    """
+
+    query = QueryDict(mutable=True)
+
+    for key, values in (params or {}).items():
+        query.setlist(key, values)
+
+    http_request = BackgroundRequest(base_url=base_url)
+    http_request.GET = query
+    http_request.user = user
+
+    request = Request(http_request)
+    request.user = user
+
+    view = import_string(endpoint)()
+    view.request = request
+    view.args = []
+    view.kwargs = kwargs or {}
+    view.format_kwarg = None
+
+    return view
+
+
 class InfoView(AjaxView):
     """Simple JSON endpoint for arius information.
 
@@ -174,13 +240,27 @@ class APIDownloadMixin:
         )
 
         return DownloadFile(filedata, filename)
+
+    For large querysets, the data can instead be streamed to the client
+    (without constructing the entire dataset in memory):
+
+    def download_queryset(self, queryset, export_format):
+        stream = StockItemResource().export_stream(queryset, export_format)
+        return DownloadFileStream(stream, filename)
     """
 
     def get(self, request, *args, **kwargs):
-        """Generic handler for a download request."""
+        """Generic handler for a download request.
+
+        If the ?background=true parameter is also provided, the data are exported by the background worker.
+        """
         export_format = request.query_params.get('export', None)
 
         if export_format and export_format in ['csv', 'tsv', 'xls', 'xlsx']:
+
+            if str2bool(request.query_params.get('background', False)):
+                return self.schedule_download(request, export_format)
+
             queryset = self.filter_queryset(self.get_queryset())
             return self.download_queryset(queryset, export_format)
 
@@ -192,6 +272,37 @@ class APIDownloadMixin:
         """This function must be implemented to provide a downloadFile request."""
         raise NotImplementedError("download_queryset method not implemented!")
 
+    def schedule_download(self, request, export_format):
+        """Create a DataExportJob, which exports the data via the background worker.
+
+        Returns:
+            Response containing the details of the new export job (which can be polled for progress)
+        """
+
+        import common.models
+        import common.serializers
+
+        params = request.query_params.copy()
+
+        for key in ['export', 'background']:
+            params.pop(key, None)
+
+        job = common.models.DataExportJob.objects.create(
+            user=request.user,
+            endpoint=f"{self.__class__.__module__}.{self.__class__.__name__}",
+            params={key: params.getlist(key) for key in params.keys()},
+            kwargs=self.kwargs,
+            export_format=export_format,
+        )
+
+        offload_task('common.tasks.run_data_export', job.pk)
+
+        job.refresh_from_db()
+
+        serializer = common.serializers.DataExportJobSerializer(job, context={'request': request})
+
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
 
 class AttachmentMixin:
     """Mixin for creating attachment objects, and ensuring the user information is saved correctly."""
@@ -2,11 +2,30 @@
 
 
 # arius API version
-ARIUS_API_VERSION = 0
+ARIUS_API_VERSION = 6
 
 """
 Increment this API version number whenever there is a significant change to the API that any clients need to know about
 
+v6 -> 2026-10-17
+    - Adds 'strategy' field to the build order auto-allocation endpoint (api/build/<pk>/auto-allocate/)
 
+v5 -> 2026-10-17
+    - Adds API endpoint for scanning multiple barcodes in a single request (api/barcode/batch/)
+
+v4 -> 2026-10-17
+    - Adds 'background' option for report printing endpoints (?background=true)
+    - Adds 'attach' option for report printing endpoints, to attach the generated report to each printed item
+    - Adds API endpoints for background report jobs (api/report/job/)
+
+v3 -> 2026-10-17
+    - Adds 'background' option for data export on list endpoints (?export=csv&background=true)
+    - Adds API endpoints for background data export jobs (api/data-export/)
+
+v2 -> 2026-10-17
+    - Adds API endpoint for a flattened, multi-level BOM (api/part/<pk>/bom-explode/)
+
+v1 -> 2026-10-17
+    - Adds optional 'can_build' field to the Part API (enabled with the 'can_build' query parameter)
 
 """
@@ -9,6 +9,7 @@ from django.db.utils import OperationalError
 import certifi
 from djmoney.contrib.exchange.backends.base import SimpleExchangeBackend
 
+from common.currency import invalidate_rates
 from common.settings import currency_code_default, currency_codes
 
 
@@ -58,6 +59,9 @@ class AriusExchange(SimpleExchangeBackend):
 
         try:
             super().update_rates(base=base_currency, symbols=symbols)
+
+            # Rates are bulk-created, so the rate snapshot must be explicitly invalidated
+            invalidate_rates()
         # catch connection errors
         except URLError:
             print('Encountered connection error while updating')
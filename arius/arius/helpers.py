@@ -404,6 +404,27 @@ def DownloadFile(data, filename, content_type='application/text', inline=False)
     return response
 
 
+def DownloadFileStream(stream, filename, content_type='application/text') -> StreamingHttpResponse:
+    """Create a file download from a stream of data, which is sent to the client as it is generated.
+
+    As the total size is not known in advance, no Content-Length header is provided.
+
+    Args:
+        stream: Iterator which yields chunks of file data (string or bytes)
+        filename: Filename for the file download
+        content_type: Content type for the download
+
+    Return:
+        A StreamingHttpResponse object wrapping the supplied data stream
+    """
+    filename = WrapWithQuotes(filename)
+
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+
+    return response
+
+
 def increment_serial_number(serial: str):
     """Given a serial number, (attempt to) generate the *next* serial number.
 
@@ -482,6 +503,9 @@ def extract_serial_numbers(input_string, expected_quantity: int, starting_value=
     serials = []
     errors = []
 
+    # Set of extracted serial numbers, for fast duplicate checks
+    seen = set()
+
     def add_error(error: str):
         """Helper function for adding an error message"""
         if error not in errors:
@@ -496,10 +520,11 @@ def extract_serial_numbers(input_string, expected_quantity: int, starting_value=
         if len(serial) == 0:
             return
 
-        if serial in serials:
+        if serial in seen:
             add_error(_("Duplicate serial") + f": {serial}")
         else:
             serials.append(serial)
+            seen.add(serial)
 
     # If the user has supplied the correct number of serials, do not split into groups
     if len(groups) == expected_quantity:
@@ -534,13 +559,15 @@ def extract_serial_numbers(input_string, expected_quantity: int, starting_value=
                     continue
 
                 group_items = []
+                group_seen = set()
 
                 count = 0
 
                 a_next = a
 
-                while a_next is not None and a_next not in group_items:
+                while a_next is not None and a_next not in group_seen:
                     group_items.append(a_next)
+                    group_seen.add(a_next)
                     count += 1
 
                     # Progress to the 'next' sequential value
@@ -579,6 +606,7 @@ def extract_serial_numbers(input_string, expected_quantity: int, starting_value=
             items = group.split('+')
 
             sequence_items = []
+            sequence_seen = set()
             counter = 0
             sequence_count = max(0, expected_quantity - len(serials))
 
@@ -596,8 +624,9 @@ def extract_serial_numbers(input_string, expected_quantity: int, starting_value=
             value = items[0]
 
             # Keep incrementing up to the specified quantity
-            while value is not None and value not in sequence_items and counter < sequence_count:
+            while value is not None and value not in sequence_seen and counter < sequence_count:
                 sequence_items.append(value)
+                sequence_seen.add(value)
                 value = increment_serial_number(value)
                 counter += 1
 
@@ -11,10 +11,10 @@ from django.utils.translation import gettext_lazy as _
 
 import moneyed.localization
 import requests
-from djmoney.contrib.exchange.models import convert_money
 from djmoney.money import Money
 from PIL import Image
 
+import common.currency
 import common.models
 import arius
 import arius.helpers_model
@@ -199,7 +199,7 @@ def render_currency(money, decimal_places=None, currency=None, include_symbol=Tr
         # Attempt to convert to the provided currency
         # If cannot be done, leave the original
         try:
-            money = convert_money(money, currency)
+            money = common.currency.convert_money(money, currency)
         except Exception:
             pass
 
@@ -243,11 +243,9 @@ def getModelsWithMixin(mixin_class) -> list:
         List of models that inherit from the given mixin class
     """
 
-    from django.contrib.contenttypes.models import ContentType
+    from django.apps import apps
 
-    db_models = [x.model_class() for x in ContentType.objects.all() if x is not None]
-
-    return [x for x in db_models if x is not None and issubclass(x, mixin_class)]
+    return [x for x in apps.get_models() if issubclass(x, mixin_class)]
 
 
 def notify_responsible(instance, sender, content: NotificationBody = AriusNotificationBodies.NewOrder, exclude=None):
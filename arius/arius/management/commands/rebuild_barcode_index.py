@@ -0,0 +1,20 @@
+"""Custom management command to rebuild the barcode index table.
+
+- Required if barcode data have been imported directly into the database
+"""
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Rebuild the index of assigned barcodes for all barcode-enabled models."""
+
+    def handle(self, *args, **kwargs):
+        """Rebuild the index of assigned barcodes for all barcode-enabled models."""
+        from common.models import BarcodeIndex
+
+        print("Rebuilding barcode index")
+
+        n = BarcodeIndex.rebuild()
+
+        print(f"Indexed {n} barcodes")
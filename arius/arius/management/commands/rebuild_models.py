@@ -26,6 +26,7 @@ class Command(BaseCommand):
 
             from part.models import PartCategory
             PartCategory.objects.rebuild()
+            PartCategory.rebuild_pathstrings()
         except Exception:
             print("Error rebuilding PartCategory objects")
 
@@ -44,6 +45,7 @@ class Command(BaseCommand):
 
             from stock.models import StockLocation
             StockLocation.objects.rebuild()
+            StockLocation.rebuild_pathstrings()
         except Exception:
             print("Error rebuilding StockLocation objects")
 
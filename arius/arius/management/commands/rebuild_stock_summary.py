@@ -0,0 +1,24 @@
+"""Custom management command to rebuild the part stock summary table.
+
+- Required after enabling the PART_STOCK_SUMMARY setting, or after importing data
+"""
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Rebuild cached stock quantity information for all parts."""
+
+    def add_arguments(self, parser):
+        """Add the arguments."""
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of parts to process in each query')
+
+    def handle(self, *args, **kwargs):
+        """Rebuild cached stock quantity information for all parts."""
+        from part.models import PartStockSummary
+
+        print("Rebuilding part stock summary")
+
+        n = PartStockSummary.rebuild(chunk_size=kwargs.get('chunk_size', 1000))
+
+        print(f"Rebuilt stock summary for {n} parts")
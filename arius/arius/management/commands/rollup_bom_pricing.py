@@ -0,0 +1,34 @@
+"""Custom management command to recalculate BOM pricing for all parts.
+
+- Calculates BOM and variant pricing in a single pass over the entire BOM structure
+- Much faster than scheduling a pricing update for each individual assembly
+"""
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Recalculate BOM pricing for all parts."""
+
+    def add_arguments(self, parser):
+        """Add the arguments."""
+        parser.add_argument('--background', action='store_true', help='Offload the calculation to the background worker')
+
+    def handle(self, *args, **kwargs):
+        """Recalculate BOM pricing for all parts."""
+
+        if kwargs.get('background', False):
+            from arius.tasks import offload_task
+
+            offload_task('part.tasks.rollup_bom_pricing', force_async=True)
+
+            print("Scheduled BOM pricing calculation")
+            return
+
+        from part.bom import rollup_bom_pricing
+
+        print("Recalculating BOM pricing")
+
+        n = rollup_bom_pricing()
+
+        print(f"Updated BOM pricing for {n} parts")
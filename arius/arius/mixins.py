@@ -173,6 +173,10 @@ class CustomRetrieveUpdateDestroyAPI(CleanMixin, CustomRetrieveUpdateDestroyAPIV
     """This APIView was created pass the kwargs from the API to the models."""
 
 
+class RetrieveDestroyAPI(generics.RetrieveDestroyAPIView):
+    """View for retrieve and destroy API."""
+
+
 class RetrieveUpdateDestroyAPI(CleanMixin, generics.RetrieveUpdateDestroyAPIView):
     """View for retrieve, update and destroy API."""
 
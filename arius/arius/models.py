@@ -11,8 +11,8 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models.signals import post_save, pre_delete
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -639,8 +639,85 @@ class AriusTree(MPTTModel):
             super().save(*args, **kwargs)
 
             # Ensure that the pathstring changes are propagated down the tree also
-            for child in self.get_children():
-                child.save(*args, **kwargs)
+            self.update_pathstrings()
+
+    def update_pathstrings(self):
+        """Recalculate the 'pathstring' field for all nodes below this one in the tree.
+
+        - The subtree is loaded one level at a time (a single query per level), using the 'parent' field
+          (the MPTT lft / rght fields may be stale, e.g. while a subtree is being moved)
+        - Nodes where the pathstring has changed are updated with bulk database operations
+        - The nodes are not saved individually (no save signals are sent),
+          instead a single 'saved' event is triggered for all of the updated nodes
+
+        Returns:
+            int: The number of nodes which were updated
+        """
+
+        from plugin.base.event.events import allow_table_event
+        from plugin.events import trigger_events
+
+        model = self.__class__
+
+        # Names of each node in the subtree, from the top level down
+        paths = {
+            self.pk: [item.name for item in self.path],
+        }
+
+        updated = []
+
+        level = [self.pk]
+
+        while level:
+            parents, level = level, []
+
+            for idx in range(0, len(parents), 500):
+                nodes = model.objects.filter(parent__in=parents[idx:idx + 500]).values_list('pk', 'parent', 'name', 'pathstring')
+
+                for pk, parent, name, pathstring in nodes:
+                    if pk in paths:
+                        # Guard against any loops in the tree
+                        continue
+
+                    # The parent of each node was loaded in the previous level
+                    paths[pk] = paths[parent] + [name]
+                    level.append(pk)
+
+                    new_pathstring = arius.helpers.constructPathString(paths[pk])
+
+                    if new_pathstring != pathstring:
+                        updated.append(model(pk=pk, pathstring=new_pathstring))
+
+        model.objects.bulk_update(updated, ['pathstring'], batch_size=500)
+
+        table = model._meta.db_table
+
+        if updated and allow_table_event(table):
+            ids = [node.pk for node in updated]
+            transaction.on_commit(lambda: trigger_events([(f'{table}.saved', {'ids': ids, 'model': model.__name__})]))
+
+        return len(updated)
+
+    @classmethod
+    def rebuild_pathstrings(cls):
+        """Recalculate the 'pathstring' field for every node of every tree.
+
+        Returns:
+            int: The number of nodes which were updated
+        """
+
+        updated = 0
+
+        for root in cls.objects.filter(parent=None):
+            pathstring = arius.helpers.constructPathString([root.name])
+
+            if pathstring != root.pathstring:
+                cls.objects.filter(pk=root.pk).update(pathstring=pathstring)
+                updated += 1
+
+            updated += root.update_pathstrings()
+
+        return updated
 
     name = models.CharField(
         blank=False,
@@ -780,6 +857,9 @@ class AriusBarcodeMixin(models.Model):
 
     - barcode_data : Raw data associated with an assigned barcode
     - barcode_hash : A 'hash' of the assigned barcode data used to improve matching
+
+    Assigned barcodes are also recorded in the common.BarcodeIndex table,
+    which is updated whenever the barcode_hash of an instance is changed.
     """
 
     class Meta:
@@ -789,6 +869,27 @@ class AriusBarcodeMixin(models.Model):
         """
         abstract = True
 
+    # Value of the barcode_hash field when this instance was loaded from the database
+    _barcode_hash_db = ''
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Record the barcode hash value when an instance is loaded from the database."""
+
+        instance = super().from_db(db, field_names, values)
+
+        # If the barcode_hash field is deferred, the original value is unknown
+        instance._barcode_hash_db = instance.__dict__.get('barcode_hash', None)
+
+        return instance
+
+    def update_barcode_index(self):
+        """Update the barcode index entry for this instance."""
+
+        from common.models import BarcodeIndex
+
+        BarcodeIndex.update_instance(self)
+
     barcode_data = models.CharField(
         blank=True, max_length=500,
         verbose_name=_('Barcode Data'),
@@ -866,6 +967,33 @@ class AriusBarcodeMixin(models.Model):
         self.save()
 
 
+@receiver(post_save, dispatch_uid='barcode_post_save_index')
+def after_save_barcode_item(sender, instance, created=False, **kwargs):
+    """Update the barcode index if the assigned barcode of an object has changed."""
+
+    if not isinstance(instance, AriusBarcodeMixin):
+        return
+
+    barcode_hash = instance.__dict__.get('barcode_hash', None)
+
+    # A newly created object (e.g. a copy of an existing object) has no index entry
+    previous = '' if created else instance._barcode_hash_db
+
+    if barcode_hash is not None and barcode_hash != previous:
+        instance.update_barcode_index()
+        instance._barcode_hash_db = barcode_hash
+
+
+@receiver(post_delete, dispatch_uid='barcode_post_delete_index')
+def after_delete_barcode_item(sender, instance, **kwargs):
+    """Remove the barcode index entry for a deleted object with an assigned barcode."""
+
+    if isinstance(instance, AriusBarcodeMixin) and instance.__dict__.get('barcode_hash', None):
+        from common.models import BarcodeIndex
+
+        BarcodeIndex.remove_instance(instance)
+
+
 @receiver(pre_delete, sender=AriusTree, dispatch_uid='tree_pre_delete_log')
 def before_delete_tree_item(sender, instance, using, **kwargs):
     """Receives pre_delete signal from AriusTree object.
@@ -1,11 +1,240 @@
-"""Custom template loader for arius"""
+"""Custom template loader for arius.
 
+Also provides process-local caches for report and label generation:
+
+- Compiled report / label templates are cached against a hash of the template file contents
+- Asset files (images, fonts, stylesheets) are cached for use by the WeasyPrint URL fetcher
+
+The shared PDF template response class (used for rendering both reports and labels) is also defined here.
+"""
+
+import hashlib
+import logging
+import mimetypes
 import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import unquote, urlparse
 
 from django.conf import settings
+from django.template import Template
 from django.template.loaders.base import Loader as BaseLoader
 from django.template.loaders.cached import Loader as CachedLoader
 
+try:
+    from django_weasyprint.views import WeasyTemplateResponse
+except OSError as err:  # pragma: no cover
+    print("OSError: {e}".format(e=err))
+    print("You may require some further system packages to be installed.")
+    sys.exit(1)
+
+logger = logging.getLogger('arius')
+
+# Maximum number of compiled report / label templates to keep in memory
+TEMPLATE_CACHE_ENTRIES = 100
+
+# Maximum total size (bytes) of asset files to keep in memory
+ASSET_CACHE_SIZE = 32 * 1024 * 1024
+
+# Asset files larger than this (bytes) are not cached
+ASSET_CACHE_MAX_FILE_SIZE = 4 * 1024 * 1024
+
+
+class FileCache:
+    """Thread-safe LRU cache for data derived from files on disk.
+
+    Each entry is stored along with the 'signature' (modification time and size) of the source file,
+    and entries are ignored if the file has changed since they were cached.
+
+    Attributes:
+        name: Name of this cache (used for reporting statistics)
+        max_entries: Maximum number of entries to keep (optional)
+        max_size: Maximum total size of all entries (optional)
+        hits: Number of cache hits
+        misses: Number of cache misses
+    """
+
+    def __init__(self, name, max_entries=None, max_size=None):
+        """Initialize the cache."""
+        self.name = name
+        self.max_entries = max_entries
+        self.max_size = max_size
+
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, signature=None):
+        """Return the cached value for the provided key (or None if not available)."""
+
+        with self.lock:
+            entry = self.entries.get(key, None)
+
+            if entry is None or entry[0] != signature:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def set(self, key, value, signature=None, size=0):
+        """Store a value in the cache, evicting the least recently used entries as required."""
+
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[2]
+
+            self.entries[key] = (signature, value, size)
+            self.size += size
+
+            while self.entries and (
+                (self.max_entries and len(self.entries) > self.max_entries) or (self.max_size and self.size > self.max_size)
+            ):
+                self.size -= self.entries.popitem(last=False)[1][2]
+
+    def clear(self):
+        """Remove all entries from the cache, and reset the hit / miss counters."""
+
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Return usage statistics for this cache."""
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.entries),
+            'size': self.size,
+        }
+
+
+# Compiled report and label templates, keyed by (path, content hash)
+template_cache = FileCache('templates', max_entries=TEMPLATE_CACHE_ENTRIES)
+
+# Content hash for each template file, keyed by path
+template_hashes = FileCache('template_hashes', max_entries=TEMPLATE_CACHE_ENTRIES)
+
+# Asset file data (images, fonts, stylesheets), keyed by path
+asset_cache = FileCache('assets', max_size=ASSET_CACHE_SIZE)
+
+
+def get_cache_stats() -> dict:
+    """Return hit / miss statistics for the template and asset caches (for the current process)."""
+
+    return {
+        'templates': template_cache.stats(),
+        'assets': asset_cache.stats(),
+    }
+
+
+def clear_caches():
+    """Clear the template and asset caches (for the current process)."""
+
+    for c in [template_cache, template_hashes, asset_cache]:
+        c.clear()
+
+
+def file_signature(path):
+    """Return a signature for the provided file, which changes whenever the file is modified.
+
+    Returns:
+        tuple: (modification time, size) or None if the file does not exist
+    """
+
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+    return (st.st_mtime_ns, st.st_size)
+
+
+def get_asset_roots():
+    """Return the directories from which asset files may be cached."""
+
+    return [
+        Path(settings.MEDIA_ROOT).resolve(),
+        Path(settings.STATIC_ROOT).resolve(),
+    ]
+
+
+def get_asset(path):
+    """Return the contents of the provided asset file, using the shared asset cache.
+
+    Only files located in the media or static directories are cached.
+
+    Returns:
+        bytes: File contents, or None if the file cannot be cached
+    """
+
+    try:
+        path = Path(path).resolve()
+    except (OSError, ValueError):
+        return None
+
+    if not any(path.is_relative_to(root) for root in get_asset_roots()):
+        return None
+
+    signature = file_signature(path)
+
+    if signature is None or not path.is_file() or signature[1] > ASSET_CACHE_MAX_FILE_SIZE:
+        return None
+
+    key = str(path)
+
+    if (data := asset_cache.get(key, signature)) is not None:
+        return data
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    asset_cache.set(key, data, signature=signature, size=len(data))
+
+    return data
+
+
+def url_fetcher(url, *args, **kwargs):
+    """URL fetcher for WeasyPrint, which serves local asset files from the shared asset cache.
+
+    Any URL which cannot be served from the cache is passed through to the django-weasyprint URL fetcher.
+    """
+
+    if url.startswith('file:'):
+        path = unquote(urlparse(url).path)
+
+        if (data := get_asset(path)) is not None:
+            mime_type, encoding = mimetypes.guess_type(url)
+
+            return {
+                'string': data,
+                'mime_type': mime_type,
+                'encoding': encoding,
+                'filename': Path(path).name,
+                'redirected_url': url,
+            }
+
+    from django_weasyprint.utils import django_url_fetcher
+
+    return django_url_fetcher(url, *args, **kwargs)
+
+
+class AriusWeasyTemplateResponse(WeasyTemplateResponse):
+    """PDF template response which loads asset files via the shared asset cache."""
+
+    def get_url_fetcher(self):
+        """Return the URL fetcher used to load images, fonts and stylesheets."""
+        return url_fetcher
+
 
 class AriusTemplateLoader(CachedLoader):
     """Custom template loader which bypasses cache for PDF export"""
@@ -13,8 +242,9 @@ class AriusTemplateLoader(CachedLoader):
     def get_template(self, template_name, skip=None):
         """Return a template object for the given template name.
 
-        Any custom report or label templates will be forced to reload (without cache).
-        This ensures that generated PDF reports / labels are always up-to-date.
+        Any custom report or label templates are not stored in the standard template cache.
+        Instead, they are cached against a hash of the template file contents,
+        which ensures that generated PDF reports / labels are always up-to-date.
         """
 
         # List of template patterns to skip cache for
@@ -29,8 +259,44 @@ class AriusTemplateLoader(CachedLoader):
 
         template_path = str(template.name)
 
-        # If the template matches any of the skip patterns, reload it without cache
+        # If the template matches any of the skip patterns, reload it if the file has changed
         if any(template_path.startswith(d) for d in skip_cache_dirs):
-            template = BaseLoader.get_template(self, template_name, skip)
+            template = self.get_file_template(template, template_name, skip)
 
         return template
+
+    def get_file_template(self, template, template_name, skip=None):
+        """Return a compiled template for the provided template file, using the template cache.
+
+        The template file is only re-read (and re-compiled) if the file contents have changed.
+        """
+
+        origin = template.origin
+        path = str(origin.name)
+
+        signature = file_signature(path)
+
+        if signature is None:
+            return BaseLoader.get_template(self, template_name, skip)
+
+        contents = None
+
+        if (file_hash := template_hashes.get(path, signature)) is None:
+            # File has been modified (or has not been seen before)
+            contents = self.get_contents(origin)
+            file_hash = hashlib.sha256(contents.encode('utf-8')).hexdigest()
+            template_hashes.set(path, file_hash, signature=signature)
+
+        key = (path, file_hash)
+
+        if (compiled := template_cache.get(key)) is not None:
+            return compiled
+
+        if contents is None:
+            contents = self.get_contents(origin)
+
+        compiled = Template(contents, origin, origin.template_name, self.engine)
+
+        template_cache.set(key, compiled)
+
+        return compiled
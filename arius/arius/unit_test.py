@@ -17,8 +17,10 @@ from django.test.utils import CaptureQueriesContext
 from djmoney.contrib.exchange.models import ExchangeBackend, Rate
 from rest_framework.test import APITestCase
 
+from common.currency import invalidate_rates
 from plugin import registry
 from plugin.models import PluginConfig
+from users.models import invalidate_user_roles
 
 
 def addUserPermission(user, permission):
@@ -144,6 +146,9 @@ class UserMixin:
     def setUp(self):
         """Run setup for individual test methods"""
 
+        # Discard any role information compiled during previous tests
+        invalidate_user_roles()
+
         if self.auto_login:
             self.client.login(username=self.username, password=self.password)
 
@@ -205,6 +210,12 @@ class PluginMixin:
 class ExchangeRateMixin:
     """Mixin class for generating exchange rate data"""
 
+    def setUp(self):
+        """Discard any exchange rate snapshot left over from previous tests"""
+        invalidate_rates()
+
+        super().setUp()
+
     def generate_exchange_rates(self):
         """Helper function which generates some exchange rates to work with"""
 
@@ -236,6 +247,8 @@ class ExchangeRateMixin:
 
         Rate.objects.bulk_create(items)
 
+        invalidate_rates()
+
 
 class AriusTestCase(ExchangeRateMixin, UserMixin, TestCase):
     """Testcase with user setup buildin."""
@@ -0,0 +1,325 @@
+"""Automatic stock allocation for build orders.
+
+All of the information required to auto-allocate a build order is loaded in a fixed number of grouped queries
+(regardless of the number of build lines), and the allocation is then performed in memory:
+
+- Candidate stock items for every line are loaded in a single query
+- Existing build order and sales order allocations are aggregated per stock item
+- Stock which is allocated to one line is no longer available to subsequent lines
+- The new BuildItem objects are created in bulk
+
+The order in which candidate stock items are allocated is determined by an "allocation strategy".
+Additional strategies can be registered with the allocation_strategy decorator.
+"""
+
+import datetime
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Q, Sum
+from django.utils.translation import gettext_lazy as _
+
+from arius.status_codes import SalesOrderStatusGroups
+
+logger = logging.getLogger('arius')
+
+# Registered allocation strategies, keyed by name
+ALLOCATION_STRATEGIES = {}
+
+# Strategy which is used if none is specified
+DEFAULT_STRATEGY = 'default'
+
+
+def allocation_strategy(name, label):
+    """Decorator for registering a stock allocation strategy.
+
+    The decorated function is passed a StockCandidate and the source location (or None),
+    and must return a sort key. Candidate stock items are allocated in order of:
+
+    1. Part priority (direct part matches, then variant parts, then substitute parts)
+    2. The sort key returned by the strategy
+    3. Stock item primary key
+    """
+
+    def decorator(func):
+        ALLOCATION_STRATEGIES[name] = (label, func)
+        return func
+
+    return decorator
+
+
+def get_strategy_choices():
+    """Return a list of (name, label) choices for the registered allocation strategies."""
+    return [(name, label) for name, (label, _func) in ALLOCATION_STRATEGIES.items()]
+
+
+class StockCandidate:
+    """A stock item which is available for allocation.
+
+    Attributes:
+        pk: Primary key of the StockItem
+        part_id: Primary key of the referenced Part
+        active: Active status of the referenced Part
+        location_id: Primary key of the StockLocation (or None)
+        location_level: Tree level of the StockLocation (or None)
+        expiry_date: Expiry date of the StockItem (or None)
+        available: Quantity of the StockItem which has not (yet) been allocated
+    """
+
+    __slots__ = ['pk', 'part_id', 'active', 'location_id', 'location_level', 'expiry_date', 'available']
+
+    def __init__(self, pk, part_id, active, location_id, location_level, expiry_date, available):
+        """Initialize the candidate."""
+        self.pk = pk
+        self.part_id = part_id
+        self.active = active
+        self.location_id = location_id
+        self.location_level = location_level
+        self.expiry_date = expiry_date
+        self.available = available
+
+
+@allocation_strategy('default', _('Default'))
+def default_strategy(candidate, location=None):
+    """Allocate stock items in the order in which they were created."""
+    return 0
+
+
+@allocation_strategy('expiry', _('Earliest Expiry'))
+def expiry_strategy(candidate, location=None):
+    """Allocate stock items which expire soonest first (stock without an expiry date is allocated last)."""
+    return candidate.expiry_date or datetime.date.max
+
+
+@allocation_strategy('location', _('Closest Location'))
+def location_strategy(candidate, location=None):
+    """Allocate stock items from the locations closest to the source location first.
+
+    Stock items are grouped by location, so that stock is taken from as few locations as possible.
+    """
+
+    if candidate.location_id is None:
+        return (1, 0, 0)
+
+    depth = candidate.location_level - (location.level if location else 0)
+
+    return (0, depth, candidate.location_id)
+
+
+@allocation_strategy('quantity', _('Largest Quantity'))
+def quantity_strategy(candidate, location=None):
+    """Allocate stock items with the largest available quantity first (using as few stock items as possible)."""
+    return -candidate.available
+
+
+def get_variant_ids(parts) -> dict:
+    """Return the primary keys of the variants (descendants) of each of the provided parts.
+
+    Variants are loaded with a single query.
+
+    Returns:
+        dict: Map of part ID -> set of variant part IDs
+    """
+
+    from part.models import Part
+
+    # Only parts which have descendants need to be considered
+    templates = [p for p in parts if p.rght - p.lft > 1]
+
+    variants = {p.pk: set() for p in parts}
+
+    if not templates:
+        return variants
+
+    trees = defaultdict(list)
+
+    for pk, tree_id, lft, rght in Part.objects.filter(tree_id__in={p.tree_id for p in templates}).values_list('pk', 'tree_id', 'lft', 'rght'):
+        trees[tree_id].append((pk, lft, rght))
+
+    for p in templates:
+        variants[p.pk] = {pk for pk, lft, rght in trees[p.tree_id] if lft > p.lft and rght < p.rght}
+
+    return variants
+
+
+def auto_allocate_build(build, location=None, exclude_location=None, interchangeable=False, substitutes=True, optional_items=False, strategy=None):
+    """Automatically allocate stock items against the untracked lines of a build order.
+
+    Arguments:
+        build: The Build instance
+        location: Only allocate stock items from this location (and sublocations)
+        exclude_location: Do not allocate stock items from this location (or sublocations)
+        interchangeable: If False, lines with more than one candidate stock item are not allocated
+        substitutes: Allow allocation of substitute parts
+        optional_items: Allocate stock against optional BOM items
+        strategy: Name of the allocation strategy (default = DEFAULT_STRATEGY)
+
+    Returns:
+        list: The new BuildItem objects
+    """
+
+    from build.models import BuildItem
+    from order.models import SalesOrderAllocation
+    from part.models import BomItemSubstitute, Part
+    from stock.models import StockItem
+
+    strategy = strategy or DEFAULT_STRATEGY
+
+    if strategy not in ALLOCATION_STRATEGIES:
+        raise ValueError(f"Invalid allocation strategy '{strategy}'")
+
+    sort_key = ALLOCATION_STRATEGIES[strategy][1]
+
+    lines = []
+
+    # Auto-allocation is only possible for "untracked" line items
+    for line in build.untracked_line_items.select_related('bom_item', 'bom_item__sub_part'):
+
+        if line.bom_item.consumable:
+            # Do not auto-allocate stock to consumable BOM items
+            continue
+
+        if line.bom_item.optional and not optional_items:
+            # User has specified that optional_items are to be ignored
+            continue
+
+        lines.append(line)
+
+    if not lines:
+        return []
+
+    # Quantity already allocated against each line
+    allocated = dict(
+        BuildItem.objects.filter(build_line__in=[line.pk for line in lines]).values('build_line').annotate(q=Sum('quantity')).values_list('build_line', 'q')
+    )
+
+    sub_parts = {line.bom_item.sub_part.pk: line.bom_item.sub_part for line in lines}
+    variants = get_variant_ids(sub_parts.values())
+
+    # Substitute parts for each BOM item
+    substitute_ids = defaultdict(set)
+
+    if substitutes:
+        for bom_item_id, part_id in BomItemSubstitute.objects.filter(bom_item__in=[line.bom_item_id for line in lines]).values_list('bom_item', 'part'):
+            substitute_ids[bom_item_id].add(part_id)
+
+    # Determine the valid parts (and priority of each part) for each line
+    line_parts = {}
+
+    for line in lines:
+        bom_item = line.bom_item
+        sub_part = bom_item.sub_part
+
+        priority = {sub_part.pk: 1}
+
+        if bom_item.allow_variants:
+            for pk in variants[sub_part.pk]:
+                priority.setdefault(pk, 2)
+
+        for pk in substitute_ids[bom_item.pk]:
+            # Variants which are also substitutes retain their variant priority
+            priority.setdefault(pk, 2 if pk in variants[sub_part.pk] else 3)
+
+        line_parts[line.pk] = priority
+
+    all_parts = set().union(*[priority.keys() for priority in line_parts.values()])
+
+    # Trackable status must be the same as the sub_part
+    trackable = dict(Part.objects.filter(pk__in=all_parts).values_list('pk', 'trackable'))
+
+    for line in lines:
+        line_parts[line.pk] = {
+            pk: p for pk, p in line_parts[line.pk].items() if trackable.get(pk, None) == line.bom_item.sub_part.trackable
+        }
+
+    # Look for available stock items
+    available_stock = StockItem.objects.filter(StockItem.IN_STOCK_FILTER).filter(part__in=all_parts)
+
+    # Filter out "serialized" stock items, these cannot be auto-allocated
+    available_stock = available_stock.filter(Q(serial=None) | Q(serial=''))
+
+    if location:
+        # Filter only stock items located "below" the specified location
+        available_stock = available_stock.filter(location__in=location.get_descendants(include_self=True))
+
+    if exclude_location:
+        # Exclude any stock items from the provided location
+        available_stock = available_stock.exclude(location__in=exclude_location.get_descendants(include_self=True))
+
+    # Existing allocations against the available stock items
+    build_allocations = dict(
+        BuildItem.objects.filter(stock_item__in=available_stock.values('pk')).values('stock_item').annotate(q=Sum('quantity')).values_list('stock_item', 'q')
+    )
+
+    sales_order_allocations = dict(
+        SalesOrderAllocation.objects.filter(
+            item__in=available_stock.values('pk'),
+            line__order__status__in=SalesOrderStatusGroups.OPEN,
+            shipment__shipment_date=None,
+        ).values('item').annotate(q=Sum('quantity')).values_list('item', 'q')
+    )
+
+    stock = defaultdict(list)
+
+    for pk, part_id, active, quantity, location_id, location_level, expiry_date in available_stock.values_list(
+        'pk', 'part', 'part__active', 'quantity', 'location', 'location__level', 'expiry_date'
+    ):
+        available = quantity - build_allocations.get(pk, Decimal(0)) - sales_order_allocations.get(pk, Decimal(0))
+
+        stock[part_id].append(StockCandidate(pk, part_id, active, location_id, location_level, expiry_date, max(available, Decimal(0))))
+
+    new_items = []
+
+    for line in lines:
+
+        unallocated = line.quantity - allocated.get(line.pk, Decimal(0))
+
+        if unallocated <= 0:
+            # This line is fully allocated, we can continue
+            continue
+
+        priority = line_parts[line.pk]
+
+        candidates = [candidate for part_id in priority for candidate in stock[part_id]]
+
+        if len(candidates) == 0:
+            # No stock items are available
+            continue
+
+        if len(candidates) > 1 and not interchangeable:
+            # Multiple stock items are available, but the user has not specified that they are interchangeable
+            continue
+
+        candidates.sort(key=lambda c: (priority[c.part_id], sort_key(c, location), c.pk))
+
+        for candidate in candidates:
+
+            # Skip inactive parts
+            if not candidate.active:
+                continue
+
+            # How much of the stock item is "available" for allocation?
+            quantity = min(unallocated, candidate.available)
+
+            if quantity > 0:
+                new_items.append(BuildItem(
+                    build_line=line,
+                    stock_item_id=candidate.pk,
+                    quantity=quantity,
+                ))
+
+                # Stock allocated here is no longer available to other lines
+                candidate.available -= quantity
+                unallocated -= quantity
+
+            if unallocated <= 0:
+                # We have now fully-allocated this line - no need to continue!
+                break
+
+    # Bulk-create the new BuildItem objects
+    BuildItem.objects.bulk_create(new_items, batch_size=500)
+
+    logger.info(f"Auto-allocated {len(new_items)} stock items against build order {build.pk}")
+
+    return new_items
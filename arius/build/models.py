@@ -3,6 +3,7 @@
 import decimal
 import logging
 import os
+from collections import defaultdict
 from datetime import datetime
 
 from django.contrib.auth.models import User
@@ -11,7 +12,7 @@ from django.core.validators import MinValueValidator
 from django.db import models, transaction
 from django.db.models import Sum, Q
 from django.db.models.functions import Coalesce
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch.dispatcher import receiver
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -19,10 +20,9 @@ from django.utils.translation import gettext_lazy as _
 from mptt.models import MPTTModel, TreeForeignKey
 from mptt.exceptions import InvalidMove
 
-from rest_framework import serializers
-
 from arius.status_codes import BuildStatus, StockStatus, StockHistoryCode, BuildStatusGroups
 
+from build.allocation import auto_allocate_build
 from build.validators import generate_next_build_reference, validate_build_order_reference
 
 import arius.fields
@@ -34,7 +34,8 @@ import arius.tasks
 
 import common.models
 from common.notifications import trigger_notification
-from plugin.events import trigger_event
+from plugin.base.event.events import allow_table_event
+from plugin.events import bulk_events, trigger_event
 
 import part.models
 import stock.models
@@ -579,8 +580,7 @@ class Build(MPTTModel, arius.models.AriusBarcodeMixin, arius.models.AriusNotesMi
         items = self.allocated_stock
 
         if remove_allocated_stock:
-            for item in items:
-                item.complete_allocation(user)
+            self.complete_allocations(items, user)
 
         items.delete()
 
@@ -811,11 +811,137 @@ class Build(MPTTModel, arius.models.AriusBarcodeMixin, arius.models.AriusNotesMi
         )
 
         # Remove stock
-        for item in items:
-            item.complete_allocation(user)
+        with bulk_events():
+            self.complete_allocations(items, user)
 
-        # Delete allocation
-        items.all().delete()
+            # Delete allocation
+            items.all().delete()
+
+    @transaction.atomic
+    def complete_allocations(self, allocations, user, notes=''):
+        """Complete multiple BuildItem allocations, with bulk database operations.
+
+        This is equivalent to calling BuildItem.complete_allocation for each allocation in turn:
+
+        - Allocated stock items are split (where more stock is available than was allocated)
+        - Trackable stock items are *installed* into the build output
+        - Untracked stock items are *consumed* by the build order
+
+        Note: The BuildItem objects are not deleted here.
+
+        Arguments:
+            allocations: Iterable of BuildItem objects (in the order in which they should be completed)
+            user: The user completing the allocations
+            notes: Optional notes for tracking
+
+        Returns:
+            list: The stock item which was installed or consumed for each allocation
+        """
+
+        allocations = list(allocations)
+
+        stock_items = {
+            item.pk: item for item in stock.models.StockItem.objects.filter(
+                pk__in={allocation.stock_item_id for allocation in allocations}
+            ).select_related('part')
+        }
+
+        # Running quantity of each source stock item
+        remaining = {pk: item.quantity for pk, item in stock_items.items()}
+
+        splits = defaultdict(list)
+        used = {}
+
+        def installed_into(allocation, item):
+            """Return the build output which the stock item is installed into (or None)"""
+            return allocation.install_into_id if item.part.trackable else None
+
+        for allocation in allocations:
+            item = stock_items[allocation.stock_item_id]
+
+            if not item.serialized and 0 < allocation.quantity < remaining[item.pk]:
+                # Split the allocated quantity from the stock item
+                remaining[item.pk] -= allocation.quantity
+                splits[item.pk].append(allocation)
+            else:
+                # The entire stock item is used
+                used[allocation.pk] = (item, remaining[item.pk])
+
+        # Split stock items (a single bulk operation for each source item)
+        for pk, split_allocations in splits.items():
+            item = stock_items[pk]
+
+            children = item.bulk_split_stock(
+                [allocation.quantity for allocation in split_allocations],
+                user,
+                notes=notes,
+                values=[
+                    {'belongs_to_id': installed_into(allocation, item), 'consumed_by_id': self.pk}
+                    for allocation in split_allocations
+                ],
+            )
+
+            for allocation, child in zip(split_allocations, children):
+                used[allocation.pk] = (child, allocation.quantity)
+
+        # Items which are used directly (rather than split) are updated in bulk
+        updated = {}
+
+        for allocation in allocations:
+            item, _quantity = used[allocation.pk]
+
+            if item.pk in stock_items and item.pk not in updated:
+                item.belongs_to_id = installed_into(allocation, item)
+                item.consumed_by_id = self.pk
+                updated[item.pk] = item
+
+        stock.models.StockItem.objects.bulk_update(updated.values(), ['belongs_to', 'consumed_by'], batch_size=500)
+
+        now = datetime.now()
+        tracking = []
+
+        for allocation in allocations:
+            item, quantity = used[allocation.pk]
+
+            if output_id := installed_into(allocation, item):
+                # Install the stock item into the output
+                deltas = {
+                    'stockitem': output_id,
+                    'buildorder': self.pk,
+                }
+
+                tracking.append(stock.models.StockItemTracking(
+                    item_id=item.pk, tracking_type=StockHistoryCode.INSTALLED_INTO_ASSEMBLY.value, user=user, date=now, notes=notes, deltas=deltas,
+                ))
+
+                tracking.append(stock.models.StockItemTracking(
+                    item_id=output_id, tracking_type=StockHistoryCode.INSTALLED_CHILD_ITEM.value, user=user, date=now, notes=notes,
+                    deltas={'stockitem': item.pk},
+                ))
+            else:
+                # Mark the item as "consumed" by the build order
+                deltas = {
+                    'buildorder': self.pk,
+                    'quantity': float(quantity),
+                }
+
+                tracking.append(stock.models.StockItemTracking(
+                    item_id=item.pk, tracking_type=StockHistoryCode.BUILD_CONSUMED.value, user=user, date=now, notes=notes, deltas=deltas,
+                ))
+
+        stock.models.StockItemTracking.objects.bulk_create(tracking, batch_size=1000)
+
+        # Trigger events and update part information, for the items which were not saved individually
+        table = stock.models.StockItem._meta.db_table
+
+        if allow_table_event(table):
+            with bulk_events():
+                for pk in updated:
+                    trigger_event(f'{table}.saved', id=pk, model='StockItem')
+
+        stock.models.stock_items_updated([item.part for item in updated.values()])
+
+        return [used[allocation.pk][0] for allocation in allocations]
 
     @transaction.atomic
     def scrap_build_output(self, output, quantity, location, **kwargs):
@@ -883,46 +1009,82 @@ class Build(MPTTModel, arius.models.AriusBarcodeMixin, arius.models.AriusNotesMi
         - Remove allocated StockItems
         - Mark the output as complete
         """
-        # Select the location for the build output
+
+        self.complete_build_outputs([output], user, **kwargs)
+
+    @transaction.atomic
+    def complete_build_outputs(self, outputs, user, **kwargs):
+        """Complete multiple build outputs, with bulk database operations.
+
+        - Remove allocated StockItems (see complete_allocations)
+        - Mark the outputs as complete
+        - Update the completed quantity for this build
+
+        The number of database queries does not depend on the number of outputs.
+        """
+        # Select the location for the build outputs
         location = kwargs.get('location', self.destination)
         status = kwargs.get('status', StockStatus.OK.value)
         notes = kwargs.get('notes', '')
 
-        # List the allocated BuildItem objects for the given output
-        allocated_items = output.items_to_install.all()
+        outputs = list(outputs)
 
-        for build_item in allocated_items:
-            # Complete the allocation of stock for that item
-            build_item.complete_allocation(user)
+        if len(outputs) == 0:
+            return
 
-        # Delete the BuildItem objects from the database
-        allocated_items.all().delete()
+        order = {output.pk: idx for idx, output in enumerate(outputs)}
 
-        # Ensure that the output is updated correctly
-        output.build = self
-        output.is_building = False
-        output.location = location
-        output.status = status
+        # List the allocated BuildItem objects for the given outputs
+        allocated_items = BuildItem.objects.filter(install_into__in=list(order.keys()))
 
-        output.save(add_note=False)
+        allocations = sorted(allocated_items, key=lambda allocation: (order[allocation.install_into_id], allocation.pk))
 
-        deltas = {
-            'status': status,
-            'buildorder': self.pk
-        }
+        with bulk_events():
+            # Complete the allocation of stock for each item
+            self.complete_allocations(allocations, user)
 
-        if location:
-            deltas['location'] = location.pk
+            # Delete the BuildItem objects from the database
+            allocated_items.delete()
 
-        output.add_tracking_entry(
-            StockHistoryCode.BUILD_OUTPUT_COMPLETED,
-            user,
-            notes=notes,
-            deltas=deltas
-        )
+            # Ensure that the outputs are updated correctly
+            for output in outputs:
+                output.build = self
+                output.is_building = False
+                output.location = location
+                output.status = status
+
+            # Validate the outputs (other than the serial numbers) once
+            outputs[0].clean()
+
+            stock.models.StockItem.objects.bulk_update(outputs, ['build', 'is_building', 'location', 'status'], batch_size=500)
+
+            deltas = {
+                'status': status,
+                'buildorder': self.pk
+            }
+
+            if location:
+                deltas['location'] = location.pk
+
+            now = datetime.now()
+
+            stock.models.StockItemTracking.objects.bulk_create([
+                stock.models.StockItemTracking(
+                    item=output, tracking_type=StockHistoryCode.BUILD_OUTPUT_COMPLETED.value, user=user, date=now, notes=notes, deltas=deltas,
+                )
+                for output in outputs
+            ], batch_size=1000)
+
+            table = stock.models.StockItem._meta.db_table
+
+            if allow_table_event(table):
+                for output in outputs:
+                    trigger_event(f'{table}.saved', id=output.pk, model='StockItem')
+
+        stock.models.stock_items_updated([self.part])
 
         # Increase the completed quantity for this build
-        self.completed += output.quantity
+        self.completed += sum(output.quantity for output in outputs)
 
         self.save()
 
@@ -939,120 +1101,20 @@ class Build(MPTTModel, arius.models.AriusBarcodeMixin, arius.models.AriusNotesMi
         - If a single stock item is found, we can allocate that and move on!
         - If multiple stock items are found, we *may* be able to allocate:
             - If the calling function has specified that items are interchangeable
-        """
-        location = kwargs.get('location', None)
-        exclude_location = kwargs.get('exclude_location', None)
-        interchangeable = kwargs.get('interchangeable', False)
-        substitutes = kwargs.get('substitutes', True)
-        optional_items = kwargs.get('optional_items', False)
-
-        def stock_sort(item, bom_item, variant_parts):
-            if item.part == bom_item.sub_part:
-                return 1
-            elif item.part in variant_parts:
-                return 2
-            else:
-                return 3
-
-        new_items = []
-
-        # Auto-allocation is only possible for "untracked" line items
-        for line_item in self.untracked_line_items.all():
-
-            # Find the referenced BomItem
-            bom_item = line_item.bom_item
-
-            if bom_item.consumable:
-                # Do not auto-allocate stock to consumable BOM items
-                continue
-
-            if bom_item.optional and not optional_items:
-                # User has specified that optional_items are to be ignored
-                continue
-
-            variant_parts = bom_item.sub_part.get_descendants(include_self=False)
-
-            unallocated_quantity = line_item.unallocated_quantity()
-
-            if unallocated_quantity <= 0:
-                # This BomItem is fully allocated, we can continue
-                continue
-
-            # Check which parts we can "use" (may include variants and substitutes)
-            available_parts = bom_item.get_valid_parts_for_allocation(
-                allow_variants=True,
-                allow_substitutes=substitutes,
-            )
-
-            # Look for available stock items
-            available_stock = stock.models.StockItem.objects.filter(stock.models.StockItem.IN_STOCK_FILTER)
 
-            # Filter by list of available parts
-            available_stock = available_stock.filter(
-                part__in=list(available_parts),
-            )
-
-            # Filter out "serialized" stock items, these cannot be auto-allocated
-            available_stock = available_stock.filter(Q(serial=None) | Q(serial=''))
-
-            if location:
-                # Filter only stock items located "below" the specified location
-                sublocations = location.get_descendants(include_self=True)
-                available_stock = available_stock.filter(location__in=list(sublocations))
-
-            if exclude_location:
-                # Exclude any stock items from the provided location
-                sublocations = exclude_location.get_descendants(include_self=True)
-                available_stock = available_stock.exclude(location__in=list(sublocations))
-
-            """
-            Next, we sort the available stock items with the following priority:
-            1. Direct part matches (+1)
-            2. Variant part matches (+2)
-            3. Substitute part matches (+3)
-
-            This ensures that allocation priority is first given to "direct" parts
-            """
-            available_stock = sorted(available_stock, key=lambda item, b=bom_item, v=variant_parts: stock_sort(item, b, v))
-
-            if len(available_stock) == 0:
-                # No stock items are available
-                continue
-            elif len(available_stock) == 1 or interchangeable:
-                # Either there is only a single stock item available,
-                # or all items are "interchangeable" and we don't care where we take stock from
-
-                for stock_item in available_stock:
-
-                    # Skip inactive parts
-                    if not stock_item.part.active:
-                        continue
-
-                    # How much of the stock item is "available" for allocation?
-                    quantity = min(unallocated_quantity, stock_item.unallocated_quantity())
-
-                    if quantity > 0:
-
-                        try:
-                            new_items.append(BuildItem(
-                                build_line=line_item,
-                                stock_item=stock_item,
-                                quantity=quantity,
-                            ))
-
-                            # Subtract the required quantity
-                            unallocated_quantity -= quantity
-
-                        except (ValidationError, serializers.ValidationError) as exc:
-                            # Catch model errors and re-throw as DRF errors
-                            raise ValidationError(detail=serializers.as_serializer_error(exc))
-
-                    if unallocated_quantity <= 0:
-                        # We have now fully-allocated this BomItem - no need to continue!
-                        break
+        The order in which stock items are allocated is determined by the 'strategy' argument.
+        Refer to build.allocation for the allocation engine, and the available strategies.
+        """
 
-        # Bulk-create the new BuildItem objects
-        BuildItem.objects.bulk_create(new_items)
+        return auto_allocate_build(
+            self,
+            location=kwargs.get('location', None),
+            exclude_location=kwargs.get('exclude_location', None),
+            interchangeable=kwargs.get('interchangeable', False),
+            substitutes=kwargs.get('substitutes', True),
+            optional_items=kwargs.get('optional_items', False),
+            strategy=kwargs.get('strategy', None),
+        )
 
     def unallocated_lines(self, tracked=None):
         """Returns a list of BuildLine objects which have not been fully allocated."""
@@ -1217,6 +1279,11 @@ def after_save_build(sender, instance: Build, created: bool, **kwargs):
             # Update BuildLine objects if the Build quantity has changed
             instance.update_build_line_items()
 
+            # The build status may have changed, which affects the 'allocated' quantity for each part
+            part.models.PartStockSummary.schedule_update(
+                BuildItem.objects.filter(build_line__build=instance).values_list('stock_item__part', flat=True)
+            )
+
 
 class BuildOrderAttachment(arius.models.AriusAttachment):
     """Model for storing file attachments against a BuildOrder object."""
@@ -1568,3 +1635,16 @@ class BuildItem(arius.models.MetadataMixin, models.Model):
             'is_building': True,
         }
     )
+
+
+@receiver(post_save, sender=BuildItem, dispatch_uid='build_item_post_save_stock_summary')
+@receiver(post_delete, sender=BuildItem, dispatch_uid='build_item_post_delete_stock_summary')
+def update_stock_summary_after_build_item(sender, instance: BuildItem, **kwargs):
+    """Callback function when a BuildItem is saved or deleted.
+
+    - Schedule an update of the 'allocated' quantity for the referenced part
+    """
+
+    part.models.PartStockSummary.schedule_update(
+        stock.models.StockItem.objects.filter(pk=instance.stock_item_id).values_list('part', flat=True)
+    )
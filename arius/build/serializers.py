@@ -22,12 +22,15 @@ from arius.status_codes import StockStatus
 
 from stock.models import generate_batch_code, StockItem, StockLocation
 from stock.serializers import StockItemSerializerBrief, LocationSerializer
+from stock.serial_numbers import release_serial_numbers, reserve_serial_numbers
 
 from common.serializers import ProjectCodeSerializer
 import part.filters
 from part.serializers import BomItemSerializer, PartSerializer, PartBriefSerializer
+from plugin.events import bulk_events
 from users.serializers import OwnerSerializer
 
+from .allocation import DEFAULT_STRATEGY, get_strategy_choices
 from .models import Build, BuildLine, BuildItem, BuildOrderAttachment
 
 
@@ -305,6 +308,7 @@ class BuildOutputCreateSerializer(serializers.Serializer):
 
         # Cache a list of serial numbers (to be used in the "save" method)
         self.serials = None
+        self.reservation = None
 
         quantity = data['quantity']
         serial_numbers = data.get('serial_numbers', '')
@@ -322,21 +326,16 @@ class BuildOutputCreateSerializer(serializers.Serializer):
                     'serial_numbers': e.messages,
                 })
 
-            # Check for conflicting serial numbesr
-            existing = []
-
-            for serial in self.serials:
-                if not part.validate_serial_number(serial):
-                    existing.append(serial)
-
-            if len(existing) > 0:
-
-                msg = _("The following serial numbers already exist or are invalid")
-                msg += " : "
-                msg += ",".join([str(e) for e in existing])
-
+            # Check for conflicting serial numbers, and reserve them until the outputs are created
+            try:
+                self.reservation, self.serials = reserve_serial_numbers(
+                    part,
+                    serials=self.serials,
+                    user=self.context['request'].user,
+                )
+            except DjangoValidationError as e:
                 raise ValidationError({
-                    'serial_numbers': msg,
+                    'serial_numbers': e.messages,
                 })
 
         return data
@@ -352,13 +351,17 @@ class BuildOutputCreateSerializer(serializers.Serializer):
         build = self.get_build()
         user = self.context['request'].user
 
-        build.create_build_output(
-            quantity,
-            serials=self.serials,
-            batch=batch_code,
-            auto_allocate=auto_allocate,
-            user=user,
-        )
+        try:
+            build.create_build_output(
+                quantity,
+                serials=self.serials,
+                batch=batch_code,
+                auto_allocate=auto_allocate,
+                user=user,
+            )
+        finally:
+            if self.reservation:
+                release_serial_numbers(self.reservation)
 
 
 class BuildOutputDeleteSerializer(serializers.Serializer):
@@ -541,18 +544,14 @@ class BuildOutputCompleteSerializer(serializers.Serializer):
         outputs = data.get('outputs', [])
 
         # Mark the specified build outputs as "complete"
-        with transaction.atomic():
-            for item in outputs:
-
-                output = item['output']
-
-                build.complete_build_output(
-                    output,
-                    request.user,
-                    location=location,
-                    status=status,
-                    notes=notes,
-                )
+        with bulk_events(), transaction.atomic():
+            build.complete_build_outputs(
+                [item['output'] for item in outputs],
+                request.user,
+                location=location,
+                status=status,
+                notes=notes,
+            )
 
 
 class BuildCancelSerializer(serializers.Serializer):
@@ -936,6 +935,7 @@ class BuildAutoAllocationSerializer(serializers.Serializer):
             'interchangeable',
             'substitutes',
             'optional_items',
+            'strategy',
         ]
 
     location = serializers.PrimaryKeyRelatedField(
@@ -974,6 +974,13 @@ class BuildAutoAllocationSerializer(serializers.Serializer):
         help_text=_('Allocate optional BOM items to build order'),
     )
 
+    strategy = serializers.ChoiceField(
+        choices=get_strategy_choices(),
+        default=DEFAULT_STRATEGY,
+        label=_('Allocation Strategy'),
+        help_text=_('Order in which available stock items are allocated'),
+    )
+
     def save(self):
         """Perform the auto-allocation step"""
         data = self.validated_data
@@ -986,6 +993,7 @@ class BuildAutoAllocationSerializer(serializers.Serializer):
             interchangeable=data['interchangeable'],
             substitutes=data['substitutes'],
             optional_items=data['optional_items'],
+            strategy=data['strategy'],
         )
 
 
@@ -15,7 +15,7 @@ import common.models
 import build.tasks
 from build.models import Build, BuildItem, BuildLine, generate_next_build_reference
 from part.models import Part, BomItem, BomItemSubstitute
-from stock.models import StockItem
+from stock.models import StockItem, StockLocation
 from users.models import Owner
 
 import logging
@@ -485,6 +485,45 @@ class BuildTest(BuildTestBase):
         """
         pass
 
+    def test_complete_multiple_outputs(self):
+        """Test completion of multiple build outputs in a single operation"""
+
+        # Allocate tracked parts to each output, from the same stock item
+        self.allocate_stock(self.output_1, {self.stock_3_1: 6})
+        self.allocate_stock(self.output_2, {self.stock_3_1: 14})
+
+        n_items = StockItem.objects.count()
+        n_tracking = self.stock_3_1.tracking_info.count()
+        completed = self.build.completed
+
+        self.build.complete_build_outputs([self.output_1, self.output_2], None)
+
+        self.assertEqual(BuildItem.objects.filter(install_into__in=[self.output_1, self.output_2]).count(), 0)
+
+        # The allocated quantities have been split from the source item
+        self.stock_3_1.refresh_from_db()
+        self.assertEqual(self.stock_3_1.quantity, 980)
+        self.assertEqual(self.stock_3_1.tracking_info.count(), n_tracking + 2)
+        self.assertEqual(self.stock_3_1.get_descendant_count(), 2)
+        self.assertEqual(StockItem.objects.count(), n_items + 2)
+
+        for output, quantity in [(self.output_1, 6), (self.output_2, 14)]:
+            output.refresh_from_db()
+
+            self.assertFalse(output.is_building)
+
+            installed = StockItem.objects.get(belongs_to=output)
+            self.assertEqual(installed.quantity, quantity)
+            self.assertEqual(installed.consumed_by, self.build)
+            self.assertEqual(installed.parent, self.stock_3_1)
+
+            self.assertTrue(installed.tracking_info.filter(tracking_type=status.StockHistoryCode.INSTALLED_INTO_ASSEMBLY.value).exists())
+            self.assertTrue(output.tracking_info.filter(tracking_type=status.StockHistoryCode.INSTALLED_CHILD_ITEM.value).exists())
+            self.assertTrue(output.tracking_info.filter(tracking_type=status.StockHistoryCode.BUILD_OUTPUT_COMPLETED.value).exists())
+
+        self.build.refresh_from_db()
+        self.assertEqual(self.build.completed, completed + 10)
+
     def test_complete(self):
         """Test completion of a build output"""
 
@@ -705,6 +744,59 @@ class AutoAllocationTests(BuildTestBase):
         self.assertTrue(self.line_1.is_fully_allocated())
         self.assertFalse(self.line_2.is_fully_allocated())
 
+    def test_allocation_strategy(self):
+        """Test auto-allocation using different allocation strategies"""
+
+        # Stock items with the largest quantity are allocated first
+        self.build.auto_allocate_stock(
+            interchangeable=True,
+            substitutes=False,
+            strategy='quantity',
+        )
+
+        self.assertEqual(self.line_1.allocations.count(), 1)
+        self.assertEqual(self.line_1.allocations.first().stock_item, self.stock_1_2)
+        self.assertEqual(self.line_1.unallocated_quantity(), 0)
+
+        BuildItem.objects.filter(build_line__build=self.build).delete()
+
+        # The default strategy allocates stock items in the order in which they were created
+        self.build.auto_allocate_stock(interchangeable=True, substitutes=False)
+
+        self.assertEqual(self.line_1.allocations.count(), 2)
+        self.assertEqual(self.line_1.allocations.get(stock_item=self.stock_1_1).quantity, 3)
+
+        BuildItem.objects.filter(build_line__build=self.build).delete()
+
+        # Stock items which expire soonest are allocated first
+        self.stock_1_2.expiry_date = datetime.now().date() + timedelta(days=10)
+        self.stock_1_2.save()
+
+        self.build.auto_allocate_stock(interchangeable=True, substitutes=False, strategy='expiry')
+
+        self.assertEqual(self.line_1.allocations.count(), 1)
+        self.assertEqual(self.line_1.allocations.first().stock_item, self.stock_1_2)
+
+        BuildItem.objects.filter(build_line__build=self.build).delete()
+
+        # Stock items in the locations closest to the source location are allocated first
+        store = StockLocation.objects.create(name='Store')
+        shelf = StockLocation.objects.create(name='Shelf', parent=store)
+
+        self.stock_1_1.location = shelf
+        self.stock_1_1.save()
+
+        self.stock_1_2.location = store
+        self.stock_1_2.save()
+
+        self.build.auto_allocate_stock(location=store, interchangeable=True, substitutes=False, strategy='location')
+
+        self.assertEqual(self.line_1.allocations.count(), 1)
+        self.assertEqual(self.line_1.allocations.first().stock_item, self.stock_1_2)
+
+        with self.assertRaises(ValueError):
+            self.build.auto_allocate_stock(interchangeable=True, strategy='invalid')
+
     def test_fully_auto(self):
         """We should be able to auto-allocate against a build in a single go"""
 
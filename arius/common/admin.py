@@ -55,16 +55,36 @@ class NotificationMessageAdmin(admin.ModelAdmin):
     search_fields = ('name', 'category', 'message', )
 
 
+class NotificationDigestEntryAdmin(admin.ModelAdmin):
+    """Admin settings for NotificationDigestEntry."""
+
+    list_display = ('creation', 'user', 'category', 'name', )
+
+    list_filter = ('category', 'user', )
+
+    search_fields = ('name', 'category', 'message', )
+
+
 class NewsFeedEntryAdmin(admin.ModelAdmin):
     """Admin settings for NewsFeedEntry."""
 
     list_display = ('title', 'author', 'published', 'summary', )
 
 
+class DataExportJobAdmin(admin.ModelAdmin):
+    """Admin settings for DataExportJob."""
+
+    list_display = ('created', 'user', 'endpoint', 'export_format', 'progress', 'total', 'complete', )
+
+    list_filter = ('complete', 'export_format', 'user', )
+
+
 admin.site.register(common.models.AriusSetting, SettingsAdmin)
 admin.site.register(common.models.AriusUserSetting, UserSettingsAdmin)
 admin.site.register(common.models.WebhookEndpoint, WebhookAdmin)
 admin.site.register(common.models.WebhookMessage, ImportExportModelAdmin)
 admin.site.register(common.models.NotificationEntry, NotificationEntryAdmin)
 admin.site.register(common.models.NotificationMessage, NotificationMessageAdmin)
+admin.site.register(common.models.NotificationDigestEntry, NotificationDigestEntryAdmin)
 admin.site.register(common.models.NewsFeedEntry, NewsFeedEntryAdmin)
+admin.site.register(common.models.DataExportJob, DataExportJobAdmin)
@@ -23,7 +23,8 @@ from arius.config import CONFIG_LOOKUPS
 from arius.filters import ORDER_FILTER, SEARCH_ORDER_FILTER
 from arius.helpers import inheritors
 from arius.mixins import (ListAPI, ListCreateAPI, RetrieveAPI,
-                          RetrieveUpdateAPI, RetrieveUpdateDestroyAPI)
+                          RetrieveDestroyAPI, RetrieveUpdateAPI,
+                          RetrieveUpdateDestroyAPI)
 from arius.permissions import IsStaffOrReadOnly, IsSuperuser
 from plugin.models import NotificationUserSetting
 from plugin.serializers import NotificationUserSettingSerializer
@@ -486,6 +487,42 @@ class ProjectCodeDetail(RetrieveUpdateDestroyAPI):
     permission_classes = [permissions.IsAuthenticated, IsStaffOrReadOnly]
 
 
+class DataExportJobMixin:
+    """Generic mixin for DataExportJob."""
+
+    queryset = common.models.DataExportJob.objects.all()
+    serializer_class = common.serializers.DataExportJobSerializer
+    permission_classes = [permissions.IsAuthenticated, ]
+
+    def get_queryset(self):
+        """Staff users can view all export jobs, other users only their own."""
+        queryset = super().get_queryset()
+
+        user = self.request.user
+
+        if not user.is_staff:
+            queryset = queryset.filter(user=user)
+
+        return queryset
+
+
+class DataExportJobList(DataExportJobMixin, ListAPI):
+    """List view for background data export jobs."""
+
+    filter_backends = ORDER_FILTER
+
+    ordering_fields = [
+        'created',
+        'complete',
+    ]
+
+    ordering = '-created'
+
+
+class DataExportJobDetail(DataExportJobMixin, RetrieveDestroyAPI):
+    """Detail view for an individual background data export job."""
+
+
 class FlagList(ListAPI):
     """List view for feature flags."""
 
@@ -581,6 +618,12 @@ common_api_urls = [
         re_path(r'^.*$', NewsFeedEntryList.as_view(), name='api-news-list'),
     ])),
 
+    # Background data exports
+    re_path(r'^data-export/', include([
+        path(r'<int:pk>/', DataExportJobDetail.as_view(), name='api-data-export-detail'),
+        re_path(r'^.*$', DataExportJobList.as_view(), name='api-data-export-list'),
+    ])),
+
     # Flags
     path('flags/', include([
         path('<str:key>/', FlagDetail.as_view(), name='api-flag-detail'),
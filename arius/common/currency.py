@@ -0,0 +1,213 @@
+"""Currency conversion helpers for the common app.
+
+Exchange rates are loaded from the database into a process-local snapshot,
+so that repeated currency conversions do not each query the Rate table.
+
+- The snapshot is invalidated whenever the exchange rates are updated
+- A shared version key (stored in the cache) is used to notify other processes of the change
+"""
+
+import logging
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.cache import cache
+
+from djmoney.contrib.exchange.exceptions import MissingRate
+from djmoney.money import Money
+
+logger = logging.getLogger('arius')
+
+# Cache key used to share the current exchange rate version between processes
+RATES_VERSION_KEY = 'currency_rates_version'
+
+# Minimum interval (seconds) between checks of the shared exchange rate version
+RATES_CHECK_INTERVAL = 5
+
+# Process-local exchange rate snapshot
+_snapshot = None
+
+
+class RateSnapshot:
+    """Exchange rates for the default exchange backend, captured at a point in time.
+
+    Attributes:
+        base_currency: Base currency code for the exchange backend
+        rates: Map of currency code -> exchange rate (relative to the base currency)
+        version: Version key of the exchange rate data
+    """
+
+    def __init__(self, base_currency, rates: dict, version=None):
+        """Initialize the snapshot."""
+        self.base_currency = base_currency
+        self.rates = dict(rates)
+        self.version = version
+        self.checked = time.monotonic()
+
+        if base_currency:
+            self.rates.setdefault(base_currency, Decimal(1))
+
+    def get_rate(self, source, target) -> Decimal:
+        """Return the exchange rate between the source and target currencies.
+
+        Raises:
+            MissingRate: If no exchange rate is available
+        """
+
+        source, target = str(source), str(target)
+
+        if source == target:
+            return Decimal(1)
+
+        try:
+            return self.rates[target] / self.rates[source]
+        except KeyError:
+            raise MissingRate(f"Rate {source} -> {target} does not exist")
+
+    def convert(self, money: Money, currency) -> Money:
+        """Convert a Money instance to the specified currency.
+
+        Raises:
+            MissingRate: If no exchange rate is available
+        """
+
+        return Money(money.amount * self.get_rate(money.currency, currency), currency)
+
+
+def get_rates_version():
+    """Return the shared exchange rate version key (or None if not available)."""
+
+    try:
+        return cache.get(RATES_VERSION_KEY)
+    except Exception:  # pragma: no cover
+        return None
+
+
+def invalidate_rates():
+    """Invalidate the exchange rate snapshot.
+
+    - The snapshot for the current process is discarded immediately
+    - Other processes will reload their snapshot after their next version check
+    """
+
+    global _snapshot
+
+    _snapshot = None
+
+    try:
+        cache.set(RATES_VERSION_KEY, uuid.uuid4().hex, None)
+    except Exception:  # pragma: no cover
+        pass
+
+
+def load_rates(version=None) -> RateSnapshot:
+    """Load exchange rate information from the database."""
+
+    from djmoney.contrib.exchange.models import (ExchangeBackend,
+                                                 get_default_backend_name)
+
+    backend = ExchangeBackend.objects.filter(name=get_default_backend_name()).prefetch_related('rates').first()
+
+    if backend is None:
+        return RateSnapshot(None, {}, version=version)
+
+    return RateSnapshot(
+        backend.base_currency,
+        {rate.currency: rate.value for rate in backend.rates.all()},
+        version=version,
+    )
+
+
+def get_rates() -> RateSnapshot:
+    """Return the current exchange rate snapshot, reloading it if the exchange rates have been updated."""
+
+    global _snapshot
+
+    snapshot = _snapshot
+    now = time.monotonic()
+
+    if snapshot is not None and now - snapshot.checked < RATES_CHECK_INTERVAL:
+        return snapshot
+
+    version = get_rates_version()
+
+    if version is None:
+        # No version information available (e.g. the cache has been cleared)
+        try:
+            cache.add(RATES_VERSION_KEY, uuid.uuid4().hex, None)
+        except Exception:  # pragma: no cover
+            pass
+
+        version = get_rates_version()
+
+    if snapshot is not None and version is not None and version == snapshot.version:
+        snapshot.checked = now
+        return snapshot
+
+    snapshot = load_rates(version=version)
+    _snapshot = snapshot
+
+    return snapshot
+
+
+def convert_money(money: Money, currency) -> Money:
+    """Convert a Money instance to the specified currency, using the exchange rate snapshot.
+
+    This is a drop-in replacement for djmoney.contrib.exchange.models.convert_money
+
+    Raises:
+        MissingRate: If no exchange rate is available
+    """
+
+    return get_rates().convert(money, currency)
+
+
+def convert_values(values, currency, ignore_missing: bool = False) -> list:
+    """Convert multiple monetary values to the specified currency.
+
+    The exchange rate snapshot is loaded once, and each exchange rate is only calculated once.
+
+    Arguments:
+        values: Iterable of Money instances, or (amount, currency) pairs
+        currency: The target currency code
+        ignore_missing: If True, values which cannot be converted are returned as None (instead of raising MissingRate)
+
+    Returns:
+        list: Converted Money instances (in the same order as the provided values). Any None values are returned as None.
+    """
+
+    snapshot = get_rates()
+    factors = {}
+    results = []
+
+    for value in values:
+
+        if value is None:
+            results.append(None)
+            continue
+
+        if isinstance(value, Money):
+            amount, source = value.amount, str(value.currency)
+        else:
+            amount, source = value
+
+            if amount is None:
+                results.append(None)
+                continue
+
+        if source not in factors:
+            try:
+                factors[source] = snapshot.get_rate(source, currency)
+            except MissingRate:
+                if not ignore_missing:
+                    raise
+
+                logger.warning(f"No currency conversion rate available for {source} -> {currency}")
+                factors[source] = None
+
+        factor = factors[source]
+
+        results.append(None if factor is None else Money(amount * factor, currency))
+
+    return results
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.19 on 2023-06-06 09:21
+
+import common.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('common', '0019_projectcode_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataExportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('endpoint', models.CharField(help_text='API endpoint which provides the exported data', max_length=250, verbose_name='Endpoint')),
+                ('params', models.JSONField(blank=True, default=dict, help_text='Query parameters for the exported data', verbose_name='Parameters')),
+                ('kwargs', models.JSONField(blank=True, default=dict, help_text='URL keyword arguments for the API endpoint', verbose_name='Keyword Arguments')),
+                ('export_format', models.CharField(help_text='File format for the exported data', max_length=10, verbose_name='Format')),
+                ('total', models.PositiveIntegerField(default=0, help_text='Total number of rows to export', verbose_name='Total')),
+                ('progress', models.PositiveIntegerField(default=0, help_text='Number of rows exported', verbose_name='Progress')),
+                ('complete', models.BooleanField(default=False, help_text='Data export has finished', verbose_name='Complete')),
+                ('error', models.CharField(blank=True, help_text='Error message (if the export failed)', max_length=500, verbose_name='Error')),
+                ('output', models.FileField(blank=True, help_text='Exported data file (generated internally)', null=True, upload_to=common.models.save_data_export, verbose_name='Output')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='data_exports', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 3.2.19 on 2023-06-08 11:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_barcode_index(apps, schema_editor):
+    """Populate the barcode index from any models which have a 'barcode_hash' field"""
+
+    BarcodeIndex = apps.get_model('common', 'BarcodeIndex')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    entries = []
+
+    for model in apps.get_models():
+
+        if model._meta.app_label == 'common':
+            continue
+
+        if 'barcode_hash' not in [field.name for field in model._meta.get_fields()]:
+            continue
+
+        content_type, _created = ContentType.objects.get_or_create(
+            app_label=model._meta.app_label,
+            model=model._meta.model_name,
+        )
+
+        for pk, barcode_hash in model.objects.exclude(barcode_hash='').values_list('pk', 'barcode_hash'):
+            entries.append(BarcodeIndex(content_type=content_type, object_id=pk, barcode_hash=barcode_hash))
+
+    if len(entries) > 0:
+        BarcodeIndex.objects.bulk_create(entries, batch_size=1000)
+        print(f"\nIndexed {len(entries)} barcodes")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('common', '0020_dataexportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BarcodeIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('barcode_hash', models.CharField(db_index=True, help_text='Unique hash of barcode data', max_length=128, verbose_name='Barcode Hash')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+            ],
+            options={
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+        migrations.RunPython(populate_barcode_index, reverse_code=migrations.RunPython.noop),
+    ]
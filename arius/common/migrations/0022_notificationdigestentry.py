@@ -0,0 +1,30 @@
+# Generated by Django 3.2.19 on 2023-06-09 08:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('common', '0021_barcodeindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationDigestEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=250)),
+                ('name', models.CharField(max_length=250)),
+                ('message', models.CharField(blank=True, max_length=250)),
+                ('link', models.CharField(blank=True, max_length=2000)),
+                ('subject', models.CharField(blank=True, max_length=250)),
+                ('html_message', models.TextField(blank=True)),
+                ('creation', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
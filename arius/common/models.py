@@ -12,10 +12,14 @@ import logging
 import math
 import os
 import re
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from enum import Enum
 from secrets import compare_digest
+from types import MappingProxyType
 from typing import Any, Callable, Dict, List, Tuple, TypedDict, Union
 
 from django.apps import apps
@@ -30,17 +34,21 @@ from django.core.exceptions import AppRegistryNotReady, ValidationError
 from django.core.validators import (MaxValueValidator, MinValueValidator,
                                     URLValidator)
 from django.db import models, transaction
-from django.db.utils import IntegrityError, OperationalError
+from django.db.models.signals import post_delete, post_save
+from django.db.utils import (IntegrityError, OperationalError,
+                             ProgrammingError)
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
 from djmoney.contrib.exchange.exceptions import MissingRate
-from djmoney.contrib.exchange.models import convert_money
+from djmoney.contrib.exchange.models import ExchangeBackend, Rate
 from djmoney.settings import CURRENCY_CHOICES
 from rest_framework.exceptions import PermissionDenied
 
 import build.validators
+import common.currency
 import arius.fields
 import arius.helpers
 import arius.models
@@ -52,6 +60,62 @@ from plugin import registry
 
 logger = logging.getLogger('arius')
 
+# Process-local settings snapshots (see BaseAriusSetting.get_snapshot)
+_settings_snapshots = {}
+
+# Process-local record of the shared settings snapshot versions, and when they were last checked
+_settings_snapshot_versions = {}
+
+# Settings snapshots loaded within a database transaction (for the current thread)
+_transaction_snapshots = threading.local()
+
+
+def get_snapshot_store() -> dict:
+    """Return the storage for settings snapshots which are loaded in the current context.
+
+    Snapshots loaded within a database transaction may contain uncommitted data,
+    and are stored separately (for the current thread) from the process-local snapshots.
+    """
+
+    if not transaction.get_connection().in_atomic_block:
+        return _settings_snapshots
+
+    if not hasattr(_transaction_snapshots, 'snapshots'):
+        _transaction_snapshots.snapshots = {}
+
+    return _transaction_snapshots.snapshots
+
+
+def get_snapshot_marker():
+    """Return a marker for a settings snapshot which is loaded in the current context.
+
+    Outside of a transaction, the marker is None.
+    Within a transaction, the marker is registered as an on_commit callback.
+    Django discards the callbacks of any savepoint which is rolled back,
+    so the marker is only pending until the transaction is committed or rolled back.
+    """
+
+    if not transaction.get_connection().in_atomic_block:
+        return None
+
+    def marker():
+        pass
+
+    transaction.on_commit(marker)
+
+    return marker
+
+
+def snapshot_marker_is_valid(marker) -> bool:
+    """Return True if a snapshot stored with the provided marker can be used in the current context."""
+
+    connection = transaction.get_connection()
+
+    if not connection.in_atomic_block:
+        return marker is None
+
+    return marker is not None and any(callback[1] is marker for callback in connection.run_on_commit)
+
 
 class MetaMixin(models.Model):
     """A base class for arius models to include shared meta fields.
@@ -113,6 +177,117 @@ class ProjectCode(arius.models.MetadataMixin, models.Model):
     )
 
 
+def save_data_export(instance, filename):
+    """Save exported data files to the correct subdirectory"""
+
+    filename = os.path.basename(filename)
+    return os.path.join('data_export', filename)
+
+
+class DataExportJob(models.Model):
+    """A DataExportJob is a request to export data from an API list endpoint, which is processed by the background worker.
+
+    Exporting a very large dataset may take several minutes,
+    so the export is performed in the background and the generated file is saved for later download.
+
+    Attributes:
+        user: The user who requested the export
+        created: Date / time when the export was requested
+        endpoint: Import path of the API view class which provides the data
+        params: Query parameters (filters) to apply to the API endpoint
+        kwargs: URL keyword arguments for the API endpoint
+        export_format: File format for the exported data
+        total: Total number of rows to export
+        progress: Number of rows exported so far
+        complete: Set when the export has finished
+        error: Error message (if the export failed)
+        output: Generated data file
+    """
+
+    @staticmethod
+    def get_api_url():
+        """Return the API URL for this model."""
+        return reverse('api-data-export-list')
+
+    def __str__(self):
+        """String representation of a DataExportJob"""
+        return f"{self.endpoint} ({self.export_format})"
+
+    def get_absolute_url(self):
+        """Return the URL for the generated data file"""
+        if self.output:
+            return self.output.url
+        else:
+            return None
+
+    user = models.ForeignKey(
+        User, blank=True, null=True,
+        on_delete=models.SET_NULL,
+        related_name='data_exports',
+        verbose_name=_('User'),
+    )
+
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Created'),
+    )
+
+    endpoint = models.CharField(
+        max_length=250,
+        verbose_name=_('Endpoint'),
+        help_text=_('API endpoint which provides the exported data'),
+    )
+
+    params = models.JSONField(
+        blank=True, default=dict,
+        verbose_name=_('Parameters'),
+        help_text=_('Query parameters for the exported data'),
+    )
+
+    kwargs = models.JSONField(
+        blank=True, default=dict,
+        verbose_name=_('Keyword Arguments'),
+        help_text=_('URL keyword arguments for the API endpoint'),
+    )
+
+    export_format = models.CharField(
+        max_length=10,
+        verbose_name=_('Format'),
+        help_text=_('File format for the exported data'),
+    )
+
+    total = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Total'),
+        help_text=_('Total number of rows to export'),
+    )
+
+    progress = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Progress'),
+        help_text=_('Number of rows exported'),
+    )
+
+    complete = models.BooleanField(
+        default=False,
+        verbose_name=_('Complete'),
+        help_text=_('Data export has finished'),
+    )
+
+    error = models.CharField(
+        max_length=500, blank=True,
+        verbose_name=_('Error'),
+        help_text=_('Error message (if the export failed)'),
+    )
+
+    output = models.FileField(
+        upload_to=save_data_export,
+        blank=True, null=True,
+        verbose_name=_('Output'),
+        help_text=_('Exported data file (generated internally)'),
+    )
+
+
 class SettingsKeyType(TypedDict, total=False):
     """Type definitions for a SettingsKeyType
 
@@ -155,6 +330,12 @@ class BaseAriusSetting(models.Model):
 
     extra_unique_fields: List[str] = []
 
+    # If True, get_setting reads values from a process-local snapshot of all stored settings
+    SNAPSHOT_ENABLED = False
+
+    # Minimum interval (seconds) between checks of the shared snapshot version
+    SNAPSHOT_CHECK_INTERVAL = 1
+
     class Meta:
         """Meta options for BaseAriusSetting -> abstract stops creation of database entry."""
 
@@ -178,6 +359,9 @@ class BaseAriusSetting(models.Model):
         if do_cache:
             self.save_to_cache()
 
+        if self.SNAPSHOT_ENABLED:
+            self.__class__.invalidate_snapshot()
+
         # Execute after_save action
         self._call_settings_function('after_save', args, kwargs)
 
@@ -240,6 +424,139 @@ class BaseAriusSetting(models.Model):
 
         return key.replace(" ", "")
 
+    @classmethod
+    def snapshot_version_key(cls):
+        """Return the cache key used to store the shared snapshot version for this settings class"""
+        return f"{cls.__name__}:snapshot_version"
+
+    @classmethod
+    def get_snapshot_version(cls):
+        """Return the current snapshot version for this settings class.
+
+        The shared version (stored in the cache) is checked at most once every SNAPSHOT_CHECK_INTERVAL seconds.
+        Returns None if the version cannot be determined (in which case the snapshot is not used).
+        """
+
+        now = time.monotonic()
+        state = _settings_snapshot_versions.get(cls.__name__, None)
+
+        if state is not None and now - state[1] < cls.SNAPSHOT_CHECK_INTERVAL:
+            return state[0]
+
+        ckey = cls.snapshot_version_key()
+
+        try:
+            version = cache.get(ckey)
+
+            if version is None:
+                # No version information available (e.g. the cache has been cleared)
+                cache.add(ckey, uuid.uuid4().hex, None)
+                version = cache.get(ckey)
+        except Exception:
+            version = None
+
+        _settings_snapshot_versions[cls.__name__] = (version, now)
+
+        return version
+
+    @classmethod
+    def invalidate_snapshot(cls):
+        """Invalidate the settings snapshot for this class (in this process, and any other process).
+
+        If called within a transaction, the snapshot is invalidated again once the transaction is committed,
+        so that no process retains a snapshot which was loaded before the new values were visible.
+        """
+
+        def invalidate():
+            _settings_snapshot_versions.pop(cls.__name__, None)
+            _settings_snapshots.pop(cls.__name__, None)
+            get_snapshot_store().pop(cls.__name__, None)
+
+            try:
+                cache.set(cls.snapshot_version_key(), uuid.uuid4().hex, None)
+            except Exception:
+                pass
+
+        invalidate()
+
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(invalidate)
+
+    @classmethod
+    def load_snapshot(cls, **filters):
+        """Load all stored setting values (matching the provided filters) with a single query.
+
+        Returns:
+            A read-only mapping of KEY -> (raw) value, or None if the database is not available
+        """
+
+        try:
+            results = cls.objects.filter(**filters).values_list('key', 'value')
+
+            values = {key.upper(): value for key, value in results if key}
+        except (IntegrityError, OperationalError, ProgrammingError):
+            return None
+
+        return MappingProxyType(values)
+
+    @classmethod
+    def get_snapshot(cls, **filters):
+        """Return a read-only snapshot of all stored setting values.
+
+        The snapshot is loaded once, and held until the snapshot version changes (i.e. a setting is saved).
+        A snapshot which is loaded within a transaction is only used until that transaction ends.
+
+        Returns:
+            A read-only mapping of KEY -> (raw) value, or None if the snapshot is not available
+        """
+
+        version = cls.get_snapshot_version()
+
+        if version is None:
+            return None
+
+        snapshots = get_snapshot_store()
+        snapshot = snapshots.get(cls.__name__, None)
+
+        if snapshot is None or snapshot[0] != version or not snapshot_marker_is_valid(snapshot[2]):
+            values = cls.load_snapshot()
+
+            if values is None:
+                return None
+
+            snapshot = (version, values, get_snapshot_marker())
+            snapshots[cls.__name__] = snapshot
+
+        return snapshot[1]
+
+    @classmethod
+    def get_snapshot_value(cls, key, **kwargs):
+        """Lookup the (raw) value of a setting from the settings snapshot.
+
+        Returns:
+            A (found, value) tuple. If found is False, the setting must be looked up via get_setting_object
+        """
+
+        if not cls.SNAPSHOT_ENABLED or not kwargs.get('cache', True):
+            return False, None
+
+        filters = cls.get_filters(**kwargs)
+
+        if set(filters.keys()) != set(cls.extra_unique_fields):
+            return False, None
+
+        try:
+            values = cls.get_snapshot(**filters)
+        except AppRegistryNotReady:
+            values = None
+
+        key = str(key).strip().upper()
+
+        if values is None or key not in values:
+            return False, None
+
+        return True, values[key]
+
     @classmethod
     def get_filters(cls, **kwargs):
         """Enable to filter by other kwargs defined in cls.extra_unique_fields"""
@@ -479,6 +796,23 @@ class BaseAriusSetting(models.Model):
         if backup_value is None:
             backup_value = cls.get_setting_default(key, **kwargs)
 
+        # First, attempt to read the value from the settings snapshot
+        found, value = cls.get_snapshot_value(key, **kwargs)
+
+        if found:
+            validator = cls.get_setting_validator(key, **kwargs)
+
+            if cls.validator_is_bool(validator):
+                value = arius.helpers.str2bool(value)
+
+            if cls.validator_is_int(validator):
+                try:
+                    value = int(value)
+                except (ValueError, TypeError):
+                    value = backup_value
+
+            return value
+
         setting = cls.get_setting_object(key, **kwargs)
 
         if setting:
@@ -883,6 +1217,19 @@ def update_exchange_rates(setting):
     arius.tasks.update_exchange_rates()
 
 
+def rebuild_stock_summary(setting):
+    """Rebuild the part stock summary table when it is enabled"""
+
+    if arius.ready.isImportingData():
+        return
+
+    if not arius.ready.canAppAccessDatabase():
+        return
+
+    if arius.helpers.str2bool(setting.value):
+        arius.tasks.offload_task('part.tasks.rebuild_stock_summary')
+
+
 class AriusSetting(BaseAriusSetting):
     """An AriusSetting object is a key:value pair used for storing single values (e.g. one-off settings values).
 
@@ -896,6 +1243,8 @@ class AriusSetting(BaseAriusSetting):
         verbose_name = "arius Setting"
         verbose_name_plural = "arius Settings"
 
+    SNAPSHOT_ENABLED = True
+
     def save(self, *args, **kwargs):
         """When saving a global setting, check to see if it requires a server restart.
 
@@ -1079,6 +1428,17 @@ class AriusSetting(BaseAriusSetting):
             ]
         },
 
+        'NOTIFICATION_DIGEST_WINDOW': {
+            'name': _('Email Digest Interval'),
+            'description': _('Email notifications sent to the same user within this period are combined into a single digest email (0 = disabled)'),
+            'default': 0,
+            'units': _('minutes'),
+            'validator': [
+                int,
+                MinValueValidator(0),
+            ]
+        },
+
         'BARCODE_ENABLE': {
             'name': _('Barcode Support'),
             'description': _('Enable barcode scanner support'),
@@ -1249,6 +1609,14 @@ class AriusSetting(BaseAriusSetting):
             'default': '',
         },
 
+        'PART_STOCK_SUMMARY': {
+            'name': _('Part Stock Summary'),
+            'description': _('Read part stock quantities from a pre-calculated summary table (improves performance for large databases)'),
+            'default': False,
+            'validator': bool,
+            'after_save': rebuild_stock_summary,
+        },
+
         'PRICING_DECIMAL_PLACES_MIN': {
             'name': _('Minimum Pricing Decimal Places'),
             'description': _('Minimum number of decimal places to display when rendering pricing data'),
@@ -1398,6 +1766,16 @@ class AriusSetting(BaseAriusSetting):
             'validator': bool,
         },
 
+        'REPORT_MAX_CONCURRENT_JOBS': {
+            'name': _('Concurrent Report Jobs'),
+            'description': _('Maximum number of background report jobs which can be rendered at the same time'),
+            'default': 2,
+            'validator': [
+                int,
+                MinValueValidator(1),
+            ],
+        },
+
         'SERIAL_NUMBER_GLOBALLY_UNIQUE': {
             'name': _('Globally Unique Serials'),
             'description': _('Serial numbers for stock items must be globally unique'),
@@ -1688,6 +2066,17 @@ class AriusSetting(BaseAriusSetting):
             'default': 0,
         },
 
+        'STOCKTAKE_REPORT_WORKERS': {
+            'name': _('Stocktake Report Workers'),
+            'description': _('Number of parallel workers used when generating stocktake reports'),
+            'default': 1,
+            'validator': [
+                int,
+                MinValueValidator(1),
+                MaxValueValidator(16),
+            ]
+        },
+
         'STOCKTAKE_DELETE_REPORT_DAYS': {
             'name': _('Report Deletion Interval'),
             'description': _('Stocktake reports will be deleted after specified number of days'),
@@ -2126,6 +2515,38 @@ class AriusUserSetting(BaseAriusSetting):
     typ = 'user'
     extra_unique_fields = ['user']
 
+    SNAPSHOT_ENABLED = True
+
+    @classmethod
+    def get_snapshot(cls, user=None, **kwargs):
+        """Return a read-only snapshot of all stored setting values for the specified user.
+
+        The snapshot is loaded lazily (with a single query), and stored against the User instance.
+        It is therefore retained for the lifetime of that instance (e.g. a single request),
+        or until the end of the transaction in which it was loaded.
+        """
+
+        if user is None or not getattr(user, 'pk', None):
+            return None
+
+        version = cls.get_snapshot_version()
+
+        if version is None:
+            return None
+
+        snapshot = getattr(user, '_user_settings_snapshot', None)
+
+        if snapshot is None or snapshot[0] != version or not snapshot_marker_is_valid(snapshot[2]):
+            values = cls.load_snapshot(user=user)
+
+            if values is None:
+                return None
+
+            snapshot = (version, values, get_snapshot_marker())
+            user._user_settings_snapshot = snapshot
+
+        return snapshot[1]
+
     key = models.CharField(
         max_length=50,
         blank=False,
@@ -2146,6 +2567,14 @@ class AriusUserSetting(BaseAriusSetting):
         return self.__class__.get_setting(self.key, user=self.user)
 
 
+@receiver(post_delete, sender=AriusSetting, dispatch_uid='global_setting_post_delete')
+@receiver(post_delete, sender=AriusUserSetting, dispatch_uid='user_setting_post_delete')
+def after_delete_setting(sender, instance, **kwargs):
+    """Callback when a setting is deleted: invalidate the settings snapshot"""
+
+    sender.invalidate_snapshot()
+
+
 class PriceBreak(MetaMixin):
     """Represents a PriceBreak model."""
 
@@ -2178,7 +2607,7 @@ class PriceBreak(MetaMixin):
             currency_code: The currency code to convert to (e.g "USD" or "AUD")
         """
         try:
-            converted = convert_money(self.price, currency_code)
+            converted = common.currency.convert_money(self.price, currency_code)
         except MissingRate:
             logger.warning(f"No currency conversion rate available for {self.price_currency} -> {currency_code}")
             return self.price.amount
@@ -2256,6 +2685,16 @@ def get_price(instance, quantity, moq=True, multiples=True, currency=None, break
         return None
 
 
+@receiver(post_save, sender=Rate, dispatch_uid='exchange_rate_post_save')
+@receiver(post_delete, sender=Rate, dispatch_uid='exchange_rate_post_delete')
+@receiver(post_save, sender=ExchangeBackend, dispatch_uid='exchange_backend_post_save')
+@receiver(post_delete, sender=ExchangeBackend, dispatch_uid='exchange_backend_post_delete')
+def after_change_exchange_rate(sender, instance, **kwargs):
+    """Callback when exchange rate information is changed: discard the exchange rate snapshot"""
+
+    common.currency.invalidate_rates()
+
+
 class ColorTheme(models.Model):
     """Color Theme Setting."""
     name = models.CharField(max_length=20,
@@ -2653,6 +3092,64 @@ class NotificationMessage(models.Model):
         return naturaltime(self.creation)
 
 
+class NotificationDigestEntry(models.Model):
+    """A NotificationDigestEntry is an email notification which is waiting to be delivered to a particular user.
+
+    Entries are collected for the duration of the NOTIFICATION_DIGEST_WINDOW setting,
+    after which all pending entries for a user are delivered in a single email.
+
+    Attributes:
+        user: The user who will receive the notification
+        category: The notification category e.g. 'part.notify_low_stock'
+        name: Name (title) of the notification
+        message: Notification message
+        link: Link to the notification target (optional)
+        subject: Subject for the email, if it is delivered on its own
+        html_message: Rendered email content, if it is delivered on its own
+        creation: The time the notification was queued
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+
+    category = models.CharField(
+        max_length=250,
+        blank=False,
+    )
+
+    name = models.CharField(
+        max_length=250,
+        blank=False,
+    )
+
+    message = models.CharField(
+        max_length=250,
+        blank=True,
+    )
+
+    link = models.CharField(
+        max_length=2000,
+        blank=True,
+    )
+
+    subject = models.CharField(
+        max_length=250,
+        blank=True,
+    )
+
+    html_message = models.TextField(
+        blank=True,
+    )
+
+    creation = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+    )
+
+
 class NewsFeedEntry(models.Model):
     """A NewsFeedEntry represents an entry on the RSS/Atom feed that is generated for arius news.
 
@@ -2726,3 +3223,277 @@ class NotesImage(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
 
     date = models.DateTimeField(auto_now_add=True)
+
+
+# Maximum number of entries in the (process-local) barcode lookup cache
+BARCODE_CACHE_SIZE = 1000
+
+# Map of barcode hash -> (content type ID, object ID)
+_barcode_cache = OrderedDict()
+_barcode_cache_lock = threading.Lock()
+
+
+class BarcodeIndex(models.Model):
+    """Index of the third-party barcodes assigned to any model which implements the AriusBarcodeMixin.
+
+    This allows a scanned barcode to be resolved with a single (indexed) database lookup,
+    rather than querying each barcode-enabled model in turn.
+
+    The index is maintained whenever a barcode is assigned to (or removed from) a model instance.
+
+    Attributes:
+        content_type: The type of the object which the barcode is assigned to
+        object_id: The ID of the object which the barcode is assigned to
+        barcode_hash: Hash of the assigned barcode data
+    """
+
+    class Meta:
+        """Metaclass options for the BarcodeIndex model"""
+        unique_together = [
+            ('content_type', 'object_id'),
+        ]
+
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+
+    object_id = models.PositiveIntegerField()
+
+    barcode_hash = models.CharField(
+        max_length=128, db_index=True,
+        verbose_name=_('Barcode Hash'),
+        help_text=_('Unique hash of barcode data'),
+    )
+
+    @staticmethod
+    def get_cached(barcode_hash):
+        """Return the cached (content type ID, object ID) entry for the provided barcode hash"""
+
+        with _barcode_cache_lock:
+            entry = _barcode_cache.get(barcode_hash, None)
+
+            if entry is not None:
+                _barcode_cache.move_to_end(barcode_hash)
+
+            return entry
+
+    @staticmethod
+    def set_cached(barcode_hash, entry=None):
+        """Update (or remove) the cached entry for the provided barcode hash"""
+
+        with _barcode_cache_lock:
+            if entry is None:
+                _barcode_cache.pop(barcode_hash, None)
+                return
+
+            _barcode_cache[barcode_hash] = entry
+            _barcode_cache.move_to_end(barcode_hash)
+
+            while len(_barcode_cache) > BARCODE_CACHE_SIZE:
+                _barcode_cache.popitem(last=False)
+
+    @staticmethod
+    def clear_cache():
+        """Clear the barcode lookup cache (for the current process)"""
+
+        with _barcode_cache_lock:
+            _barcode_cache.clear()
+
+    @classmethod
+    def update_instance(cls, instance):
+        """Update the index entry for the provided model instance"""
+
+        content_type = ContentType.objects.get_for_model(instance.__class__)
+
+        if instance.barcode_hash:
+            cls.objects.update_or_create(
+                content_type=content_type,
+                object_id=instance.pk,
+                defaults={'barcode_hash': instance.barcode_hash},
+            )
+
+            cls.set_cached(instance.barcode_hash, (content_type.pk, instance.pk))
+        else:
+            cls.remove_instance(instance)
+
+    @classmethod
+    def remove_instance(cls, instance):
+        """Remove the index entry for the provided model instance"""
+
+        content_type = ContentType.objects.get_for_model(instance.__class__)
+
+        cls.objects.filter(content_type=content_type, object_id=instance.pk).delete()
+
+    @classmethod
+    def lookup(cls, barcode_hash, model_classes=None):
+        """Find the model instance which has the provided barcode assigned.
+
+        Cached entries are validated against the barcode hash of the matched object,
+        so any stale entries (e.g. a barcode unassigned by another process) are ignored.
+
+        If the barcode is not found in the index (e.g. it was written via a bulk update),
+        each model is queried directly, and the index is updated with any match.
+
+        Arguments:
+            barcode_hash: Hash of the scanned barcode data
+            model_classes: Optional list of model classes to match against (in order of preference)
+
+        Returns:
+            The matching model instance, or None if no match is found
+        """
+
+        if not barcode_hash:
+            return None
+
+        def get_instance(content_type_id, object_id):
+            """Return the matching object, if it (still) has the provided barcode assigned"""
+
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+
+            if model is None or (model_classes is not None and model not in model_classes):
+                return None
+
+            return model.objects.filter(pk=object_id, barcode_hash=barcode_hash).first()
+
+        if (entry := cls.get_cached(barcode_hash)) is not None:
+            if (instance := get_instance(*entry)) is not None:
+                return instance
+
+            cls.set_cached(barcode_hash, None)
+
+        entries = list(cls.objects.filter(barcode_hash=barcode_hash).order_by('pk').values_list('content_type', 'object_id'))
+
+        if model_classes is not None and len(entries) > 1:
+            # Respect the order of the provided models
+            order = [ContentType.objects.get_for_model(model).pk for model in model_classes]
+            entries.sort(key=lambda x: order.index(x[0]) if x[0] in order else len(order))
+
+        for entry in entries:
+            if (instance := get_instance(*entry)) is not None:
+                cls.set_cached(barcode_hash, entry)
+                return instance
+
+        # Fall back to querying each model directly
+        for model in cls.get_barcode_models(model_classes):
+            if (instance := model.lookup_barcode(barcode_hash)) is not None:
+                cls.update_instance(instance)
+                return instance
+
+        return None
+
+    @classmethod
+    def lookup_batch(cls, barcode_hashes, model_classes=None):
+        """Find the model instances which have the provided barcodes assigned.
+
+        The index is queried once (per chunk of barcodes), and each matched model type is queried once.
+        Any barcodes which are not found in the index are then looked up against each model directly.
+
+        Arguments:
+            barcode_hashes: Iterable of barcode hashes
+            model_classes: Optional list of model classes to match against (in order of preference)
+
+        Returns:
+            dict: Map of barcode hash -> matching model instance (unmatched barcodes are not included)
+        """
+
+        barcode_hashes = list(set(h for h in barcode_hashes if h))
+
+        # Map of barcode hash -> list of (content type ID, object ID) entries
+        entries = {}
+
+        for idx in range(0, len(barcode_hashes), 500):
+            chunk = barcode_hashes[idx:idx + 500]
+
+            for barcode_hash, content_type_id, object_id in cls.objects.filter(barcode_hash__in=chunk).order_by('pk').values_list('barcode_hash', 'content_type', 'object_id'):
+                entries.setdefault(barcode_hash, []).append((content_type_id, object_id))
+
+        # Group the matched objects by model type
+        object_ids = {}
+
+        for options in entries.values():
+            for content_type_id, object_id in options:
+                object_ids.setdefault(content_type_id, set()).add(object_id)
+
+        instances = {}
+
+        for content_type_id, ids in object_ids.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+
+            if model is None or (model_classes is not None and model not in model_classes):
+                continue
+
+            for instance in model.objects.filter(pk__in=ids):
+                instances[(content_type_id, instance.pk)] = instance
+
+        order = [ContentType.objects.get_for_model(model).pk for model in model_classes or []]
+
+        results = {}
+
+        for barcode_hash, options in entries.items():
+
+            # Respect the order of the provided models
+            options.sort(key=lambda x: order.index(x[0]) if x[0] in order else len(order))
+
+            for entry in options:
+                instance = instances.get(entry, None)
+
+                # Ignore any stale index entries
+                if instance is not None and instance.barcode_hash == barcode_hash:
+                    results[barcode_hash] = instance
+                    cls.set_cached(barcode_hash, entry)
+                    break
+
+        # Fall back to querying each model directly (for any unmatched barcodes)
+        missing = [h for h in barcode_hashes if h not in results]
+
+        for model in cls.get_barcode_models(model_classes):
+            for idx in range(0, len(missing), 500):
+                chunk = [h for h in missing[idx:idx + 500] if h not in results]
+
+                if not chunk:
+                    continue
+
+                for instance in model.objects.filter(barcode_hash__in=chunk).order_by('pk'):
+                    if instance.barcode_hash not in results:
+                        results[instance.barcode_hash] = instance
+                        cls.update_instance(instance)
+
+        return results
+
+    @staticmethod
+    def get_barcode_models(model_classes=None):
+        """Return the list of models to query directly when a barcode is not found in the index"""
+
+        if model_classes is not None:
+            return list(model_classes)
+
+        from arius.helpers_model import getModelsWithMixin
+        from arius.models import AriusBarcodeMixin
+
+        return getModelsWithMixin(AriusBarcodeMixin)
+
+    @classmethod
+    def rebuild(cls):
+        """Rebuild the barcode index for all barcode-enabled models.
+
+        Returns:
+            int: The number of indexed barcodes
+        """
+
+        entries = []
+
+        for model in cls.get_barcode_models():
+            content_type = ContentType.objects.get_for_model(model)
+
+            for pk, barcode_hash in model.objects.exclude(barcode_hash='').values_list('pk', 'barcode_hash'):
+                entries.append(cls(content_type=content_type, object_id=pk, barcode_hash=barcode_hash))
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(entries, batch_size=1000)
+
+        cls.clear_cache()
+
+        return len(entries)
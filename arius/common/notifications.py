@@ -1,14 +1,20 @@
 """Base classes and functions for notifications."""
 
 import logging
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import timedelta
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
 import common.models
+import arius.email
 import arius.helpers
 from arius.ready import isImportingData
 from plugin import registry
@@ -235,7 +241,7 @@ IGNORED_NOTIFICATION_CLS = {SingleNotificationMethod, BulkNotificationMethod, }
 storage = MethodStorageClass()
 
 
-class UIMessageNotification(SingleNotificationMethod):
+class UIMessageNotification(BulkNotificationMethod):
     """Delivery method for sending specific users notifications in the notification pain in the web UI."""
 
     METHOD_NAME = 'ui_message'
@@ -245,16 +251,19 @@ class UIMessageNotification(SingleNotificationMethod):
 
         return [target for target in self.targets if target.is_active]
 
-    def send(self, target):
-        """Send a UI notification to a user."""
-        common.models.NotificationMessage.objects.create(
-            target_object=self.obj,
-            source_object=target,
-            user=target,
-            category=self.category,
-            name=self.context['name'],
-            message=self.context['message'],
-        )
+    def send_bulk(self):
+        """Send a UI notification to each target user, with a single database query."""
+        common.models.NotificationMessage.objects.bulk_create([
+            common.models.NotificationMessage(
+                target_object=self.obj,
+                source_object=target,
+                user=target,
+                category=self.category,
+                name=self.context['name'],
+                message=self.context['message'],
+            ) for target in self.targets
+        ])
+
         return True
 
 
@@ -310,6 +319,58 @@ class AriusNotificationBodies:
     )
 
 
+def resolve_target_users(targets, exclude=None) -> set:
+    """Convert a list of notification targets into a set of users.
+
+    Targets may be User, Group or Owner instances.
+    All users are fetched with a single database query, rather than a query per group.
+
+    Args:
+        targets: Iterable of User, Group or Owner instances
+        exclude: Iterable of User instances which should not be notified (optional)
+
+    Returns:
+        set: The User instances which should be notified
+    """
+    user_model = get_user_model()
+    user_type = ContentType.objects.get_for_model(user_model)
+    group_type = ContentType.objects.get_for_model(Group)
+
+    user_ids = set()
+    group_ids = set()
+
+    for target in targets or []:
+        if target is None:
+            continue
+        # User instance is provided
+        elif isinstance(target, user_model):
+            user_ids.add(target.pk)
+        # Group instance is provided
+        elif isinstance(target, Group):
+            group_ids.add(target.pk)
+        # Owner instance (either 'user' or 'group' is provided)
+        elif isinstance(target, Owner):
+            if target.owner_type_id == user_type.pk:
+                user_ids.add(target.owner_id)
+            elif target.owner_type_id == group_type.pk:
+                group_ids.add(target.owner_id)
+        # Unhandled type
+        else:
+            logger.error(f"Unknown target passed to trigger_notification method: {target}")
+
+    if not user_ids and not group_ids:
+        return set()
+
+    users = user_model.objects.filter(Q(pk__in=user_ids) | Q(groups__pk__in=group_ids))
+
+    exclude_ids = [user.pk for user in exclude or [] if user is not None]
+
+    if exclude_ids:
+        users = users.exclude(pk__in=exclude_ids)
+
+    return set(users.distinct())
+
+
 def trigger_notification(obj, category=None, obj_ref='pk', **kwargs):
     """Send out a notification."""
     targets = kwargs.get('targets', None)
@@ -344,39 +405,13 @@ def trigger_notification(obj, category=None, obj_ref='pk', **kwargs):
 
     logger.info(f"Gathering users for notification '{category}'")
 
-    if target_exclude is None:
-        target_exclude = set()
-
     # Collect possible targets
     if not targets:
         targets = target_fnc(*target_args, **target_kwargs)
 
     # Convert list of targets to a list of users
     # (targets may include 'owner' or 'group' classes)
-    target_users = set()
-
-    if targets:
-        for target in targets:
-            if target is None:
-                continue
-            # User instance is provided
-            elif isinstance(target, get_user_model()):
-                if target not in target_exclude:
-                    target_users.add(target)
-            # Group instance is provided
-            elif isinstance(target, Group):
-                for user in get_user_model().objects.filter(groups__name=target.name):
-                    if user not in target_exclude:
-                        target_users.add(user)
-            # Owner instance (either 'user' or 'group' is provided)
-            elif isinstance(target, Owner):
-                for owner in target.get_related_owners(include_group=False):
-                    user = owner.owner
-                    if user not in target_exclude:
-                        target_users.add(user)
-            # Unhandled type
-            else:
-                logger.error(f"Unknown target passed to trigger_notification method: {target}")
+    target_users = resolve_target_users(targets, exclude=target_exclude)
 
     if target_users:
         logger.info(f"Sending notification '{category}' for '{str(obj)}'")
@@ -468,3 +503,116 @@ def deliver_notification(cls: NotificationMethod, obj, category: str, targets, c
         logger.info(f"Notified {success_count} users via '{method.METHOD_NAME}' for notification '{category}' for '{str(obj)}' successfully")
         if not success:
             logger.info("There were some problems")
+
+
+def email_subject(subject: str) -> str:
+    """Prefix the 'instance title' to an email subject (if one is defined)."""
+    instance_title = common.models.AriusSetting.get_setting('ARIUS_INSTANCE')
+
+    if instance_title:
+        return f'[{instance_title}] {subject}'
+
+    return str(subject)
+
+
+def get_digest_window() -> int:
+    """Return the email digest window (in minutes), or 0 if email digests are disabled."""
+    try:
+        return int(common.models.AriusSetting.get_setting('NOTIFICATION_DIGEST_WINDOW', 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def queue_email_digest(users, category: str, context: dict, subject: str, html_message: str):
+    """Queue an email notification for delivery as part of an email digest.
+
+    The notification is delivered the next time send_email_digests is run after the digest window has elapsed.
+
+    Args:
+        users: Iterable of User instances (or primary keys) to notify
+        category: Notification category
+        context: Notification context (must contain 'name' and 'message' items)
+        subject: Email subject, used if the notification is delivered on its own
+        html_message: Rendered email content, used if the notification is delivered on its own
+    """
+    common.models.NotificationDigestEntry.objects.bulk_create([
+        common.models.NotificationDigestEntry(
+            user_id=getattr(user, 'pk', user),
+            category=category,
+            name=str(context['name'])[:250],
+            message=str(context.get('message', ''))[:250],
+            link=str(context.get('link', ''))[:2000],
+            subject=str(subject)[:250],
+            html_message=html_message,
+        ) for user in users
+    ])
+
+
+def send_email_digests(force: bool = False) -> int:
+    """Deliver any queued email notifications for which the digest window has elapsed.
+
+    - A user with a single queued notification receives the original email
+    - A user with multiple queued notifications receives a single digest email
+    - Identical emails for different users are sent together, rather than once per user
+
+    Args:
+        force: If True, deliver all queued notifications regardless of the digest window
+
+    Returns:
+        int: The number of emails which were sent
+    """
+    from allauth.account.models import EmailAddress
+
+    entries = common.models.NotificationDigestEntry.objects.all()
+
+    if not force:
+        # Deliver notifications for any user whose oldest queued notification is outside the window
+        cutoff = now() - timedelta(minutes=get_digest_window())
+        due = entries.filter(creation__lte=cutoff).values_list('user', flat=True).distinct()
+        entries = entries.filter(user__in=list(due))
+
+    entries = list(entries.order_by('creation', 'pk'))
+
+    if not entries:
+        return 0
+
+    user_entries = defaultdict(list)
+
+    for entry in entries:
+        user_entries[entry.user_id].append(entry)
+
+    addresses = defaultdict(list)
+
+    for user_id, email in EmailAddress.objects.filter(user__in=user_entries.keys(), user__is_active=True).values_list('user', 'email'):
+        addresses[user_id].append(email)
+
+    # Single notifications are grouped by content, so each distinct email is only sent once
+    single = defaultdict(list)
+    digests = []
+
+    for user_id, items in user_entries.items():
+        if not addresses[user_id]:
+            continue
+
+        if len(items) == 1:
+            single[(items[0].subject, items[0].html_message)].extend(addresses[user_id])
+        else:
+            digests.append((addresses[user_id], items))
+
+    for (subject, html_message), emails in single.items():
+        arius.email.send_email(subject, '', emails, html_message=html_message)
+
+    if digests:
+        subject = email_subject(_('Notification Digest'))
+
+        for emails, items in digests:
+            html_message = render_to_string('email/notification_digest.html', {
+                'entries': items,
+                'count': len(items),
+            })
+
+            arius.email.send_email(f'{subject} ({len(items)})', '', emails, html_message=html_message)
+
+    common.models.NotificationDigestEntry.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+
+    return len(single) + len(digests)
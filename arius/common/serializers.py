@@ -9,7 +9,8 @@ from rest_framework import serializers
 import common.models as common_models
 from arius.helpers import get_objectreference
 from arius.helpers_model import construct_absolute_url
-from arius.serializers import (AriusImageSerializerField,
+from arius.serializers import (AriusAttachmentSerializerField,
+                               AriusImageSerializerField,
                                AriusModelSerializer)
 
 
@@ -271,6 +272,30 @@ class ProjectCodeSerializer(AriusModelSerializer):
         ]
 
 
+class DataExportJobSerializer(AriusModelSerializer):
+    """Serializer for the DataExportJob model."""
+
+    class Meta:
+        """Meta options for DataExportJobSerializer."""
+
+        model = common_models.DataExportJob
+        fields = [
+            'pk',
+            'user',
+            'created',
+            'export_format',
+            'total',
+            'progress',
+            'complete',
+            'error',
+            'output',
+        ]
+
+        read_only_fields = fields
+
+    output = AriusAttachmentSerializerField(read_only=True, allow_null=True)
+
+
 class FlagSerializer(serializers.Serializer):
     """Serializer for feature flags."""
 
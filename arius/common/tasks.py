@@ -2,12 +2,16 @@
 
 import logging
 import os
+import re
+import tempfile
 from datetime import datetime, timedelta
 
 from django.conf import settings
 from django.core.exceptions import AppRegistryNotReady
+from django.core.files import File
 from django.db.utils import IntegrityError, OperationalError
 from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
 import feedparser
 
@@ -138,3 +142,116 @@ def delete_old_notes_images():
         if not found:
             logger.info(f"Deleting note {image} - image file not linked to a note")
             os.remove(os.path.join(notes_dir, image))
+
+
+def run_data_export(job_id: int):
+    """Generate the data file for a DataExportJob.
+
+    The queryset is reconstructed by applying the saved query parameters to the original API endpoint,
+    and the data are then exported exactly as if downloaded directly from that endpoint.
+    """
+
+    import arius.admin
+    import arius.api
+    from common.models import DataExportJob
+    from common.notifications import trigger_notification
+
+    try:
+        job = DataExportJob.objects.get(pk=job_id)
+    except DataExportJob.DoesNotExist:
+        logger.error(f"run_data_export: DataExportJob <{job_id}> does not exist")
+        return
+
+    logger.info(f"Running data export job <{job_id}> for '{job.endpoint}'")
+
+    def update_progress(count):
+        """Save the number of exported rows"""
+        DataExportJob.objects.filter(pk=job.pk).update(progress=count)
+
+    token = arius.admin.export_progress_callback.set(update_progress)
+
+    try:
+        # Construct the API view, with the provided query parameters
+        view = arius.api.construct_api_view(job.endpoint, job.user, params=job.params, kwargs=job.kwargs)
+
+        queryset = view.filter_queryset(view.get_queryset())
+
+        job.total = queryset.count()
+        job.save()
+
+        response = view.download_queryset(queryset, job.export_format)
+
+        # Extract the filename provided by the endpoint
+        match = re.search(r'filename="?([^";]+)"?', response.get('Content-Disposition', ''))
+        filename = match.groups()[0] if match else f"Arius_Export.{job.export_format}"
+
+        content = response.streaming_content if response.streaming else [response.content]
+
+        with tempfile.TemporaryFile() as output:
+            for chunk in content:
+                output.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+
+            output.seek(0)
+
+            job.refresh_from_db()
+            job.output.save(filename, File(output), save=False)
+
+        job.complete = True
+        job.save()
+
+    except Exception as exc:
+        logger.exception(f"Data export job <{job_id}> failed: {exc}")
+
+        job.error = str(exc)[:500]
+        job.complete = True
+        job.save()
+
+    finally:
+        arius.admin.export_progress_callback.reset(token)
+
+    if job.user:
+        trigger_notification(
+            job,
+            category='data_export',
+            context={
+                'name': _('Data Export Failed') if job.error else _('Data Export Available'),
+                'message': job.error if job.error else _('Exported data file is available for download'),
+            },
+            targets=[job.user],
+        )
+
+
+@scheduled_task(ScheduledTask.DAILY)
+def delete_old_data_exports():
+    """Remove old data export jobs (and the associated files) from the database.
+
+    Anything older than 30 days is removed
+    """
+    try:
+        from common.models import DataExportJob
+    except AppRegistryNotReady:  # pragma: no cover
+        logger.info("Could not perform 'delete_old_data_exports' - App registry not ready")
+        return
+
+    before = timezone.now() - timedelta(days=30)
+
+    for job in DataExportJob.objects.filter(created__lte=before):
+        if job.output:
+            job.output.delete(save=False)
+
+        job.delete()
+
+
+@scheduled_task(ScheduledTask.MINUTES, 1)
+def send_notification_digests():
+    """Deliver queued email notifications for which the digest window has elapsed."""
+    try:
+        from common.notifications import send_email_digests
+    except AppRegistryNotReady:  # pragma: no cover
+        logger.info("Could not perform 'send_notification_digests' - App registry not ready")
+        return
+
+    n = send_email_digests()
+
+    if n > 0:
+        logger.info(f"Sent {n} notification digest emails")
@@ -1,10 +1,17 @@
 """Tests for basic notification methods and functions in arius."""
 
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 import plugin.templatetags.plugin_extras as plugin_tags
 from common.notifications import (BulkNotificationMethod, NotificationMethod,
-                                  SingleNotificationMethod, storage)
+                                  SingleNotificationMethod,
+                                  resolve_target_users, storage)
 from part.test_part import BaseNotificationIntegrationTest
 from plugin.models import NotificationUserSetting
+from users.models import Owner
 
 
 class BaseNotificationTests(BaseNotificationIntegrationTest):
@@ -74,6 +81,38 @@ class BaseNotificationTests(BaseNotificationIntegrationTest):
 
         self._notification_run(ErrorImplementation)
 
+    def test_resolve_targets(self):
+        """Test that notification targets are resolved to a set of users."""
+
+        user_model = get_user_model()
+
+        group = Group.objects.create(name='notification_group')
+        users = [user_model.objects.create_user(f'notify_{idx}', f'notify_{idx}@test.com', 'password') for idx in range(5)]
+
+        for user in users[:3]:
+            user.groups.add(group)
+
+        # Group, owner and user targets, with overlapping members
+        targets = [
+            group,
+            Owner.get_owner(users[3]),
+            Owner.get_owner(self.group),
+            users[0],
+            None,
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            result = resolve_target_users(targets, exclude=[users[1]])
+
+        self.assertLess(len(queries), 3)
+        self.assertEqual(result, {users[0], users[2], users[3], self.user})
+
+        # Null entries in the exclusion list are ignored
+        self.assertEqual(resolve_target_users([users[0]], exclude=[None]), {users[0]})
+
+        self.assertEqual(resolve_target_users([]), set())
+        self.assertEqual(resolve_target_users(None), set())
+
 
 class BulkNotificationMethodTests(BaseNotificationIntegrationTest):
     """Tests for BulkNotificationMethod classes specifically.
@@ -4,6 +4,7 @@ import io
 import json
 import time
 from datetime import timedelta
+from decimal import Decimal
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
@@ -212,8 +213,10 @@ class SettingsTest(AriusTestCase):
         self.assertIsNone(cache.get(cache_key))
 
         # First request should set cache
-        val = AriusSetting.get_setting(key)
+        # Note: get_setting reads from the settings snapshot, and does not use the cache
+        val = AriusSetting.get_setting_object(key).value
         self.assertEqual(cache.get(cache_key).value, val)
+        self.assertEqual(AriusSetting.get_setting(key), val)
 
         for val in ['A', '{{ part.IPN }}', 'C']:
             # Check that the cached value is updated whenever the setting is saved
@@ -249,6 +252,43 @@ class SettingsTest(AriusTestCase):
             value = AriusUserSetting.get_setting(key, user=user)
             self.assertEqual(value, user.pk)
 
+    def test_settings_snapshot(self):
+        """Test that settings values are read from the settings snapshot"""
+
+        AriusSetting.set_setting('PART_NAME_FORMAT', 'ABC', None)
+        AriusSetting.set_setting('PART_ENABLE_REVISION', False, None)
+        AriusSetting.set_setting('STOCKTAKE_AUTO_DAYS', 5, None)
+
+        # The snapshot is loaded with a single query
+        with self.assertNumQueries(1):
+            for _idx in range(10):
+                self.assertEqual(AriusSetting.get_setting('PART_NAME_FORMAT'), 'ABC')
+                self.assertEqual(AriusSetting.get_setting('PART_ENABLE_REVISION'), False)
+                self.assertEqual(AriusSetting.get_setting('STOCKTAKE_AUTO_DAYS'), 5)
+
+        # Saving a setting invalidates the snapshot
+        AriusSetting.set_setting('PART_NAME_FORMAT', 'XYZ', None)
+        self.assertEqual(AriusSetting.get_setting('PART_NAME_FORMAT'), 'XYZ')
+
+        # Deleting a setting invalidates the snapshot
+        AriusSetting.objects.filter(key='PART_NAME_FORMAT').delete()
+        self.assertNotIn('PART_NAME_FORMAT', AriusSetting.get_snapshot())
+        self.assertIn('PART_ENABLE_REVISION', AriusSetting.get_snapshot())
+
+        # User settings are loaded (once) for each user
+        user = get_user_model().objects.create(username='snapshot', password='hunter42')
+        AriusUserSetting.set_setting('SEARCH_PREVIEW_RESULTS', 25, None, user=user)
+        AriusUserSetting.set_setting('SEARCH_HIDE_INACTIVE_PARTS', True, None, user=user)
+
+        with self.assertNumQueries(1):
+            for _idx in range(10):
+                self.assertEqual(AriusUserSetting.get_setting('SEARCH_PREVIEW_RESULTS', user=user), 25)
+                self.assertEqual(AriusUserSetting.get_setting('SEARCH_HIDE_INACTIVE_PARTS', user=user), True)
+
+        # Settings can still be read directly from the database
+        AriusUserSetting.objects.filter(user=user, key='SEARCH_PREVIEW_RESULTS').update(value='10')
+        self.assertEqual(AriusUserSetting.get_setting('SEARCH_PREVIEW_RESULTS', user=user, cache=False), 10)
+
 
 class GlobalSettingsApiTest(AriusAPITestCase):
     """Tests for the global settings API."""
@@ -979,6 +1019,54 @@ class CurrencyAPITests(AriusAPITestCase):
         raise TimeoutError("Could not refresh currency exchange data after 5 attempts")
 
 
+class CurrencyConversionTests(AriusTestCase):
+    """Unit tests for the exchange rate snapshot"""
+
+    def test_conversion(self):
+        """Test currency conversion using the exchange rate snapshot"""
+
+        from djmoney.contrib.exchange.exceptions import MissingRate
+        from djmoney.contrib.exchange.models import Rate
+        from djmoney.money import Money
+
+        import common.currency
+
+        # No exchange rate data available
+        with self.assertRaises(MissingRate):
+            common.currency.convert_money(Money(100, 'USD'), 'AUD')
+
+        self.generate_exchange_rates()
+
+        # Exchange rates are loaded only once
+        with self.assertNumQueries(2):
+            self.assertEqual(common.currency.convert_money(Money(100, 'USD'), 'AUD'), Money(150, 'AUD'))
+            self.assertAlmostEqual(float(common.currency.convert_money(Money(170, 'CAD'), 'AUD').amount), 150)
+            self.assertAlmostEqual(float(common.currency.convert_money(Money(150, 'AUD'), 'USD').amount), 100)
+
+        # Batch conversion
+        with self.assertNumQueries(0):
+            results = common.currency.convert_values(
+                [Money(100, 'USD'), (Decimal(10), 'AUD'), None, Money(3, 'NZD')],
+                'USD',
+                ignore_missing=True
+            )
+
+        self.assertEqual(results[0], Money(100, 'USD'))
+        self.assertAlmostEqual(float(results[1].amount), 6.666667, places=5)
+        self.assertIsNone(results[2])
+        self.assertIsNone(results[3])
+
+        with self.assertRaises(MissingRate):
+            common.currency.convert_values([Money(3, 'NZD')], 'USD')
+
+        # Changing an exchange rate invalidates the snapshot
+        rate = Rate.objects.get(currency='AUD')
+        rate.value = 2
+        rate.save()
+
+        self.assertEqual(common.currency.convert_money(Money(100, 'USD'), 'AUD'), Money(200, 'AUD'))
+
+
 class NotesImageTest(AriusAPITestCase):
     """Tests for uploading images to be used in markdown notes."""
 
@@ -192,84 +192,58 @@ class LabelPrintMixin(LabelFilterMixin):
 
             raise ValidationError('No valid objects provided to label template')
 
-        outputs = []
-
         # In debug mode, generate single HTML output, rather than PDF
         debug_mode = common.models.AriusSetting.get_setting('REPORT_DEBUG_MODE', cache=False)
 
-        label_name = "label.pdf"
-
-        label_names = []
-        label_instances = []
-
-        # Merge one or more PDF files into a single download
-        for item in items_to_print:
-            label = self.get_object()
-            label.object_to_print = item
-
-            label_name = label.generate_filename(request)
-
-            label_names.append(label_name)
-            label_instances.append(label)
-
-            if debug_mode and plugin is None:
-                # Note that debug mode is only supported when not using a plugin
-                outputs.append(label.render_as_string(request))
-            else:
-                outputs.append(label.render(request))
-
-        if not label_name.endswith(".pdf"):
-            label_name += ".pdf"
+        label_instance = self.get_object()
 
         if plugin is not None:
             """Label printing is to be handled by a plugin, rather than being exported to PDF.
 
             In this case, we do the following:
 
-            - Individually generate each label, exporting as an image file
-            - Pass all the images through to the label printing plugin
+            - Render each label (using a single compiled template) and export to PDF
+            - Pass all the labels through to the label printing plugin, as a single background task
             - Return a JSON response indicating that the printing has been offloaded
             """
 
-            for idx, output in enumerate(outputs):
-                """For each output, we generate a temporary image file, which will then get sent to the printer."""
-
-                # Generate PDF data for the label
-                pdf = output.get_document().write_pdf()
-
-                # Offload a background task to print the provided label
-                offload_task(
-                    plugin_label.print_label,
-                    plugin.plugin_slug(),
-                    pdf,
-                    filename=label_names[idx],
-                    label_instance=label_instances[idx],
-                    user=request.user,
-                )
+            labels = []
+
+            for item, filename, html in label_instance.render_items(request, items_to_print):
+                labels.append({
+                    'pdf_data': label_instance.render_html_to_pdf(request, html),
+                    'filename': filename,
+                    'object_to_print': item,
+                })
+
+            # Offload a single background task to print all the provided labels
+            offload_task(
+                plugin_label.print_labels,
+                plugin.plugin_slug(),
+                labels,
+                label_instance=label_instance,
+                user=request.user,
+            )
 
             return JsonResponse({
                 'plugin': plugin.plugin_slug(),
-                'labels': label_names,
+                'labels': [lbl['filename'] for lbl in labels],
             })
 
         elif debug_mode:
-            """Contatenate all rendered templates into a single HTML string, and return the string as a HTML response."""
+            """Concatenate all rendered templates into a single HTML string, and return the string as a HTML response."""
 
-            html = "\n".join(outputs)
+            labels = label_instance.render_items(request, items_to_print)
 
-            return HttpResponse(html)
+            return HttpResponse("\n".join([lbl[2] for lbl in labels]))
 
         else:
-            """Concatenate all rendered pages into a single PDF object, and return the resulting document!"""
-
-            pages = []
+            """Render all labels into a single PDF document, and return the resulting document!"""
 
-            for output in outputs:
-                doc = output.get_document()
-                for page in doc.pages:
-                    pages.append(page)
+            label_name, pdf = label_instance.render_batch(request, items_to_print)
 
-            pdf = outputs[0].get_document().copy(pages).write_pdf()
+            if not label_name.endswith(".pdf"):
+                label_name += ".pdf"
 
             inline = common.models.AriusUserSetting.get_setting('LABEL_INLINE', user=request.user, cache=False)
 
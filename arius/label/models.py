@@ -9,7 +9,7 @@ from django.conf import settings
 from django.core.validators import FileExtensionValidator, MinValueValidator
 from django.db import models
 from django.template import Context, Template
-from django.template.loader import render_to_string
+from django.template.loader import get_template, render_to_string
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
@@ -19,9 +19,11 @@ import stock.models
 from arius.helpers import normalize, validateFilterString
 from arius.helpers_model import get_base_url
 from arius.models import MetadataMixin
+from arius.template import AriusWeasyTemplateResponse, url_fetcher
 from plugin.registry import registry
 
 try:
+    import weasyprint
     from django_weasyprint import WeasyTemplateResponseMixin
 except OSError as err:  # pragma: no cover
     print("OSError: {e}".format(e=err))
@@ -70,6 +72,8 @@ def validate_build_line_filters(filters):
 class WeasyprintLabelMixin(WeasyTemplateResponseMixin):
     """Class for rendering a label to a PDF."""
 
+    response_class = AriusWeasyTemplateResponse
+
     pdf_filename = 'label.pdf'
     pdf_attachment = True
 
@@ -177,10 +181,14 @@ class LabelTemplate(MetadataMixin, models.Model):
         return {}  # pragma: no cover
 
     def generate_filename(self, request, **kwargs):
-        """Generate a filename for this label."""
+        """Generate a filename for this label.
+
+        kwargs:
+            context: Pre-calculated template context (optional)
+        """
         template_string = Template(self.filename_pattern)
 
-        ctx = self.context(request)
+        ctx = kwargs.get('context', None) or self.context(request)
 
         context = Context(ctx)
 
@@ -215,6 +223,66 @@ class LabelTemplate(MetadataMixin, models.Model):
         """
         return render_to_string(self.template_name, self.context(request), request)
 
+    def render_items(self, request, items):
+        """Render this label template against multiple items.
+
+        The label template is loaded (and compiled) only once, and then rendered against each item.
+
+        Returns:
+            list: (item, filename, html) tuples for each item
+        """
+
+        template = get_template(str(self.template_name))
+
+        results = []
+
+        for item in items:
+            self.object_to_print = item
+
+            context = self.context(request)
+
+            results.append((
+                item,
+                self.generate_filename(request, context=context),
+                template.render(context, request),
+            ))
+
+        return results
+
+    def render_html_to_document(self, request, html):
+        """Convert rendered label HTML to a WeasyPrint document"""
+
+        document = weasyprint.HTML(
+            string=html,
+            base_url=request.build_absolute_uri("/"),
+            url_fetcher=url_fetcher,
+        )
+
+        return document.render(presentational_hints=True)
+
+    def render_html_to_pdf(self, request, html):
+        """Convert rendered label HTML to PDF data (using WeasyPrint)"""
+
+        return self.render_html_to_document(request, html).write_pdf()
+
+    def render_batch(self, request, items):
+        """Render this label template against multiple items, to a single PDF document.
+
+        Each label is rendered as a separate document (as label templates may position elements
+        relative to the page), and the pages of each document are then merged into a single PDF.
+
+        Returns:
+            tuple: (filename, pdf_data) - the filename is generated for the last item
+        """
+
+        labels = self.render_items(request, items)
+
+        documents = [self.render_html_to_document(request, html) for _item, _filename, html in labels]
+
+        pages = [page for document in documents for page in document.pages]
+
+        return labels[-1][1], documents[0].copy(pages).write_pdf()
+
     def render(self, request, **kwargs):
         """Render the label template to a PDF file.
 
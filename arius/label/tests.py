@@ -131,6 +131,33 @@ class LabelTest(AriusAPITestCase):
         self.assertIn("image: /static/img/blank_image.png", content)
         self.assertIn("logo: /static/img/arius.png", content)
 
+    def test_batch_rendering(self):
+        """Test that multiple labels are rendered against a single label template."""
+
+        AriusSetting.set_setting('REPORT_ENABLE', True, None)
+        AriusSetting.set_setting('REPORT_DEBUG_MODE', True, None)
+
+        label = PartLabel.objects.first()
+        parts = Part.objects.all()[:3]
+
+        url = reverse('api-part-label-print', kwargs={'pk': label.pk})
+        response = self.get(url, {'parts': [p.pk for p in parts]}, expected_code=200)
+
+        content = response.content.decode()
+
+        # Each label is rendered as a separate document
+        self.assertEqual(content.count('<body>'), len(parts))
+
+        for p in parts:
+            self.assertIn(p.full_name, content)
+
+        # Render the labels to a single PDF file
+        AriusSetting.set_setting('REPORT_DEBUG_MODE', False, None)
+
+        response = self.get(url, {'parts': [p.pk for p in parts]}, expected_code=200)
+
+        self.assertEqual(response.headers['Content-Type'], 'application/pdf')
+
     def test_metadata(self):
         """Unit tests for the metadata field."""
         for model in [StockItemLabel, StockLocationLabel, PartLabel]:
@@ -2,7 +2,6 @@
 
 import logging
 import os
-import sys
 from datetime import datetime
 from decimal import Decimal
 
@@ -12,16 +11,16 @@ from django.core.validators import MinValueValidator
 from django.db import models, transaction
 from django.db.models import F, Q, Sum
 from django.db.models.functions import Coalesce
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch.dispatcher import receiver
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 from djmoney.contrib.exchange.exceptions import MissingRate
-from djmoney.contrib.exchange.models import convert_money
 from djmoney.money import Money
 from mptt.models import TreeForeignKey
 
+import common.currency
 import common.models as common_models
 import arius.helpers
 import arius.ready
@@ -122,40 +121,22 @@ class TotalPriceMixin(models.Model):
 
         total = Money(0, target_currency)
 
-        # order items
-        for line in self.lines.all():
-
-            if not line.price:
-                continue
-
-            try:
-                total += line.quantity * convert_money(line.price, target_currency)
-            except MissingRate:
-                # Record the error, try to press on
-                kind, info, data = sys.exc_info()
-
-                log_error('order.calculate_total_price')
-                logger.error(f"Missing exchange rate for '{target_currency}'")
-
-                # Return None to indicate the calculated price is invalid
-                return None
+        # Order items and extra items (currency conversion is performed in a single batch)
+        lines = [line for line in self.lines.all() if line.price]
+        lines += [line for line in self.extra_lines.all() if line.price]
 
-        # extra items
-        for line in self.extra_lines.all():
-
-            if not line.price:
-                continue
-
-            try:
-                total += line.quantity * convert_money(line.price, target_currency)
-            except MissingRate:
-                # Record the error, try to press on
+        try:
+            prices = common.currency.convert_values([line.price for line in lines], target_currency)
+        except MissingRate:
+            # Record the error, try to press on
+            log_error('order.calculate_total_price')
+            logger.error(f"Missing exchange rate for '{target_currency}'")
 
-                log_error('order.calculate_total_price')
-                logger.error(f"Missing exchange rate for '{target_currency}'")
+            # Return None to indicate the calculated price is invalid
+            return None
 
-                # Return None to indicate the calculated price is invalid
-                return None
+        for line, price in zip(lines, prices):
+            total += line.quantity * price
 
         # set decimal-places
         total.decimal_places = 4
@@ -1259,6 +1240,32 @@ class PurchaseOrderLineItem(OrderLineItem):
         return max(r, 0)
 
 
+@receiver(post_save, sender=PurchaseOrderLineItem, dispatch_uid='po_line_post_save_stock_summary')
+@receiver(post_delete, sender=PurchaseOrderLineItem, dispatch_uid='po_line_post_delete_stock_summary')
+def update_stock_summary_after_po_line(sender, instance: PurchaseOrderLineItem, **kwargs):
+    """Callback function when a PurchaseOrderLineItem is saved or deleted.
+
+    - Schedule an update of the 'on order' quantity for the referenced part
+    """
+
+    PartModels.PartStockSummary.schedule_update(
+        SupplierPart.objects.filter(pk=instance.part_id).values_list('part', flat=True)
+    )
+
+
+@receiver(post_save, sender=PurchaseOrder, dispatch_uid='po_post_save_stock_summary')
+def update_stock_summary_after_po(sender, instance: PurchaseOrder, created: bool, **kwargs):
+    """Callback function when a PurchaseOrder is saved.
+
+    - The order status may have changed, which affects the 'on order' quantity for each line
+    """
+
+    if not created:
+        PartModels.PartStockSummary.schedule_update(
+            instance.lines.values_list('part__part', flat=True)
+        )
+
+
 class PurchaseOrderExtraLine(OrderExtraLine):
     """Model for a single ExtraLine in a PurchaseOrder.
 
@@ -1691,6 +1698,40 @@ class SalesOrderAllocation(models.Model):
         self.save()
 
 
+@receiver(post_save, sender=SalesOrderAllocation, dispatch_uid='so_allocation_post_save_stock_summary')
+@receiver(post_delete, sender=SalesOrderAllocation, dispatch_uid='so_allocation_post_delete_stock_summary')
+def update_stock_summary_after_so_allocation(sender, instance: SalesOrderAllocation, **kwargs):
+    """Callback function when a SalesOrderAllocation is saved or deleted.
+
+    - Schedule an update of the 'allocated' quantity for the referenced part
+    """
+
+    PartModels.PartStockSummary.schedule_update(
+        stock.models.StockItem.objects.filter(pk=instance.item_id).values_list('part', flat=True)
+    )
+
+
+@receiver(post_save, sender=SalesOrder, dispatch_uid='so_post_save_stock_summary')
+@receiver(post_save, sender=SalesOrderShipment, dispatch_uid='so_shipment_post_save_stock_summary')
+def update_stock_summary_after_so(sender, instance, created: bool, **kwargs):
+    """Callback function when a SalesOrder or SalesOrderShipment is saved.
+
+    - The order status (or shipment date) may have changed, which affects the 'allocated' quantity
+    """
+
+    if created:
+        return
+
+    if isinstance(instance, SalesOrder):
+        allocations = SalesOrderAllocation.objects.filter(line__order=instance)
+    else:
+        allocations = instance.allocations.all()
+
+    PartModels.PartStockSummary.schedule_update(
+        allocations.values_list('item__part', flat=True)
+    )
+
+
 class ReturnOrder(TotalPriceMixin, Order):
     """A ReturnOrder represents goods returned from a customer, e.g. an RMA or warranty
 
@@ -172,6 +172,14 @@ class PartStocktakeReportAdmin(admin.ModelAdmin):
     list_display = ['date', 'user']
 
 
+class PartStockSummaryAdmin(admin.ModelAdmin):
+    """Admin class for PartStockSummary model"""
+
+    list_display = ['part', 'in_stock', 'variant_stock', 'allocated_build', 'allocated_sales', 'on_order', 'updated']
+
+    autocomplete_fields = ['part']
+
+
 class PartCategoryResource(AriusResource):
     """Class for managing PartCategory data import/export."""
 
@@ -442,3 +450,4 @@ admin.site.register(models.PartInternalPriceBreak, PartInternalPriceBreakAdmin)
 admin.site.register(models.PartPricing, PartPricingAdmin)
 admin.site.register(models.PartStocktake, PartStocktakeAdmin)
 admin.site.register(models.PartStocktakeReport, PartStocktakeReportAdmin)
+admin.site.register(models.PartStockSummary, PartStockSummaryAdmin)
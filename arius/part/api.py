@@ -1,10 +1,12 @@
 """Provides a JSON API for the Part app."""
 
 import functools
+import json
 import re
+from decimal import Decimal, InvalidOperation
 
 from django.db.models import Count, F, Q
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.urls import include, path, re_path
 from django.utils.translation import gettext_lazy as _
 
@@ -15,6 +17,7 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 import order.models
+import part.bom
 import part.filters
 from build.models import Build, BuildItem
 from arius.api import (APIDownloadMixin, AttachmentMixin,
@@ -22,8 +25,8 @@ from arius.api import (APIDownloadMixin, AttachmentMixin,
 from arius.filters import (ORDER_FILTER, SEARCH_ORDER_FILTER,
                            SEARCH_ORDER_FILTER_ALIAS,
                            AriusSearchFilter)
-from arius.helpers import (DownloadFile, increment_serial_number, isNull,
-                           str2bool, str2int)
+from arius.helpers import (DownloadFileStream, increment_serial_number,
+                           isNull, str2bool, str2int)
 from arius.mixins import (CreateAPI, CustomRetrieveUpdateDestroyAPI,
                           ListAPI, ListCreateAPI, RetrieveAPI,
                           RetrieveUpdateAPI, RetrieveUpdateDestroyAPI,
@@ -78,11 +81,10 @@ class CategoryList(CategoryMixin, APIDownloadMixin, ListCreateAPI):
     def download_queryset(self, queryset, export_format):
         """Download the filtered queryset as a data file"""
 
-        dataset = PartCategoryResource().export(queryset=queryset)
-        filedata = dataset.export(export_format)
+        stream = PartCategoryResource().export_stream(queryset, export_format)
         filename = f"Arius_Categories.{export_format}"
 
-        return DownloadFile(filedata, filename)
+        return DownloadFileStream(stream, filename)
 
     def filter_queryset(self, queryset):
         """Custom filtering:
@@ -684,6 +686,67 @@ class PartRequirements(RetrieveAPI):
         return Response(data)
 
 
+class PartBomExplode(RetrieveAPI):
+    """API endpoint for a flattened ('exploded') multi-level BOM for a particular assembly.
+
+    Returns the total quantity required of each component part, aggregated across all BOM levels.
+    As the results may be very large, they are streamed to the client.
+
+    Query parameters:
+    - quantity: Number of assemblies to build (default = 1)
+    - max_levels: Maximum number of BOM levels to explode (default = no limit)
+    - consumable: Include consumable BOM items (default = True)
+    - assemblies: Include sub-assemblies in the results (default = False)
+    """
+
+    queryset = Part.objects.all()
+
+    def retrieve(self, request, *args, **kwargs):
+        """Stream the exploded BOM data for the selected assembly"""
+
+        assembly = self.get_object()
+
+        params = request.query_params
+
+        try:
+            quantity = Decimal(params.get('quantity', 1))
+        except InvalidOperation:
+            raise ValidationError({'quantity': _('Must be a valid number')})
+
+        if not quantity.is_finite() or quantity <= 0:
+            raise ValidationError({'quantity': _('Quantity must be greater than zero')})
+
+        max_levels = params.get('max_levels', None)
+
+        if max_levels is not None:
+            try:
+                max_levels = int(max_levels)
+            except ValueError:
+                raise ValidationError({'max_levels': _('Must be a valid number')})
+
+            if max_levels <= 0:
+                raise ValidationError({'max_levels': _('Must be greater than zero')})
+
+        requirements = part.bom.explode_bom(
+            assembly,
+            quantity=quantity,
+            max_levels=max_levels,
+            include_consumable=str2bool(params.get('consumable', True)),
+            include_assemblies=str2bool(params.get('assemblies', False)),
+        )
+
+        def stream():
+            """Stream the results as a JSON list"""
+            yield '['
+
+            for idx, row in enumerate(part.bom.iterate_bom_requirements(requirements)):
+                yield (',' if idx > 0 else '') + json.dumps(row)
+
+            yield ']'
+
+        return StreamingHttpResponse(stream(), content_type='application/json')
+
+
 class PartPricingDetail(RetrieveUpdateAPI):
     """API endpoint for viewing part pricing data"""
 
@@ -1033,6 +1096,15 @@ class PartMixin:
             kwargs['parameters'] = str2bool(params.get('parameters', None))
             kwargs['category_detail'] = str2bool(params.get('category_detail', False))
 
+            if str2bool(params.get('can_build', False)):
+                # Calculate the 'can_build' quantity for all serialized parts in a single pass
+                instances = args[0] if len(args) > 0 else kwargs.get('instance', None)
+
+                if isinstance(instances, Part):
+                    instances = [instances]
+
+                kwargs['can_build'] = part.bom.get_can_build_quantities(instances or [])
+
         except AttributeError:
             pass
 
@@ -1054,12 +1126,10 @@ class PartList(PartMixin, APIDownloadMixin, ListCreateAPI):
 
     def download_queryset(self, queryset, export_format):
         """Download the filtered queryset as a data file"""
-        dataset = PartResource().export(queryset=queryset)
-
-        filedata = dataset.export(export_format)
+        stream = PartResource().export_stream(queryset, export_format)
         filename = f"Arius_Parts.{export_format}"
 
-        return DownloadFile(filedata, filename)
+        return DownloadFileStream(stream, filename)
 
     def list(self, request, *args, **kwargs):
         """Override the 'list' method, as the PartCategory objects are very expensive to serialize!
@@ -2020,6 +2090,9 @@ part_api_urls = [
         # Endpoint for validating a BOM for the specific Part
         re_path(r'^bom-validate/', PartValidateBOM.as_view(), name='api-part-bom-validate'),
 
+        # Endpoint for a flattened multi-level BOM for the specific Part
+        re_path(r'^bom-explode/', PartBomExplode.as_view(), name='api-part-bom-explode'),
+
         # Part metadata
         re_path(r'^metadata/', MetadataView.as_view(), {'model': Part}, name='api-part-metadata'),
 
@@ -1,18 +1,31 @@
 """Functionality for Bill of Material (BOM) management.
 
-Primarily BOM upload tools.
+Primarily BOM upload tools, and bulk BOM calculations.
 """
 
+import logging
 from collections import OrderedDict
+from decimal import Decimal
 
+from django.db.models import Q, Sum
 from django.utils.translation import gettext as _
 
+from djmoney.money import Money
+
+import build.models
+import common.models
+import common.settings
+import order.models
+import stock.models
 from company.models import ManufacturerPart, SupplierPart
 from arius.helpers import (DownloadFile, GetExportFormats, normalize,
                            str2bool)
+from arius.status_codes import BuildStatusGroups, SalesOrderStatusGroups
 
 from .admin import BomItemResource
-from .models import BomItem, BomItemSubstitute, Part
+from .models import BomItem, BomItemSubstitute, Part, PartPricing
+
+logger = logging.getLogger('arius')
 
 
 def IsValidBOMFormat(fmt):
@@ -328,3 +341,771 @@ def ExportBom(part: Part, fmt='csv', cascade: bool = False, max_levels: int = No
     filename = f"{part.full_name}_BOM.{fmt}"
 
     return DownloadFile(data, filename)
+
+
+def get_available_quantities(part_ids) -> dict:
+    """Calculate the 'available' stock quantity for each of the provided parts.
+
+    The available quantity is the total 'in stock' quantity,
+    minus any stock allocated against open build orders or sales orders.
+
+    The same rules as the annotations in part.filters are applied,
+    but a fixed number of grouped queries is used, no matter how many parts are provided.
+
+    Arguments:
+        part_ids: Iterable of Part ID values
+
+    Returns:
+        dict: Map of Part ID to available quantity (Decimal)
+    """
+
+    part_ids = set(part_ids)
+
+    quantities = {pk: Decimal(0) for pk in part_ids}
+
+    if not part_ids:
+        return quantities
+
+    # Total 'in stock' quantity for each part
+    in_stock = stock.models.StockItem.objects.filter(
+        stock.models.StockItem.IN_STOCK_FILTER,
+        part__in=part_ids,
+    ).order_by().values('part').annotate(total=Sum('quantity'))
+
+    for row in in_stock:
+        quantities[row['part']] += row['total'] or 0
+
+    # Stock allocated to active build orders
+    build_allocations = build.models.BuildItem.objects.filter(
+        build_line__build__status__in=BuildStatusGroups.ACTIVE_CODES,
+        stock_item__part__in=part_ids,
+    ).order_by().values('stock_item__part').annotate(total=Sum('quantity'))
+
+    for row in build_allocations:
+        quantities[row['stock_item__part']] -= row['total'] or 0
+
+    # Stock allocated to open sales orders (which have not yet shipped)
+    sales_allocations = order.models.SalesOrderAllocation.objects.filter(
+        line__order__status__in=SalesOrderStatusGroups.OPEN,
+        shipment__shipment_date=None,
+        item__part__in=part_ids,
+    ).order_by().values('item__part').annotate(total=Sum('quantity'))
+
+    for row in sales_allocations:
+        quantities[row['item__part']] -= row['total'] or 0
+
+    return quantities
+
+
+def get_can_build_quantities(assemblies) -> dict:
+    """Calculate the number of units which can be built, for multiple assemblies at once.
+
+    This performs the same calculation as Part.can_build, for each provided assembly:
+
+    - Consumable and zero-quantity BOM items are ignored
+    - BOM items inherited from parent (template) parts are included
+    - Stock for substitute parts is available to each BOM item
+    - Stock for variant parts is available to BOM items which allow variants
+
+    Rather than building an annotated BomItem queryset for each assembly,
+    the BOM items for *all* assemblies are fetched together,
+    and the stock availability for each distinct part is calculated in a single pass.
+    The number of database queries is independent of the number of assemblies.
+
+    Arguments:
+        assemblies: Iterable of Part instances
+
+    Returns:
+        dict: Map of Part ID to the number of units which can be built
+    """
+
+    assemblies = [assembly for assembly in assemblies if assembly.pk is not None]
+
+    results = {assembly.pk: 0 for assembly in assemblies}
+
+    if not assemblies:
+        return results
+
+    # Fetch BOM items for each assembly, *and* any inherited BOM items for parent parts
+    bom_items = BomItem.objects.filter(
+        Q(part__in=[assembly.pk for assembly in assemblies]) | Q(
+            inherited=True,
+            part__tree_id__in={assembly.tree_id for assembly in assemblies},
+        ),
+        consumable=False,
+        quantity__gt=0,
+    ).select_related('part', 'sub_part')
+
+    direct_items = {}
+    inherited_items = {}
+
+    for item in bom_items:
+        direct_items.setdefault(item.part_id, []).append(item)
+
+        if item.inherited:
+            inherited_items.setdefault(item.part.tree_id, []).append(item)
+
+    # Map each assembly to the BOM items which it requires
+    assembly_items = {}
+
+    for assembly in assemblies:
+        items = list(direct_items.get(assembly.pk, []))
+
+        for item in inherited_items.get(assembly.tree_id, []):
+            # Item is defined against a parent part of this assembly
+            if item.part.lft < assembly.lft and item.part.rght > assembly.rght:
+                items.append(item)
+
+        assembly_items[assembly.pk] = items
+
+    # Collect the set of parts which may be used for each BOM item
+    item_parts = {}
+
+    for items in direct_items.values():
+        for item in items:
+            item_parts[item.pk] = {item.sub_part_id}
+
+    for bom_item_id, part_id in BomItemSubstitute.objects.filter(bom_item__in=item_parts.keys()).values_list('bom_item', 'part'):
+        item_parts[bom_item_id].add(part_id)
+
+    # Collect BOM items which allow variants, grouped by the variant tree of the sub_part
+    variant_items = {}
+
+    for items in direct_items.values():
+        for item in items:
+            if item.allow_variants:
+                variant_items.setdefault(item.sub_part.tree_id, []).append(item)
+
+    if variant_items:
+        variant_parts = Part.objects.filter(
+            tree_id__in=variant_items.keys()
+        ).values_list('pk', 'tree_id', 'lft', 'rght')
+
+        for pk, tree_id, lft, rght in variant_parts:
+            for item in variant_items[tree_id]:
+                # Part is a variant (descendant) of the sub_part
+                if lft > item.sub_part.lft and rght < item.sub_part.rght:
+                    item_parts[item.pk].add(pk)
+
+    # Calculate stock availability for every distinct part, in one pass
+    available = get_available_quantities(set().union(*item_parts.values()))
+
+    for assembly in assemblies:
+        total = None
+
+        for item in assembly_items[assembly.pk]:
+            quantity = sum(available[pk] for pk in item_parts[item.pk])
+
+            n = int(quantity / item.quantity)
+
+            if total is None or n < total:
+                total = n
+
+        results[assembly.pk] = max(total or 0, 0)
+
+    return results
+
+
+def topological_order(dependents: dict) -> list:
+    """Order a set of parts such that each part appears after all of the parts it depends on.
+
+    Arguments:
+        dependents: Dict mapping each Part ID to a set of Part IDs which depend on it (e.g. assemblies which use it)
+
+    Returns:
+        list: Part ID values, ordered with BOM leaves first
+
+    Note: Any parts which form a dependency cycle are appended at the end of the list
+    """
+
+    nodes = set(dependents.keys())
+
+    for pks in dependents.values():
+        nodes.update(pks)
+
+    # Count the number of dependencies for each part
+    dependency_count = {pk: 0 for pk in nodes}
+
+    for pks in dependents.values():
+        for pk in pks:
+            dependency_count[pk] += 1
+
+    ready = sorted(pk for pk, count in dependency_count.items() if count == 0)
+    ordered = []
+
+    while ready:
+        pk = ready.pop()
+        ordered.append(pk)
+
+        for dependent in dependents.get(pk, []):
+            dependency_count[dependent] -= 1
+
+            if dependency_count[dependent] == 0:
+                ready.append(dependent)
+
+    if len(ordered) < len(nodes):
+        # Cyclic dependencies cannot be ordered
+        ordered.extend(sorted(nodes.difference(ordered)))
+
+    return ordered
+
+
+def rollup_bom_pricing():
+    """Recalculate BOM and variant pricing for *all* parts in a single pass.
+
+    Rather than updating each assembly individually (which requires multiple queries per BOM line),
+    the entire BOM graph and all PartPricing data is loaded into memory.
+    Parts are then processed in topological order (BOM leaves first),
+    so that the overall cost of each component is up-to-date before it is used in an assembly.
+
+    Note that this only recalculates BOM cost, variant cost and overall cost values.
+    Other pricing data (e.g. supplier or purchase pricing) is not updated.
+
+    Returns:
+        int: The number of PartPricing entries which were updated
+    """
+
+    pricing_data = {pricing.part_id: pricing for pricing in PartPricing.objects.all()}
+
+    parts = {
+        row['pk']: row for row in Part.objects.prefetch_related(None).order_by().values(
+            'pk', 'tree_id', 'lft', 'rght', 'assembly', 'is_template', 'trackable', 'active',
+        )
+    }
+
+    # Group parts by variant tree, for ancestor / descendant lookup
+    trees = {}
+
+    for row in parts.values():
+        trees.setdefault(row['tree_id'], []).append(row)
+
+    def get_descendants(pk):
+        """Return the ID values of all variants below the given part"""
+        p = parts[pk]
+        return [row['pk'] for row in trees[p['tree_id']] if p['lft'] < row['lft'] and row['rght'] < p['rght']]
+
+    def get_ancestors(pk):
+        """Return the ID values of all templates above the given part"""
+        p = parts[pk]
+        return [row['pk'] for row in trees[p['tree_id']] if row['lft'] < p['lft'] and p['rght'] < row['rght']]
+
+    substitutes = {}
+
+    for bom_item_id, part_id in BomItemSubstitute.objects.order_by().values_list('bom_item', 'part'):
+        substitutes.setdefault(bom_item_id, []).append(part_id)
+
+    # Construct the BOM lines defined against each assembly: (quantity, inherited, [valid parts])
+    bom_lines = {}
+
+    for item in BomItem.objects.order_by().values('pk', 'part', 'sub_part', 'quantity', 'inherited', 'allow_variants'):
+        valid_parts = {item['sub_part'], *substitutes.get(item['pk'], [])}
+
+        if item['allow_variants']:
+            valid_parts.update(get_descendants(item['sub_part']))
+
+        # Trackable status must be the same as the sub_part (see BomItem.get_valid_parts_for_allocation)
+        trackable = parts[item['sub_part']]['trackable']
+        valid_parts = [pk for pk in valid_parts if parts[pk]['trackable'] == trackable]
+
+        bom_lines.setdefault(item['part'], []).append((item['quantity'], item['inherited'], valid_parts))
+
+    # Map each part to the parts whose pricing depends on it
+    dependents = {pk: set() for pk in pricing_data.keys()}
+    assembly_lines = {}
+    variants = {}
+
+    for pk in pricing_data.keys():
+        if parts[pk]['assembly']:
+            lines = list(bom_lines.get(pk, []))
+
+            # Include BOM lines inherited from template parts
+            for template in get_ancestors(pk):
+                lines.extend([line for line in bom_lines.get(template, []) if line[1]])
+
+            assembly_lines[pk] = lines
+
+            for _quantity, _inherited, valid_parts in lines:
+                for sub_part in valid_parts:
+                    dependents.setdefault(sub_part, set()).add(pk)
+
+        if parts[pk]['is_template']:
+            variants[pk] = get_descendants(pk)
+
+            for variant in variants[pk]:
+                dependents.setdefault(variant, set()).add(pk)
+
+    pricing_settings = PartPricing.get_overall_cost_settings()
+    active_only = common.models.AriusSetting.get_setting('PRICING_ACTIVE_VARIANTS', False)
+    currency_code = common.settings.currency_code_default()
+
+    fields = ['bom_cost_min', 'bom_cost_max', 'variant_cost_min', 'variant_cost_max', 'overall_min', 'overall_max']
+
+    to_update = []
+
+    for pk in topological_order(dependents):
+        pricing = pricing_data.get(pk, None)
+
+        if pricing is None:
+            continue
+
+        initial = [getattr(pricing, field) for field in fields]
+
+        # Variant cost: min / max overall cost of any variant parts
+        variant_min = None
+        variant_max = None
+
+        for variant in variants.get(pk, []):
+            if active_only and not parts[variant]['active']:
+                continue
+
+            if variant not in pricing_data:
+                continue
+
+            v_min = pricing.convert(pricing_data[variant].overall_min)
+            v_max = pricing.convert(pricing_data[variant].overall_max)
+
+            if v_min is not None and (variant_min is None or v_min < variant_min):
+                variant_min = v_min
+
+            if v_max is not None and (variant_max is None or v_max > variant_max):
+                variant_max = v_max
+
+        pricing.variant_cost_min = variant_min
+        pricing.variant_cost_max = variant_max
+
+        # BOM cost: cumulative min / max cost of each BOM line (see PartPricing.update_bom_cost)
+        cumulative_min = None
+        cumulative_max = None
+
+        for quantity, _inherited, valid_parts in assembly_lines.get(pk, []):
+            line_min = None
+            line_max = None
+
+            for sub_part in valid_parts:
+                if sub_part not in pricing_data:
+                    continue
+
+                sub_part_min = pricing.convert(pricing_data[sub_part].overall_min)
+                sub_part_max = pricing.convert(pricing_data[sub_part].overall_max)
+
+                if sub_part_min is not None and (line_min is None or sub_part_min < line_min):
+                    line_min = sub_part_min
+
+                if sub_part_max is not None and (line_max is None or sub_part_max > line_max):
+                    line_max = sub_part_max
+
+            if line_min is not None:
+                cumulative_min = (cumulative_min or Money(0, currency_code)) + pricing.convert(line_min * quantity)
+
+            if line_max is not None:
+                cumulative_max = (cumulative_max or Money(0, currency_code)) + pricing.convert(line_max * quantity)
+
+        pricing.bom_cost_min = cumulative_min
+        pricing.bom_cost_max = cumulative_max
+
+        pricing.update_overall_cost(pricing_settings=pricing_settings)
+
+        if [getattr(pricing, field) for field in fields] != initial:
+            to_update.append(pricing)
+
+    if to_update:
+        # Money fields are stored as separate amount and currency columns
+        PartPricing.objects.bulk_update(
+            to_update,
+            fields + [f'{field}_currency' for field in fields],
+            batch_size=500,
+        )
+
+    return len(to_update)
+
+
+class BomGraph:
+    """In-memory index of the BOM structure, for efficient traversal of multi-level BOMs.
+
+    Adjacency information is loaded lazily from the database, one query per BOM level,
+    and memoized for the lifetime of the graph instance. Each part is only ever loaded once,
+    so traversing the BOM structure is O(V + E) regardless of how often sub-assemblies are re-used.
+
+    Inherited BOM items (defined against a template part) are included,
+    in the same manner as Part.get_bom_items() and Part.get_used_in().
+
+    Note: A graph instance is not updated when the BOM changes,
+    so a new instance should be created for each request or operation.
+    """
+
+    def __init__(self):
+        """Initialize an empty graph"""
+
+        # Map of part ID to (tree_id, lft, rght) values
+        self.tree = {}
+
+        # Map of part ID to the set of sub_part ID values in its BOM
+        self.sub_parts = {}
+
+        # Map of part ID to a list of (assembly ID, inherited, via_substitute) tuples which reference it
+        self.used_in = {}
+
+        # Map of template part ID to the set of its variant ID values
+        self.variants = {}
+
+        # Memoized reachability results
+        self.reachable = {}
+
+    def is_ancestor(self, parent: int, child: int) -> bool:
+        """Return True if the 'parent' part is a template above the 'child' part"""
+
+        if parent not in self.tree or child not in self.tree:
+            return False
+
+        p_tree, p_lft, p_rght = self.tree[parent]
+        c_tree, c_lft, c_rght = self.tree[child]
+
+        return p_tree == c_tree and p_lft < c_lft and c_rght < p_rght
+
+    def load_tree(self, part_ids):
+        """Load variant tree information for the specified parts"""
+
+        part_ids = {pk for pk in part_ids if pk not in self.tree}
+
+        if not part_ids:
+            return
+
+        for pk, *tree in Part.objects.filter(pk__in=part_ids).order_by().values_list('pk', 'tree_id', 'lft', 'rght'):
+            self.tree[pk] = tuple(tree)
+
+    def load_sub_parts(self, part_ids):
+        """Load the BOM (including inherited BOM items) for the specified parts"""
+
+        part_ids = {pk for pk in part_ids if pk not in self.sub_parts}
+
+        if not part_ids:
+            return
+
+        self.load_tree(part_ids)
+
+        trees = {}
+
+        for pk in part_ids:
+            self.sub_parts[pk] = set()
+
+            if pk in self.tree:
+                trees.setdefault(self.tree[pk][0], []).append(pk)
+
+        items = BomItem.objects.filter(
+            Q(part__in=part_ids) | Q(inherited=True, part__tree_id__in=trees.keys())
+        ).order_by().values_list(
+            'part', 'part__tree_id', 'part__lft', 'part__rght', 'inherited',
+            'sub_part', 'sub_part__tree_id', 'sub_part__lft', 'sub_part__rght',
+        )
+
+        for assembly, tree_id, lft, rght, inherited, sub_part, *sub_part_tree in items:
+            self.tree[assembly] = (tree_id, lft, rght)
+            self.tree[sub_part] = tuple(sub_part_tree)
+
+            if assembly in part_ids:
+                self.sub_parts[assembly].add(sub_part)
+
+            if inherited:
+                # Item is inherited by any variants of the assembly
+                for pk in trees.get(tree_id, []):
+                    if self.is_ancestor(assembly, pk):
+                        self.sub_parts[pk].add(sub_part)
+
+    def load_used_in(self, part_ids):
+        """Load the assemblies which use the specified parts"""
+
+        part_ids = {pk for pk in part_ids if pk not in self.used_in}
+
+        if not part_ids:
+            return
+
+        self.load_tree(part_ids)
+
+        trees = {}
+
+        for pk in part_ids:
+            self.used_in[pk] = []
+
+            if pk in self.tree:
+                trees.setdefault(self.tree[pk][0], []).append(pk)
+
+        items = BomItem.objects.filter(
+            Q(sub_part__in=part_ids) | Q(allow_variants=True, sub_part__tree_id__in=trees.keys())
+        ).order_by().values_list(
+            'part', 'inherited', 'allow_variants',
+            'sub_part', 'sub_part__tree_id', 'sub_part__lft', 'sub_part__rght',
+        )
+
+        inherited_assemblies = set()
+
+        for assembly, inherited, allow_variants, sub_part, *sub_part_tree in items:
+            self.tree[sub_part] = tuple(sub_part_tree)
+
+            if inherited:
+                inherited_assemblies.add(assembly)
+
+            if sub_part in part_ids:
+                self.used_in[sub_part].append((assembly, inherited, False))
+
+            if allow_variants:
+                # This part may be a variant of the referenced sub_part
+                for pk in trees.get(sub_part_tree[0], []):
+                    if self.is_ancestor(sub_part, pk):
+                        self.used_in[pk].append((assembly, inherited, False))
+
+        # This part may be a substitute for the referenced sub_part
+        substitutes = BomItemSubstitute.objects.filter(part__in=part_ids).order_by().values_list(
+            'part', 'bom_item__part', 'bom_item__inherited',
+        )
+
+        for pk, assembly, inherited in substitutes:
+            self.used_in[pk].append((assembly, inherited, True))
+
+            if inherited:
+                inherited_assemblies.add(assembly)
+
+        self.load_variants(inherited_assemblies)
+
+    def load_variants(self, part_ids):
+        """Load all variants below the specified parts"""
+
+        part_ids = {pk for pk in part_ids if pk not in self.variants}
+
+        if not part_ids:
+            return
+
+        self.load_tree(part_ids)
+
+        query = Q(pk__in=[])
+
+        for pk in part_ids:
+            self.variants[pk] = set()
+
+            if pk in self.tree:
+                tree_id, lft, rght = self.tree[pk]
+                query |= Q(tree_id=tree_id, lft__gt=lft, rght__lt=rght)
+
+        for pk, *tree in Part.objects.filter(query).order_by().values_list('pk', 'tree_id', 'lft', 'rght'):
+            self.tree[pk] = tuple(tree)
+
+            for template in part_ids:
+                if self.is_ancestor(template, pk):
+                    self.variants[template].add(pk)
+
+    def get_sub_parts(self, part_id: int) -> set:
+        """Return the ID values of all parts in the BOM for the specified part"""
+
+        self.load_sub_parts([part_id])
+
+        return self.sub_parts[part_id]
+
+    def get_reachable(self, part_id: int) -> set:
+        """Return the ID values of all parts which are (directly or indirectly) required to make the specified part.
+
+        The BOM is traversed one level at a time, so the number of queries is bounded by the BOM depth.
+        """
+
+        if part_id in self.reachable:
+            return self.reachable[part_id]
+
+        result = set()
+        frontier = {part_id}
+
+        while frontier:
+            self.load_sub_parts(frontier)
+
+            next_frontier = set()
+
+            for pk in frontier:
+                for sub_part in self.sub_parts[pk]:
+                    if sub_part in result:
+                        continue
+
+                    result.add(sub_part)
+
+                    if sub_part in self.reachable:
+                        # Sub-assembly has already been traversed
+                        result.update(self.reachable[sub_part])
+                    else:
+                        next_frontier.add(sub_part)
+
+            frontier = next_frontier
+
+        self.reachable[part_id] = result
+
+        return result
+
+    def get_used_in(self, part_id: int, include_inherited: bool = True, include_substitutes: bool = True) -> set:
+        """Return the ID values of all assemblies which directly use the specified part.
+
+        Arguments:
+            part_id: The ID of the part
+            include_inherited: Include variants of assemblies which inherit the BOM item
+            include_substitutes: Include assemblies where this part is a substitute
+        """
+
+        self.load_used_in([part_id])
+
+        assemblies = set()
+
+        for assembly, inherited, via_substitute in self.used_in[part_id]:
+            if via_substitute and not include_substitutes:
+                continue
+
+            assemblies.add(assembly)
+
+            if include_inherited and inherited:
+                assemblies.update(self.variants.get(assembly, []))
+
+        return assemblies
+
+
+def explode_bom(assembly: Part, quantity=1, max_levels: int = None, include_consumable: bool = True, include_assemblies: bool = False) -> dict:
+    """Explode a multi-level BOM into the total quantity required of each component part.
+
+    The BOM is traversed one level at a time (a single query per BOM level),
+    with the required quantity of each sub-assembly aggregated before it is itself exploded.
+
+    - Required quantities (including overage) are calculated as per BomItem.get_required_quantity
+    - Inherited BOM items (defined against a template part) are included
+    - Consumable items are not exploded further
+
+    Args:
+        assembly: The top-level assembly to explode
+        quantity: Number of top-level assemblies to build
+        max_levels: Maximum number of BOM levels to explode (None = no limit)
+        include_consumable: Include consumable BOM items in the results
+        include_assemblies: Include (exploded) sub-assemblies in the results
+
+    Returns:
+        dict: Map of (part ID, consumable) to the aggregated requirement for that part
+    """
+
+    requirements = {}
+
+    # Variant tree information for each assembly, to match inherited BOM items
+    tree = {
+        pk: (tree_id, lft, rght) for pk, tree_id, lft, rght in Part.objects.filter(pk=assembly.pk).values_list('pk', 'tree_id', 'lft', 'rght')
+    }
+
+    # Quantity required of each assembly at the current BOM level
+    frontier = {assembly.pk: Decimal(quantity)}
+
+    seen = set()
+    level = 0
+
+    while frontier:
+        level += 1
+        seen.update(frontier.keys())
+
+        # A valid BOM cannot be deeper than the number of distinct assemblies
+        if level > len(seen):
+            logger.warning(f"Circular BOM reference detected when exploding BOM for '{assembly}'")
+            break
+
+        trees = {}
+
+        for pk in frontier.keys():
+            trees.setdefault(tree[pk][0], []).append(pk)
+
+        items = BomItem.objects.filter(
+            Q(part__in=frontier.keys()) | Q(inherited=True, part__tree_id__in=trees.keys())
+        ).order_by().values(
+            'part', 'part__tree_id', 'part__lft', 'part__rght', 'inherited',
+            'sub_part', 'sub_part__tree_id', 'sub_part__lft', 'sub_part__rght', 'sub_part__assembly',
+            'quantity', 'overage', 'consumable', 'allow_variants',
+        )
+
+        next_frontier = {}
+
+        for item in items:
+
+            if item['consumable'] and not include_consumable:
+                continue
+
+            # Find the assemblies (at this level) which use this BOM item
+            assemblies = []
+
+            if item['part'] in frontier:
+                assemblies.append(item['part'])
+
+            if item['inherited']:
+                for pk in trees.get(item['part__tree_id'], []):
+                    _tree_id, lft, rght = tree[pk]
+
+                    if item['part__lft'] < lft and rght < item['part__rght']:
+                        assemblies.append(pk)
+
+            if not assemblies:
+                continue
+
+            bom_item = BomItem(quantity=item['quantity'], overage=item['overage'])
+
+            required = sum(
+                Decimal(str(bom_item.get_required_quantity(frontier[pk]))) for pk in assemblies
+            )
+
+            sub_part = item['sub_part']
+
+            tree[sub_part] = (item['sub_part__tree_id'], item['sub_part__lft'], item['sub_part__rght'])
+
+            explode = item['sub_part__assembly'] and not item['consumable'] and (max_levels is None or level < max_levels)
+
+            if explode:
+                next_frontier[sub_part] = next_frontier.get(sub_part, Decimal(0)) + required
+
+                if not include_assemblies:
+                    continue
+
+            entry = requirements.setdefault((sub_part, item['consumable']), {
+                'part': sub_part,
+                'quantity': Decimal(0),
+                'consumable': item['consumable'],
+                'allow_variants': True,
+                'assembly': explode,
+                'level': level,
+            })
+
+            entry['quantity'] += required
+            entry['allow_variants'] = entry['allow_variants'] and item['allow_variants']
+
+        frontier = next_frontier
+
+    return requirements
+
+
+def iterate_bom_requirements(requirements: dict, chunk_size: int = 500):
+    """Iterate through the results of explode_bom, with extra part information.
+
+    Part information is loaded in chunks, so that large results can be streamed.
+
+    Args:
+        requirements: Results returned from explode_bom()
+        chunk_size: Number of parts to load in each query
+
+    Yields:
+        dict: Requirement data for a single part
+    """
+
+    entries = sorted(requirements.values(), key=lambda entry: (entry['level'], entry['part']))
+
+    for idx in range(0, len(entries), chunk_size):
+        chunk = entries[idx:idx + chunk_size]
+
+        parts = {
+            row['pk']: row for row in Part.objects.filter(
+                pk__in=[entry['part'] for entry in chunk]
+            ).prefetch_related(None).values('pk', 'name', 'IPN', 'description', 'units')
+        }
+
+        for entry in chunk:
+            data = parts.get(entry['part'], {})
+
+            yield {
+                **entry,
+                'quantity': float(entry['quantity']),
+                'name': data.get('name', None),
+                'IPN': data.get('IPN', None),
+                'description': data.get('description', None),
+                'units': data.get('units', None),
+            }
@@ -210,6 +210,24 @@ def annotate_variant_quantity(subquery: Q, reference: str = 'quantity'):
     )
 
 
+def annotate_stock_summary(field: str, reference: str = ''):
+    """Annotate a quantity from the pre-calculated PartStockSummary table.
+
+    This is a (much cheaper) alternative to the subquery annotations above,
+    and is only valid if the PART_STOCK_SUMMARY setting is enabled.
+
+    Args:
+        field: The name of the summary field (e.g. 'in_stock')
+        reference: The relationship reference of the part from the current model
+    """
+
+    return Coalesce(
+        F(f'{reference}stock_summary__{field}'),
+        Decimal(0),
+        output_field=models.DecimalField(),
+    )
+
+
 def annotate_category_parts():
     """Construct a queryset annotation which returns the number of parts in a particular category.
 
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.19 on 2023-06-05 10:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('part', '0113_auto_20230531_1205'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartStockSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('in_stock', models.DecimalField(decimal_places=5, default=0, help_text='Quantity of stock for this part', max_digits=19, verbose_name='In Stock')),
+                ('variant_stock', models.DecimalField(decimal_places=5, default=0, help_text='Quantity of stock for variants of this part', max_digits=19, verbose_name='Variant Stock')),
+                ('allocated_build', models.DecimalField(decimal_places=5, default=0, help_text='Quantity of stock allocated to active build orders', max_digits=19, verbose_name='Allocated to Build Orders')),
+                ('allocated_sales', models.DecimalField(decimal_places=5, default=0, help_text='Quantity of stock allocated to open sales orders', max_digits=19, verbose_name='Allocated to Sales Orders')),
+                ('on_order', models.DecimalField(decimal_places=5, default=0, help_text='Quantity of stock on order', max_digits=19, verbose_name='On Order')),
+                ('updated', models.DateTimeField(blank=True, help_text='Timestamp of last update', null=True, verbose_name='Updated')),
+                ('part', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stock_summary', to='part.part', verbose_name='Part')),
+            ],
+            options={
+                'verbose_name': 'Part Stock Summary',
+            },
+        ),
+    ]
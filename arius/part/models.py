@@ -12,20 +12,21 @@ from decimal import Decimal, InvalidOperation
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import MinLengthValidator, MinValueValidator
 from django.db import models, transaction
-from django.db.models import ExpressionWrapper, F, Q, Sum, UniqueConstraint
+from django.db.models import F, Q, Sum, UniqueConstraint
 from django.db.models.functions import Coalesce
 from django.db.models.signals import post_delete, post_save
 from django.db.utils import IntegrityError
 from django.dispatch import receiver
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from django_cleanup import cleanup
 from djmoney.contrib.exchange.exceptions import MissingRate
-from djmoney.contrib.exchange.models import convert_money
 from djmoney.money import Money
 from jinja2 import Template
 from mptt.exceptions import InvalidMove
@@ -34,6 +35,7 @@ from mptt.models import MPTTModel, TreeForeignKey
 from stdimage.models import StdImageField
 from taggit.managers import TaggableManager
 
+import common.currency
 import common.models
 import common.settings
 import arius.conversion
@@ -57,6 +59,7 @@ from arius.status_codes import (BuildStatusGroups, PurchaseOrderStatus,
                                 SalesOrderStatus, SalesOrderStatusGroups)
 from order import models as OrderModels
 from stock import models as StockModels
+from stock import serial_numbers
 
 logger = logging.getLogger("arius")
 
@@ -514,7 +517,8 @@ class Part(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, MPTTModel):
         b) The parent part is used in the BOM for *this* part
         c) The parent part is used in the BOM for any child parts under this one
         """
-        result = True
+
+        import part.bom
 
         try:
             if self.pk == parent.pk:
@@ -523,33 +527,28 @@ class Part(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, MPTTModel):
                     p2=str(parent)
                 )})
 
-            bom_items = self.get_bom_items()
+            if self.pk is not None:
+                graph = part.bom.BomGraph()
 
-            # Ensure that the parent part does not appear under any child BOM item!
-            for item in bom_items.all():
+                # Ensure that the parent part does not appear under any child BOM item!
+                if recursive:
+                    sub_parts = graph.get_reachable(self.pk)
+                else:
+                    sub_parts = graph.get_sub_parts(self.pk)
 
-                # Check for simple match
-                if item.sub_part == parent:
+                if parent.pk in sub_parts:
                     raise ValidationError({'sub_part': _("Part '{p1}' is  used in BOM for '{p2}' (recursive)").format(
                         p1=str(parent),
                         p2=str(self)
                     )})
 
-                # And recursively check too
-                if recursive:
-                    result = result and item.sub_part.check_add_to_bom(
-                        parent,
-                        recursive=True,
-                        raise_error=raise_error
-                    )
-
         except ValidationError as e:
             if raise_error:
                 raise e
             else:
                 return False
 
-        return result
+        return True
 
     def validate_name(self, raise_error=True):
         """Validate the name field for this Part instance
@@ -655,17 +654,7 @@ class Part(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, MPTTModel):
         if not check_duplicates:
             return
 
-        from part.models import Part
-        from stock.models import StockItem
-
-        if common.models.AriusSetting.get_setting('SERIAL_NUMBER_GLOBALLY_UNIQUE', False):
-            # Serial number must be unique across *all* parts
-            parts = Part.objects.all()
-        else:
-            # Serial number must only be unique across this part "tree"
-            parts = Part.objects.filter(tree_id=self.tree_id)
-
-        stock = StockItem.objects.filter(part__in=parts, serial=serial)
+        stock = self.get_serialized_stock().filter(serial=serial)
 
         if stock_item:
             # Exclude existing StockItem from query
@@ -680,50 +669,90 @@ class Part(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, MPTTModel):
             # This serial number is perfectly valid
             return True
 
-    def find_conflicting_serial_numbers(self, serials: list):
-        """For a provided list of serials, return a list of those which are conflicting."""
+    def get_serialized_stock(self):
+        """Return a queryset of the serialized stock items which share a serial number "space" with this Part.
 
-        conflicts = []
+        Serial numbers must be unique across this part "tree",
+        or across *all* parts if the SERIAL_NUMBER_GLOBALLY_UNIQUE setting is enabled.
+        """
+
+        stock = StockModels.StockItem.objects.exclude(serial=None).exclude(serial='')
+
+        if not common.models.AriusSetting.get_setting('SERIAL_NUMBER_GLOBALLY_UNIQUE', False):
+            # Serial numbers are unique across part trees
+            stock = stock.filter(part__tree_id=self.tree_id)
 
-        for serial in serials:
-            if not self.validate_serial_number(serial, part=self):
-                conflicts.append(serial)
+        return stock
 
-        return conflicts
+    def find_conflicting_serial_numbers(self, serials: list, reservation=None):
+        """For a provided list of serials, return a list of those which are conflicting.
+
+        - Each serial number is first checked by any validation plugins
+        - The remaining serial numbers are checked for duplicates with a single database query
+        - Any serial number which is repeated within the provided list is also conflicting
+        - Any serial number which has been reserved (see stock.serial_numbers) is also conflicting
+
+        Arguments:
+            serials: List of serial numbers to check
+            reservation: Reservation key - serial numbers reserved against this key are not conflicting
+        """
+
+        conflicts = set()
+        unchecked = set()
+        seen = set()
+        values = [str(serial).strip() for serial in serials]
+
+        for value in values:
+
+            if value in seen:
+                # Repeated serial number
+                conflicts.add(value)
+                continue
+
+            seen.add(value)
+
+            result = self.validate_serial_number(value, check_duplicates=False)
+
+            if result is False:
+                # Rejected by a plugin
+                conflicts.add(value)
+            elif result is None:
+                # Not yet checked for duplicates
+                unchecked.add(value)
+
+        if unchecked:
+            conflicts.update(self.get_serialized_stock().filter(serial__in=unchecked).values_list('serial', flat=True))
+            conflicts.update(serial_numbers.get_reserved_serial_numbers(self, unchecked, exclude_key=reservation))
+
+        return [serial for serial, value in zip(serials, values) if value in conflicts]
 
     def get_latest_serial_number(self):
         """Find the 'latest' serial number for this Part.
 
-        Here we attempt to find the "highest" serial number which exists for this Part.
+        Here we attempt to find the "highest" serial number which exists (or is reserved) for this Part.
         There are a number of edge cases where this method can fail,
         but this is accepted to keep database performance at a reasonable level.
 
         Note: Serial numbers must be unique across an entire Part "tree",
-        so we filter by the entire tree.
+        so we use the serial number index for the entire tree.
 
         Returns:
             The latest serial number specified for this part, or None
         """
 
-        stock = StockModels.StockItem.objects.all().exclude(serial=None).exclude(serial='')
+        return serial_numbers.get_index(self).latest
 
-        # Generate a query for any stock items for this part variant tree with non-empty serial numbers
-        if common.models.AriusSetting.get_setting('SERIAL_NUMBER_GLOBALLY_UNIQUE', False):
-            # Serial numbers are unique across all parts
-            pass
-        else:
-            # Serial numbers are unique acros part trees
-            stock = stock.filter(part__tree_id=self.tree_id)
+    def get_next_serial_numbers(self, quantity: int = 1, start=None):
+        """Return the next available (integer) serial numbers for this Part.
 
-        # There are no matching StockItem objects (skip further tests)
-        if not stock.exists():
-            return None
+        Note: The returned serial numbers are not reserved (see stock.serial_numbers.reserve_serial_numbers)
 
-        # Sort in descending order
-        stock = stock.order_by('-serial_int', '-serial', '-pk')
+        Arguments:
+            quantity: Number of serial numbers to return
+            start: The first serial number to consider (default = after the highest integer serial number in use)
+        """
 
-        # Return the first serial value
-        return stock[0].serial
+        return serial_numbers.get_index(self).allocate(quantity, start=start)
 
     @property
     def full_name(self):
@@ -1235,98 +1264,15 @@ class Part(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, MPTTModel):
 
     @property
     def can_build(self):
-        """Return the number of units that can be build with available stock."""
-
-        import part.filters
-
-        # If this part does NOT have a BOM, result is simply the currently available stock
-        if not self.has_bom:
-            return 0
-
-        total = None
-
-        # Prefetch related tables, to reduce query expense
-        queryset = self.get_bom_items()
-
-        # Ignore 'consumable' BOM items for this calculation
-        queryset = queryset.filter(consumable=False)
-
-        queryset = queryset.prefetch_related(
-            'sub_part__stock_items',
-            'sub_part__stock_items__allocations',
-            'sub_part__stock_items__sales_order_allocations',
-            'substitutes',
-            'substitutes__part__stock_items',
-        )
-
-        # Annotate the 'available stock' for each part in the BOM
-        ref = 'sub_part__'
-        queryset = queryset.alias(
-            total_stock=part.filters.annotate_total_stock(reference=ref),
-            so_allocations=part.filters.annotate_sales_order_allocations(reference=ref),
-            bo_allocations=part.filters.annotate_build_order_allocations(reference=ref),
-        )
-
-        # Calculate the 'available stock' based on previous annotations
-        queryset = queryset.annotate(
-            available_stock=ExpressionWrapper(
-                F('total_stock') - F('so_allocations') - F('bo_allocations'),
-                output_field=models.DecimalField(),
-            )
-        )
-
-        # Extract similar information for any 'substitute' parts
-        ref = 'substitutes__part__'
-        queryset = queryset.alias(
-            sub_total_stock=part.filters.annotate_total_stock(reference=ref),
-            sub_so_allocations=part.filters.annotate_sales_order_allocations(reference=ref),
-            sub_bo_allocations=part.filters.annotate_build_order_allocations(reference=ref),
-        )
-
-        queryset = queryset.annotate(
-            substitute_stock=ExpressionWrapper(
-                F('sub_total_stock') - F('sub_so_allocations') - F('sub_bo_allocations'),
-                output_field=models.DecimalField(),
-            )
-        )
-
-        # Extract similar information for any 'variant' parts
-        variant_stock_query = part.filters.variant_stock_query(reference='sub_part__')
-
-        queryset = queryset.alias(
-            var_total_stock=part.filters.annotate_variant_quantity(variant_stock_query, reference='quantity'),
-            var_bo_allocations=part.filters.annotate_variant_quantity(variant_stock_query, reference='allocations__quantity'),
-            var_so_allocations=part.filters.annotate_variant_quantity(variant_stock_query, reference='sales_order_allocations__quantity'),
-        )
-
-        queryset = queryset.annotate(
-            variant_stock=ExpressionWrapper(
-                F('var_total_stock') - F('var_bo_allocations') - F('var_so_allocations'),
-                output_field=models.DecimalField(),
-            )
-        )
-
-        for item in queryset.all():
-
-            if item.quantity <= 0:
-                # Ignore zero-quantity items
-                continue
-
-            # Iterate through each item in the queryset, work out the limiting quantity
-            quantity = item.available_stock + item.substitute_stock
-
-            if item.allow_variants:
-                quantity += item.variant_stock
+        """Return the number of units that can be build with available stock.
 
-            n = int(quantity / item.quantity)
-
-            if total is None or n < total:
-                total = n
+        Note: To calculate this value for many assemblies at once,
+        use part.bom.get_can_build_quantities() to avoid repeated queries.
+        """
 
-        if total is None:
-            total = 0
+        import part.bom
 
-        return max(total, 0)
+        return part.bom.get_can_build_quantities([self]).get(self.pk, 0)
 
     @property
     def active_builds(self):
@@ -1595,34 +1541,18 @@ class Part(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, MPTTModel):
         Includes consideration of inherited BOMs
         """
 
-        # Grab a queryset of all BomItem objects which "require" this part
-        bom_items = BomItem.objects.filter(
-            self.get_used_in_bom_item_filter(
-                include_substitutes=include_substitutes
-            )
-        )
-
-        # Iterate through the returned items and construct a set of
-        parts = set()
+        import part.bom
 
-        for bom_item in bom_items:
-            if bom_item.part in parts:
-                continue
-
-            parts.add(bom_item.part)
-
-            # Include inherited BOMs?
-            if include_inherited and bom_item.inherited:
-                try:
-                    descendants = bom_item.part.get_descendants(include_self=False)
-                except ValueError:
-                    # This part is not saved yet
-                    descendants = []
+        if self.pk is None:
+            return []
 
-                for variant in descendants:
-                    parts.add(variant)
+        assemblies = part.bom.BomGraph().get_used_in(
+            self.pk,
+            include_inherited=include_inherited,
+            include_substitutes=include_substitutes,
+        )
 
-        return list(parts)
+        return list(Part.objects.filter(pk__in=assemblies))
 
     @property
     def has_bom(self):
@@ -1711,6 +1641,16 @@ class Part(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, MPTTModel):
         if parts is None:
             parts = set()
 
+        if recursive:
+            import part.bom
+
+            # Traverse the entire BOM structure (one query per BOM level)
+            sub_parts = part.bom.BomGraph().get_reachable(self.pk)
+
+            parts.update(Part.objects.filter(pk__in=sub_parts))
+
+            return parts
+
         bom_items = self.get_bom_items()
 
         for bom_item in bom_items:
@@ -1721,9 +1661,6 @@ class Part(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, MPTTModel):
 
                 parts.add(sub_part)
 
-                if recursive:
-                    sub_part.getRequiredParts(recursive=True, parts=parts)
-
         return parts
 
     @property
@@ -1981,7 +1918,10 @@ class Part(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, MPTTModel):
         """
         currency = currency_code_default()
         try:
-            prices = [convert_money(item.purchase_price, currency).amount for item in self.stock_items.all() if item.purchase_price]
+            prices = common.currency.convert_values(
+                [item.purchase_price for item in self.stock_items.all() if item.purchase_price], currency
+            )
+            prices = [price.amount for price in prices]
         except MissingRate:
             prices = None
 
@@ -2323,6 +2263,9 @@ def after_save_part(sender, instance: Part, created, **kwargs):
             force_async=True
         )
 
+        # Variant stock for parent parts may have changed
+        PartStockSummary.schedule_update([instance.pk])
+
 
 class PartPricing(common.models.MetaMixin):
     """Model for caching min/max pricing information for a particular Part
@@ -2368,15 +2311,33 @@ class PartPricing(common.models.MetaMixin):
         target_currency = currency_code_default()
 
         try:
-            result = convert_money(money, target_currency)
+            result = common.currency.convert_money(money, target_currency)
         except MissingRate:
             logger.warning(f"No currency conversion rate available for {money.currency} -> {target_currency}")
             result = None
 
         return result
 
-    def schedule_for_update(self, counter: int = 0, test: bool = False):
-        """Schedule this pricing to be updated"""
+    def convert_all(self, values):
+        """Convert multiple money values to the default currency (as a single batch).
+
+        Any values which cannot be converted (e.g. missing exchange rate) are returned as None
+        """
+
+        return common.currency.convert_values(values, currency_code_default(), ignore_missing=True)
+
+    # Pricing updates are collected over this time window (seconds) and processed as a single batch
+    UPDATE_QUEUE_WINDOW = 5
+
+    # Cache key used to ensure only one queue processing task is offloaded per batch window
+    UPDATE_QUEUE_CACHE_KEY = 'part_pricing_update_queue'
+
+    def schedule_for_update(self, test: bool = False):
+        """Schedule this pricing to be updated.
+
+        The pricing is marked as 'scheduled_for_update', which adds it to the pricing update queue.
+        The queue is processed in the background (see process_update_queue).
+        """
 
         import arius.ready
 
@@ -2417,11 +2378,6 @@ class PartPricing(common.models.MetaMixin):
             logger.debug(f"Pricing for {p} already scheduled for update - skipping")
             return
 
-        if counter > 25:
-            # Prevent infinite recursion / stack depth issues
-            logger.debug(counter, f"Skipping pricing update for {p} - maximum depth exceeded")
-            return
-
         try:
             self.scheduled_for_update = True
             self.save()
@@ -2430,19 +2386,95 @@ class PartPricing(common.models.MetaMixin):
             logger.error(f"Could not save PartPricing for part '{self.part}' to the database")
             return
 
-        import part.tasks as part_tasks
+        self.schedule_update_queue()
 
-        # Offload task to update the pricing
-        # Force async, to prevent running in the foreground
-        arius.tasks.offload_task(
-            part_tasks.update_part_pricing,
-            self,
-            counter=counter,
-            force_async=True
+    @classmethod
+    def schedule_update_queue(cls):
+        """Schedule a background task to process the pricing update queue.
+
+        The task is scheduled to run once the batch window has elapsed,
+        so that a worker process is not tied up while further updates are collected.
+        Only a single task is scheduled per batch window,
+        no matter how many parts are marked for update within that window.
+        """
+
+        from django_q.models import Schedule
+
+        if not cache.add(cls.UPDATE_QUEUE_CACHE_KEY, True, timeout=cls.UPDATE_QUEUE_WINDOW):
+            # Queue processing is already scheduled
+            return
+
+        arius.tasks.schedule_task(
+            'part.tasks.process_pricing_queue',
+            schedule_type=Schedule.ONCE,
+            next_run=timezone.now() + timedelta(seconds=cls.UPDATE_QUEUE_WINDOW),
         )
 
-    def update_pricing(self, counter: int = 0, cascade: bool = True):
-        """Recalculate all cost data for the referenced Part instance"""
+    @classmethod
+    def process_update_queue(cls):
+        """Recalculate pricing for all parts which are scheduled for update.
+
+        - Any assemblies or templates which depend on the scheduled parts are also updated
+        - The dependent parts are found one level at a time (using the BOM graph), not one part at a time
+        - Parts are processed in topological order (BOM leaves first)
+        - Each part is updated exactly once, no matter how many scheduled parts it depends on
+
+        Returns:
+            int: The number of parts which were updated
+        """
+
+        import part.bom
+
+        graph = part.bom.BomGraph()
+
+        pending = set(cls.objects.filter(scheduled_for_update=True).values_list('part', flat=True))
+
+        dependents = {}
+
+        # Walk "up" the BOM (and variant) graph to find all affected parts
+        while pending:
+            graph.load_used_in(pending)
+
+            trees = {}
+
+            for pk in pending:
+                dependents[pk] = graph.get_used_in(pk)
+
+                # Parts at the top of a variant tree (lft = 1) have no templates
+                if pk in graph.tree and graph.tree[pk][1] > 1:
+                    trees.setdefault(graph.tree[pk][0], []).append(pk)
+
+            # Template parts above each part in the variant tree
+            query = Q(pk__in=[])
+
+            for tree_id, pks in trees.items():
+                for pk in pks:
+                    query |= Q(tree_id=tree_id, lft__lt=graph.tree[pk][1], rght__gt=graph.tree[pk][2])
+
+            if trees:
+                for template, *tree in Part.objects.filter(query).order_by().values_list('pk', 'tree_id', 'lft', 'rght'):
+                    graph.tree[template] = tuple(tree)
+
+                    for pk in trees[tree[0]]:
+                        if graph.is_ancestor(template, pk):
+                            dependents[pk].add(template)
+
+            pending = set().union(*[dependents[pk] for pk in pending]).difference(dependents.keys())
+
+        parts = {p.pk: p for p in Part.objects.filter(pk__in=dependents.keys())}
+
+        for pk in part.bom.topological_order(dependents):
+            if pk in parts:
+                parts[pk].pricing.update_pricing(cascade=False)
+
+        return len(parts)
+
+    def update_pricing(self, cascade: bool = True):
+        """Recalculate all cost data for the referenced Part instance.
+
+        Arguments:
+            cascade: If True, schedule pricing updates for any assemblies or templates which depend on this part
+        """
 
         # If importing data, skip pricing update
         if arius.ready.isImportingData():
@@ -2477,25 +2509,25 @@ class PartPricing(common.models.MetaMixin):
 
         # Update parent assemblies and templates
         if cascade:
-            self.update_assemblies(counter)
-            self.update_templates(counter)
+            self.update_assemblies()
+            self.update_templates()
 
-    def update_assemblies(self, counter: int = 0):
+    def update_assemblies(self):
         """Schedule updates for any assemblies which use this part"""
 
         # If the linked Part is used in any assemblies, schedule a pricing update for those assemblies
         used_in_parts = self.part.get_used_in()
 
         for p in used_in_parts:
-            p.pricing.schedule_for_update(counter + 1)
+            p.pricing.schedule_for_update()
 
-    def update_templates(self, counter: int = 0):
+    def update_templates(self):
         """Schedule updates for any template parts above this part"""
 
         templates = self.part.get_ancestors(include_self=False)
 
         for p in templates:
-            p.pricing.schedule_for_update(counter + 1)
+            p.pricing.schedule_for_update()
 
     def save(self, *args, **kwargs):
         """Whenever pricing model is saved, automatically update overall prices"""
@@ -2608,13 +2640,12 @@ class PartPricing(common.models.MetaMixin):
         purchase_min = None
         purchase_max = None
 
-        for line in line_items:
-
-            if line.purchase_price is None:
-                continue
+        # Take supplier part pack size into account
+        purchase_costs = self.convert_all([
+            line.purchase_price / line.part.pack_quantity_native for line in line_items.select_related('part') if line.purchase_price is not None
+        ])
 
-            # Take supplier part pack size into account
-            purchase_cost = self.convert(line.purchase_price / line.part.pack_quantity_native)
+        for purchase_cost in purchase_costs:
 
             if purchase_cost is None:
                 continue
@@ -2637,8 +2668,7 @@ class PartPricing(common.models.MetaMixin):
                 date_threshold = datetime.now().date() - timedelta(days=days)
                 items = items.filter(updated__gte=date_threshold)
 
-            for item in items:
-                cost = self.convert(item.purchase_price)
+            for cost in self.convert_all([item.purchase_price for item in items]):
 
                 # Skip if the cost could not be converted (for some reason)
                 if cost is None:
@@ -2664,8 +2694,7 @@ class PartPricing(common.models.MetaMixin):
 
         if AriusSetting.get_setting('PART_INTERNAL_PRICE', False, cache=False):
             # Only calculate internal pricing if internal pricing is enabled
-            for pb in self.part.internalpricebreaks.all():
-                cost = self.convert(pb.price)
+            for cost in self.convert_all([pb.price for pb in self.part.internalpricebreaks.all()]):
 
                 if cost is None:
                     # Ignore if cost could not be converted for some reason
@@ -2695,6 +2724,8 @@ class PartPricing(common.models.MetaMixin):
 
         if self.part.purchaseable:
 
+            prices = []
+
             # Iterate through each available SupplierPart instance
             for sp in self.part.supplier_parts.all():
 
@@ -2705,16 +2736,18 @@ class PartPricing(common.models.MetaMixin):
                         continue
 
                     # Ensure we take supplier part pack size into account
-                    cost = self.convert(pb.price / sp.pack_quantity_native)
+                    prices.append(pb.price / sp.pack_quantity_native)
 
-                    if cost is None:
-                        continue
+            for cost in self.convert_all(prices):
+
+                if cost is None:
+                    continue
 
-                    if min_sup_cost is None or cost < min_sup_cost:
-                        min_sup_cost = cost
+                if min_sup_cost is None or cost < min_sup_cost:
+                    min_sup_cost = cost
 
-                    if max_sup_cost is None or cost > max_sup_cost:
-                        max_sup_cost = cost
+                if max_sup_cost is None or cost > max_sup_cost:
+                    max_sup_cost = cost
 
         self.supplier_price_min = min_sup_cost
         self.supplier_price_max = max_sup_cost
@@ -2759,12 +2792,31 @@ class PartPricing(common.models.MetaMixin):
         if save:
             self.save()
 
-    def update_overall_cost(self):
+    @staticmethod
+    def get_overall_cost_settings():
+        """Return the global settings which affect the overall cost calculation"""
+
+        return {
+            key: AriusSetting.get_setting(key, default, cache=False) for key, default in [
+                ('PRICING_PURCHASE_HISTORY_OVERRIDES_SUPPLIER', False),
+                ('PRICING_USE_SUPPLIER_PRICING', True),
+                ('PRICING_USE_VARIANT_PRICING', True),
+                ('PART_BOM_USE_INTERNAL_PRICE', False),
+            ]
+        }
+
+    def update_overall_cost(self, pricing_settings: dict = None):
         """Update overall cost values.
 
         Here we simply take the minimum / maximum values of the other calculated fields.
+
+        Arguments:
+            pricing_settings: Pre-loaded settings values (see get_overall_cost_settings), to avoid repeated lookups when updating many parts
         """
 
+        if pricing_settings is None:
+            pricing_settings = self.get_overall_cost_settings()
+
         overall_min = None
         overall_max = None
 
@@ -2780,9 +2832,9 @@ class PartPricing(common.models.MetaMixin):
             self.internal_cost_max,
         ]
 
-        purchase_history_override = AriusSetting.get_setting('PRICING_PURCHASE_HISTORY_OVERRIDES_SUPPLIER', False, cache=False)
+        purchase_history_override = pricing_settings['PRICING_PURCHASE_HISTORY_OVERRIDES_SUPPLIER']
 
-        if AriusSetting.get_setting('PRICING_USE_SUPPLIER_PRICING', True, cache=False):
+        if pricing_settings['PRICING_USE_SUPPLIER_PRICING']:
             # Add supplier pricing data, *unless* historical pricing information should override
             if self.purchase_cost_min is None or not purchase_history_override:
                 min_costs.append(self.supplier_price_min)
@@ -2790,7 +2842,7 @@ class PartPricing(common.models.MetaMixin):
             if self.purchase_cost_max is None or not purchase_history_override:
                 max_costs.append(self.supplier_price_max)
 
-        if AriusSetting.get_setting('PRICING_USE_VARIANT_PRICING', True, cache=False):
+        if pricing_settings['PRICING_USE_VARIANT_PRICING']:
             # Include variant pricing in overall calculations
             min_costs.append(self.variant_cost_min)
             max_costs.append(self.variant_cost_max)
@@ -2817,7 +2869,7 @@ class PartPricing(common.models.MetaMixin):
             if overall_max is None or cost > overall_max:
                 overall_max = cost
 
-        if AriusSetting.get_setting('PART_BOM_USE_INTERNAL_PRICE', False, cache=False):
+        if pricing_settings['PART_BOM_USE_INTERNAL_PRICE']:
             # Check if internal pricing should override other pricing
             if self.internal_cost_min is not None:
                 overall_min = self.internal_cost_min
@@ -2835,9 +2887,7 @@ class PartPricing(common.models.MetaMixin):
         min_sell_price = None
         max_sell_price = None
 
-        for pb in self.part.salepricebreaks.all():
-
-            cost = self.convert(pb.price)
+        for cost in self.convert_all([pb.price for pb in self.part.salepricebreaks.all()]):
 
             if cost is None:
                 continue
@@ -2864,9 +2914,7 @@ class PartPricing(common.models.MetaMixin):
         # Exclude line items which do not have associated pricing data
         line_items = line_items.exclude(sale_price=None)
 
-        for line in line_items:
-
-            cost = self.convert(line.sale_price)
+        for cost in self.convert_all([line.sale_price for line in line_items]):
 
             if cost is None:
                 continue
@@ -2999,6 +3047,203 @@ class PartPricing(common.models.MetaMixin):
     )
 
 
+class PartStockSummary(models.Model):
+    """Model for caching stock quantity information for a particular Part.
+
+    Calculating stock quantities for a Part requires multiple subquery annotations,
+    which are expensive when listing a large number of parts.
+    Instead, these quantities can be pre-calculated and stored against each Part.
+
+    The summary is updated whenever a related StockItem, BuildItem, SalesOrderAllocation
+    or PurchaseOrderLineItem instance is saved or deleted, and is only used when the
+    PART_STOCK_SUMMARY setting is enabled.
+
+    Attributes:
+        part: Link to the Part instance
+        in_stock: Quantity of stock for this part (not including variants)
+        variant_stock: Quantity of stock for any variants of this part
+        allocated_build: Quantity of stock allocated to active build orders
+        allocated_sales: Quantity of stock allocated to open sales orders
+        on_order: Quantity of stock on order (against open purchase orders)
+        updated: Timestamp of last update
+    """
+
+    # Summary fields which are calculated for each Part
+    SUMMARY_FIELDS = [
+        'in_stock',
+        'variant_stock',
+        'allocated_build',
+        'allocated_sales',
+        'on_order',
+    ]
+
+    class Meta:
+        """Metaclass defines extra model properties"""
+        verbose_name = _('Part Stock Summary')
+
+    @staticmethod
+    def is_enabled():
+        """Return True if the stock summary table is enabled"""
+        return common.models.AriusSetting.get_setting('PART_STOCK_SUMMARY', False)
+
+    @classmethod
+    def schedule_update(cls, part_ids):
+        """Schedule an update of the stock summary for the provided parts.
+
+        Arguments:
+            part_ids: Iterable of Part ID values
+        """
+
+        if not arius.ready.canAppAccessDatabase(allow_test=True):
+            return
+
+        # If importing data, skip summary update
+        if arius.ready.isImportingData():
+            return
+
+        if not cls.is_enabled():
+            return
+
+        part_ids = sorted({pk for pk in part_ids if pk is not None})
+
+        if part_ids:
+            # Wait until the current transaction is committed, as the parts may be about to be deleted
+            transaction.on_commit(lambda: arius.tasks.offload_task(
+                'part.tasks.update_stock_summary',
+                part_ids,
+            ))
+
+    @classmethod
+    def update_parts(cls, part_ids, include_ancestors=True):
+        """Recalculate the stock summary for the provided parts.
+
+        Any parts which no longer exist (e.g. deleted since the update was scheduled) are ignored.
+
+        Arguments:
+            part_ids: Iterable of Part ID values
+            include_ancestors: If True, also update any template parts above the provided parts (as variant stock may have changed)
+
+        Returns:
+            int: The number of summary entries which were updated
+        """
+
+        import part.filters
+
+        parts = Part.objects.filter(pk__in=part_ids)
+
+        if include_ancestors:
+            # Find any parts above the provided parts in each variant tree
+            ancestor_filter = Q(pk__in=[])
+
+            for tree_id, lft, rght in parts.values_list('tree_id', 'lft', 'rght'):
+                ancestor_filter |= Q(tree_id=tree_id, lft__lte=lft, rght__gte=rght)
+
+            parts = Part.objects.filter(ancestor_filter)
+
+        # Calculate all summary quantities in a single query
+        rows = parts.prefetch_related(None).order_by().annotate(
+            summary_in_stock=part.filters.annotate_total_stock(),
+            summary_variant_stock=part.filters.annotate_variant_quantity(
+                part.filters.variant_stock_query(), reference='quantity'
+            ),
+            summary_allocated_build=part.filters.annotate_build_order_allocations(),
+            summary_allocated_sales=part.filters.annotate_sales_order_allocations(),
+            summary_on_order=part.filters.annotate_on_order_quantity(),
+        ).values('pk', *[f'summary_{field}' for field in cls.SUMMARY_FIELDS])
+
+        existing = {summary.part_id: summary for summary in cls.objects.filter(part__in=parts)}
+
+        to_create = []
+        to_update = []
+
+        for row in rows:
+            summary = existing.get(row['pk'], None)
+
+            if summary is None:
+                summary = cls(part_id=row['pk'])
+                to_create.append(summary)
+            else:
+                to_update.append(summary)
+
+            for field in cls.SUMMARY_FIELDS:
+                setattr(summary, field, Decimal(str(row[f'summary_{field}'] or 0)))
+
+            summary.updated = timezone.now()
+
+        if to_update:
+            cls.objects.bulk_update(to_update, [*cls.SUMMARY_FIELDS, 'updated'])
+
+        if to_create:
+            # Another process may have concurrently created an entry for the same part
+            cls.objects.bulk_create(to_create, ignore_conflicts=True)
+
+        return len(to_update) + len(to_create)
+
+    @classmethod
+    def rebuild(cls, chunk_size: int = 1000):
+        """Recalculate the stock summary for *all* parts.
+
+        Parts are processed in chunks, to limit the size of each query.
+
+        Returns:
+            int: The number of summary entries which were updated
+        """
+
+        part_ids = list(Part.objects.order_by('pk').values_list('pk', flat=True))
+
+        count = 0
+
+        for idx in range(0, len(part_ids), chunk_size):
+            count += cls.update_parts(part_ids[idx:idx + chunk_size], include_ancestors=False)
+
+        # Remove any orphaned entries
+        cls.objects.exclude(part__in=Part.objects.all()).delete()
+
+        return count
+
+    part = models.OneToOneField(
+        Part, on_delete=models.CASCADE,
+        related_name='stock_summary',
+        verbose_name=_('Part'),
+    )
+
+    in_stock = models.DecimalField(
+        max_digits=19, decimal_places=5, default=0,
+        verbose_name=_('In Stock'),
+        help_text=_('Quantity of stock for this part'),
+    )
+
+    variant_stock = models.DecimalField(
+        max_digits=19, decimal_places=5, default=0,
+        verbose_name=_('Variant Stock'),
+        help_text=_('Quantity of stock for variants of this part'),
+    )
+
+    allocated_build = models.DecimalField(
+        max_digits=19, decimal_places=5, default=0,
+        verbose_name=_('Allocated to Build Orders'),
+        help_text=_('Quantity of stock allocated to active build orders'),
+    )
+
+    allocated_sales = models.DecimalField(
+        max_digits=19, decimal_places=5, default=0,
+        verbose_name=_('Allocated to Sales Orders'),
+        help_text=_('Quantity of stock allocated to open sales orders'),
+    )
+
+    on_order = models.DecimalField(
+        max_digits=19, decimal_places=5, default=0,
+        verbose_name=_('On Order'),
+        help_text=_('Quantity of stock on order'),
+    )
+
+    updated = models.DateTimeField(
+        null=True, blank=True,
+        verbose_name=_('Updated'),
+        help_text=_('Timestamp of last update'),
+    )
+
+
 class PartStocktake(models.Model):
     """Model representing a 'stocktake' entry for a particular Part.
 
@@ -33,7 +33,8 @@ from .models import (BomItem, BomItemSubstitute, Part, PartAttachment,
                      PartInternalPriceBreak, PartParameter,
                      PartParameterTemplate, PartPricing, PartRelated,
                      PartSellPriceBreak, PartStar, PartStocktake,
-                     PartStocktakeReport, PartTestTemplate)
+                     PartStocktakeReport, PartStockSummary,
+                     PartTestTemplate)
 
 logger = logging.getLogger("arius")
 
@@ -499,6 +500,7 @@ class PartSerializer(arius.serializers.RemoteImageMixin, arius.serializers.Arius
             'allocated_to_build_orders',
             'allocated_to_sales_orders',
             'building',
+            'can_build',
             'in_stock',
             'ordering',
             'required_for_build_orders',
@@ -529,6 +531,7 @@ class PartSerializer(arius.serializers.RemoteImageMixin, arius.serializers.Arius
         - Allows us to optionally pass extra fields based on the query.
         """
         self.starred_parts = kwargs.pop('starred_parts', [])
+        self.can_build_quantities = kwargs.pop('can_build', None)
         category_detail = kwargs.pop('category_detail', False)
         parameters = kwargs.pop('parameters', False)
         create = kwargs.pop('create', False)
@@ -541,6 +544,9 @@ class PartSerializer(arius.serializers.RemoteImageMixin, arius.serializers.Arius
         if not parameters:
             self.fields.pop('parameters')
 
+        if self.can_build_quantities is None:
+            self.fields.pop('can_build')
+
         if not create:
             # These fields are only used for the LIST API endpoint
             for f in self.skip_create_fields()[1:]:
@@ -576,12 +582,19 @@ class PartSerializer(arius.serializers.RemoteImageMixin, arius.serializers.Arius
             stock_item_count=SubqueryCount('stock_items')
         )
 
+        use_summary = PartStockSummary.is_enabled()
+
         # Annotate with the total variant stock quantity
-        variant_query = part.filters.variant_stock_query()
+        if use_summary:
+            queryset = queryset.annotate(
+                variant_stock=part.filters.annotate_stock_summary('variant_stock'),
+            )
+        else:
+            variant_query = part.filters.variant_stock_query()
 
-        queryset = queryset.annotate(
-            variant_stock=part.filters.annotate_variant_quantity(variant_query, reference='quantity'),
-        )
+            queryset = queryset.annotate(
+                variant_stock=part.filters.annotate_variant_quantity(variant_query, reference='quantity'),
+            )
 
         # Filter to limit builds to "active"
         build_filter = Q(
@@ -609,12 +622,21 @@ class PartSerializer(arius.serializers.RemoteImageMixin, arius.serializers.Arius
         # TODO: This could do with some refactoring
         # TODO: Note that BomItemSerializer and BuildLineSerializer have very similar code
 
-        queryset = queryset.annotate(
-            ordering=part.filters.annotate_on_order_quantity(),
-            in_stock=part.filters.annotate_total_stock(),
-            allocated_to_sales_orders=part.filters.annotate_sales_order_allocations(),
-            allocated_to_build_orders=part.filters.annotate_build_order_allocations(),
-        )
+        if use_summary:
+            # Read pre-calculated quantities from the stock summary table
+            queryset = queryset.annotate(
+                ordering=part.filters.annotate_stock_summary('on_order'),
+                in_stock=part.filters.annotate_stock_summary('in_stock'),
+                allocated_to_sales_orders=part.filters.annotate_stock_summary('allocated_sales'),
+                allocated_to_build_orders=part.filters.annotate_stock_summary('allocated_build'),
+            )
+        else:
+            queryset = queryset.annotate(
+                ordering=part.filters.annotate_on_order_quantity(),
+                in_stock=part.filters.annotate_total_stock(),
+                allocated_to_sales_orders=part.filters.annotate_sales_order_allocations(),
+                allocated_to_build_orders=part.filters.annotate_build_order_allocations(),
+            )
 
         # Annotate the queryset with the 'total_in_stock' quantity
         # This is the 'in_stock' quantity summed with the 'variant_stock' quantity
@@ -645,6 +667,10 @@ class PartSerializer(arius.serializers.RemoteImageMixin, arius.serializers.Arius
         """Return "true" if the part is starred by the current user."""
         return part in self.starred_parts
 
+    def get_can_build(self, part):
+        """Return the pre-calculated 'can_build' quantity for the part."""
+        return self.can_build_quantities.get(part.pk, 0)
+
     # Extra detail for the category
     category_detail = CategorySerializer(source='category', many=False, read_only=True)
 
@@ -664,6 +690,7 @@ class PartSerializer(arius.serializers.RemoteImageMixin, arius.serializers.Arius
     image = arius.serializers.AriusImageSerializerField(required=False, allow_null=True)
     thumbnail = serializers.CharField(source='get_thumbnail_url', read_only=True)
     starred = serializers.SerializerMethodField()
+    can_build = serializers.SerializerMethodField()
 
     # PrimaryKeyRelated fields (Note: enforcing field type here results in much faster queries, somehow...)
     category = serializers.PrimaryKeyRelatedField(queryset=PartCategory.objects.all())
@@ -1208,19 +1235,31 @@ class BomItemSerializer(arius.serializers.AriusModelSerializer):
 
         ref = 'sub_part__'
 
-        # Annotate with the total "on order" amount for the sub-part
-        queryset = queryset.annotate(
-            on_order=part.filters.annotate_on_order_quantity(ref),
-        )
+        if PartStockSummary.is_enabled():
+            # Read pre-calculated quantities for the sub_part from the stock summary table
+            queryset = queryset.annotate(
+                on_order=part.filters.annotate_stock_summary('on_order', reference=ref),
+            )
 
-        # Calculate "total stock" for the referenced sub_part
-        # Calculate the "build_order_allocations" for the sub_part
-        # Note that these fields are only aliased, not annotated
-        queryset = queryset.alias(
-            total_stock=part.filters.annotate_total_stock(reference=ref),
-            allocated_to_sales_orders=part.filters.annotate_sales_order_allocations(reference=ref),
-            allocated_to_build_orders=part.filters.annotate_build_order_allocations(reference=ref),
-        )
+            queryset = queryset.alias(
+                total_stock=part.filters.annotate_stock_summary('in_stock', reference=ref),
+                allocated_to_sales_orders=part.filters.annotate_stock_summary('allocated_sales', reference=ref),
+                allocated_to_build_orders=part.filters.annotate_stock_summary('allocated_build', reference=ref),
+            )
+        else:
+            # Annotate with the total "on order" amount for the sub-part
+            queryset = queryset.annotate(
+                on_order=part.filters.annotate_on_order_quantity(ref),
+            )
+
+            # Calculate "total stock" for the referenced sub_part
+            # Calculate the "build_order_allocations" for the sub_part
+            # Note that these fields are only aliased, not annotated
+            queryset = queryset.alias(
+                total_stock=part.filters.annotate_total_stock(reference=ref),
+                allocated_to_sales_orders=part.filters.annotate_sales_order_allocations(reference=ref),
+                allocated_to_build_orders=part.filters.annotate_build_order_allocations(reference=ref),
+            )
 
         # Calculate 'available_stock' based on previously annotated fields
         queryset = queryset.annotate(
@@ -4,18 +4,23 @@ import io
 import logging
 import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from decimal import Decimal
 
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
+from django.db import connections
+from django.db.models import (Count, DecimalField, ExpressionWrapper, F, Q,
+                              Sum)
 from django.utils.translation import gettext_lazy as _
 
 import tablib
 from djmoney.contrib.exchange.exceptions import MissingRate
-from djmoney.contrib.exchange.models import convert_money
 from djmoney.money import Money
 
+import common.currency
 import common.models
 import common.notifications
 import common.settings
@@ -78,12 +83,65 @@ def update_part_pricing(pricing: part.models.PartPricing, counter: int = 0):
 
     Arguments:
         pricing: The target PartPricing instance to be updated
-        counter: How many times this function has been called in sequence
+        counter: Unused (retained for compatibility with previously queued tasks)
     """
 
     logger.info(f"Updating part pricing for {pricing.part}")
 
-    pricing.update_pricing(counter=counter)
+    pricing.update_pricing()
+
+
+def process_pricing_queue():
+    """Update cached pricing data for all parts which are scheduled for update"""
+
+    n = part.models.PartPricing.process_update_queue()
+
+    if n > 0:
+        logger.info(f"Updated pricing for {n} parts")
+
+
+def update_stock_summary(part_ids: list):
+    """Recalculate cached stock quantity information for the specified parts
+
+    Arguments:
+        part_ids: List of Part ID values to update
+    """
+
+    logger.debug(f"Updating stock summary for {len(part_ids)} parts")
+
+    part.models.PartStockSummary.update_parts(part_ids)
+
+
+@scheduled_task(ScheduledTask.DAILY)
+def rebuild_stock_summary():
+    """Rebuild cached stock quantity information for all parts.
+
+    Bulk database operations do not trigger updates of the stock summary table,
+    so the entire table is periodically recalculated.
+    """
+
+    if not part.models.PartStockSummary.is_enabled():
+        return
+
+    logger.info("Rebuilding part stock summary")
+
+    n = part.models.PartStockSummary.rebuild()
+
+    logger.info(f"Rebuilt stock summary for {n} parts")
+
+
+def rollup_bom_pricing():
+    """Recalculate BOM and variant pricing for all parts in a single pass"""
+
+    import part.bom
+
+    logger.info("Recalculating BOM pricing for all parts")
+
+    t_start = time.time()
+
+    n = part.bom.rollup_bom_pricing()
+
+    logger.info(f"Updated BOM pricing for {n} parts in {round(time.time() - t_start, 2)}s")
 
 
 @scheduled_task(ScheduledTask.DAILY)
@@ -98,6 +156,10 @@ def check_missing_pricing(limit=250):
         limit: Maximum number of parts to process at once
     """
 
+    # Find any pricing which is scheduled for update, but was not processed (e.g. worker was interrupted)
+    if part.models.PartPricing.objects.filter(scheduled_for_update=True).exists():
+        part.models.PartPricing.schedule_update_queue()
+
     # Find parts for which pricing information has never been updated
     results = part.models.PartPricing.objects.filter(updated=None)[:limit]
 
@@ -184,7 +246,7 @@ def perform_stocktake(target: part.models.Part, user: User, note: str = '', comm
         if entry.purchase_price:
             # If purchase price is available, use that
             try:
-                pp = convert_money(entry.purchase_price, base_currency) * entry.quantity
+                pp = common.currency.convert_money(entry.purchase_price, base_currency) * entry.quantity
                 total_cost_min += pp
                 total_cost_max += pp
                 has_pricing = True
@@ -198,8 +260,8 @@ def perform_stocktake(target: part.models.Part, user: User, note: str = '', comm
 
             if p_min or p_max:
                 try:
-                    total_cost_min += convert_money(p_min, base_currency) * entry.quantity
-                    total_cost_max += convert_money(p_max, base_currency) * entry.quantity
+                    total_cost_min += common.currency.convert_money(p_min, base_currency) * entry.quantity
+                    total_cost_max += common.currency.convert_money(p_max, base_currency) * entry.quantity
                 except MissingRate:
                     logger.warning(f"MissingRate exception occurred converting {p_min}:{p_max} to {base_currency}")
 
@@ -220,6 +282,151 @@ def perform_stocktake(target: part.models.Part, user: User, note: str = '', comm
     return instance
 
 
+def get_stocktake_rates(base_currency: str) -> dict:
+    """Return the conversion rate (to the base currency) for each currency used by stock or pricing data.
+
+    Each exchange rate is looked up only once per stocktake report.
+
+    Returns:
+        dict: Map of currency code -> conversion rate (or None, if no rate is available)
+    """
+
+    currencies = set(
+        stock.models.StockItem.objects.exclude(purchase_price=None).order_by().values_list('purchase_price_currency', flat=True).distinct()
+    )
+
+    for field in ['overall_min_currency', 'overall_max_currency']:
+        currencies.update(
+            part.models.PartPricing.objects.order_by().values_list(field, flat=True).distinct()
+        )
+
+    snapshot = common.currency.get_rates()
+    rates = {}
+
+    for currency in currencies:
+        if not currency:
+            continue
+
+        try:
+            rates[currency] = snapshot.get_rate(currency, base_currency)
+        except MissingRate:
+            logger.warning(f"MissingRate exception occurred converting {currency} to {base_currency}")
+            rates[currency] = None
+
+    return rates
+
+
+def calculate_stocktake_chunk(part_ids: list, base_currency: str, rates: dict, user: User = None):
+    """Calculate stocktake information for a chunk of parts.
+
+    Stock quantity and purchase price totals are aggregated per (part, currency) using grouped queries,
+    rather than iterating through each individual stock item.
+    The result for each part matches the result of perform_stocktake:
+
+    - Stock items with a purchase price are valued at that price
+    - Any remaining stock is valued at the overall pricing range for the part
+
+    Arguments:
+        part_ids: List of Part primary keys to process
+        base_currency: Currency code for the calculated values
+        rates: Map of currency code -> conversion rate (see get_stocktake_rates)
+        user: User who requested this stocktake
+
+    Returns:
+        list: (Part, PartStocktake) tuples for each part with stock available (stocktake instances are not saved)
+    """
+
+    has_price = Q(purchase_price__isnull=False) & ~Q(purchase_price=0)
+
+    entries = stock.models.StockItem.objects.filter(
+        stock.models.StockItem.IN_STOCK_FILTER,
+        part__in=part_ids,
+    ).order_by().values('part', 'purchase_price_currency').annotate(
+        item_count=Count('pk'),
+        total_quantity=Sum('quantity'),
+        priced_quantity=Sum('quantity', filter=has_price),
+        priced_cost=Sum(
+            ExpressionWrapper(F('quantity') * F('purchase_price'), output_field=DecimalField()),
+            filter=has_price,
+        ),
+    )
+
+    totals = {}
+
+    for row in entries:
+        data = totals.setdefault(row['part'], {
+            'item_count': 0,
+            'quantity': Decimal(0),
+            'unpriced': Decimal(0),
+            'cost': Decimal(0),
+        })
+
+        data['item_count'] += row['item_count']
+        data['quantity'] += row['total_quantity']
+
+        rate = rates.get(row['purchase_price_currency'], None)
+
+        if row['priced_quantity'] and rate is not None:
+            data['cost'] += row['priced_cost'] * rate
+            data['unpriced'] += row['total_quantity'] - row['priced_quantity']
+        else:
+            data['unpriced'] += row['total_quantity']
+
+    if not totals:
+        return []
+
+    # Overall pricing data is used for any stock items without purchase price information
+    pricing = {
+        row['part']: row for row in part.models.PartPricing.objects.filter(part__in=totals.keys()).values(
+            'part', 'overall_min', 'overall_min_currency', 'overall_max', 'overall_max_currency',
+        )
+    }
+
+    def convert(amount, currency):
+        """Convert an amount to the base currency (returns None if not possible)"""
+        rate = rates.get(currency, None)
+        return None if amount is None or rate is None else amount * rate
+
+    parts = part.models.Part.objects.filter(pk__in=totals.keys()).prefetch_related(None).select_related('category')
+
+    results = []
+
+    for p in parts:
+        data = totals[p.pk]
+
+        cost_min = cost_max = data['cost']
+
+        if data['unpriced'] and (prices := pricing.get(p.pk, None)):
+
+            if prices['overall_min']:
+                p_min = convert(prices['overall_min'], prices['overall_min_currency'])
+            else:
+                p_min = convert(prices['overall_max'], prices['overall_max_currency'])
+
+            if prices['overall_max']:
+                p_max = convert(prices['overall_max'], prices['overall_max_currency'])
+            else:
+                p_max = convert(prices['overall_min'], prices['overall_min_currency'])
+
+            if p_min is not None and p_max is not None:
+                cost_min += p_min * data['unpriced']
+                cost_max += p_max * data['unpriced']
+
+        results.append((p, part.models.PartStocktake(
+            part=p,
+            item_count=data['item_count'],
+            quantity=data['quantity'],
+            cost_min=Money(cost_min, base_currency),
+            cost_max=Money(cost_max, base_currency),
+            user=user,
+        )))
+
+    # Return results in part order
+    results.sort(key=lambda result: result[0].pk)
+
+    return results
+
+
 def generate_stocktake_report(**kwargs):
     """Generated a new stocktake report.
 
@@ -235,6 +442,8 @@ def generate_stocktake_report(**kwargs):
         location: Optional StockLocation to filter results
         generate_report: If True, generate a stocktake report from the calculated data (default=True)
         update_parts: If True, save stocktake information against each filtered Part (default = True)
+        chunk_size: Number of parts to process in each chunk (default = 1000)
+        workers: Number of chunks to process in parallel (default = STOCKTAKE_REPORT_WORKERS setting)
     """
 
     parts = part.models.Part.objects.all()
@@ -297,43 +506,61 @@ def generate_stocktake_report(**kwargs):
         ]
     )
 
-    parts = parts.prefetch_related('category', 'stock_items')
+    part_ids = list(parts.prefetch_related(None).order_by('pk').values_list('pk', flat=True))
+
+    chunk_size = max(int(kwargs.get('chunk_size', 1000)), 1)
+    chunks = [part_ids[idx:idx + chunk_size] for idx in range(0, len(part_ids), chunk_size)]
+
+    workers = kwargs.get('workers', None) or common.models.AriusSetting.get_setting('STOCKTAKE_REPORT_WORKERS', 1, cache=False)
+    workers = min(max(int(workers), 1), len(chunks))
 
     # Simple profiling for this task
     t_start = time.time()
 
-    # Keep track of each individual "stocktake" we perform.
-    # They may be bulk-commited to the database afterwards
-    stocktake_instances = []
+    # Exchange rates are looked up once, and shared between all chunks
+    rates = get_stocktake_rates(base_currency)
 
-    total_parts = 0
+    def process_chunk(chunk):
+        """Calculate stocktake data for a single chunk of parts"""
+        try:
+            return calculate_stocktake_chunk(chunk, base_currency, rates, user=user)
+        finally:
+            if workers > 1:
+                # Each worker thread has its own database connection
+                connections.close_all()
 
-    # Iterate through each Part which matches the filters above
-    for p in parts:
+    if workers > 1:
+        logger.info(f"Processing {len(chunks)} chunks with {workers} workers")
 
-        # Create a new stocktake for this part (do not commit, this will take place later on)
-        stocktake = perform_stocktake(p, user, commit=False)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            chunk_results = list(executor.map(process_chunk, chunks))
+    else:
+        chunk_results = [process_chunk(chunk) for chunk in chunks]
 
-        if stocktake.quantity == 0:
-            # Skip rows with zero total quantity
-            continue
+    # Keep track of each individual "stocktake" we perform.
+    # They may be bulk-commited to the database afterwards
+    stocktake_instances = []
 
-        total_parts += 1
-
-        stocktake_instances.append(stocktake)
-
-        # Add a row to the dataset
-        dataset.append([
-            p.pk,
-            p.full_name,
-            p.description,
-            p.category.pk if p.category else '',
-            p.category.name if p.category else '',
-            stocktake.item_count,
-            stocktake.quantity,
-            arius.helpers.normalize(stocktake.cost_min.amount),
-            arius.helpers.normalize(stocktake.cost_max.amount),
-        ])
+    # Merge the results from each chunk (in part order)
+    for results in chunk_results:
+        for p, stocktake in results:
+
+            stocktake_instances.append(stocktake)
+
+            # Add a row to the dataset
+            dataset.append([
+                p.pk,
+                p.full_name,
+                p.description,
+                p.category.pk if p.category else '',
+                p.category.name if p.category else '',
+                stocktake.item_count,
+                stocktake.quantity,
+                arius.helpers.normalize(stocktake.cost_min.amount),
+                arius.helpers.normalize(stocktake.cost_max.amount),
+            ])
+
+    total_parts = len(stocktake_instances)
 
     # Save a new PartStocktakeReport instance
     buffer = io.StringIO()
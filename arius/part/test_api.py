@@ -1,5 +1,6 @@
 """Unit tests for the various part API endpoints"""
 
+import json
 from decimal import Decimal
 from enum import IntEnum
 from random import randint
@@ -14,6 +15,7 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 import build.models
+import common.settings
 import company.models
 import order.models
 from common.models import AriusSetting
@@ -1659,6 +1661,7 @@ class PartListTests(PartAPITestBase):
             {'limit': 10},
             {'limit': 50},
             {'category': 1},
+            {'can_build': True, 'limit': 50},
             {},
         ]
 
@@ -2552,6 +2555,25 @@ class BomItemTest(AriusAPITestCase):
         # 9,000 stock directly available
         self.assertEqual(data['available_stock'], 9000)
 
+    def test_bom_explode(self):
+        """Test the flattened multi-level BOM endpoint"""
+
+        url = reverse('api-part-bom-explode', kwargs={'pk': 100})
+
+        response = self.get(url, {'quantity': 3}, expected_code=200)
+        data = json.loads(b''.join(response.streaming_content))
+
+        n = BomItem.objects.filter(part=100).values('sub_part').distinct().count()
+        self.assertEqual(len(data), n)
+
+        for row in data:
+            item = BomItem.objects.get(part=100, sub_part=row['part'])
+            self.assertEqual(row['quantity'], item.get_required_quantity(3))
+
+        # Invalid parameters
+        self.get(url, {'quantity': 'abc'}, expected_code=400)
+        self.get(url, {'max_levels': 0}, expected_code=400)
+
     def test_bom_item_uses(self):
         """Tests for the 'uses' field."""
         url = reverse('api-bom-list')
@@ -2970,6 +2992,36 @@ class PartStocktakeTest(AriusAPITestCase):
         self.assertEqual(data['user'], None)
         self.assertTrue(data['report'].endswith('.csv'))
 
+    def test_report_chunks(self):
+        """Test that chunked stocktake calculation matches the per-part stocktake"""
+
+        from part.tasks import (calculate_stocktake_chunk,
+                                generate_stocktake_report,
+                                get_stocktake_rates, perform_stocktake)
+
+        part_ids = list(Part.objects.order_by('pk').values_list('pk', flat=True))
+
+        base_currency = common.settings.currency_code_default()
+        rates = get_stocktake_rates(base_currency)
+
+        with self.assertNumQueriesLessThan(10):
+            results = calculate_stocktake_chunk(part_ids, base_currency, rates)
+
+        self.assertEqual(len(results), 8)
+
+        for p, stocktake in results:
+            expected = perform_stocktake(p, None, commit=False)
+
+            self.assertEqual(stocktake.item_count, expected.item_count)
+            self.assertEqual(stocktake.quantity, expected.quantity)
+            self.assertEqual(stocktake.cost_min, expected.cost_min)
+            self.assertEqual(stocktake.cost_max, expected.cost_max)
+
+        # Generate a report using multiple small chunks
+        generate_stocktake_report(chunk_size=3, update_parts=True, generate_report=False)
+
+        self.assertEqual(PartStocktake.objects.count(), 8)
+
     def test_report_generate(self):
         """Test API functionality for generating a new stocktake report"""
 
@@ -9,6 +9,7 @@ from django.test import TestCase
 
 import stock.models
 
+from . import bom
 from .models import BomItem, BomItemSubstitute, Part
 
 
@@ -57,6 +58,89 @@ class BomItemTest(TestCase):
         self.assertEqual(self.bob.used_in_count, 1)
         self.assertEqual(self.orphan.used_in_count, 1)
 
+    def test_bom_graph(self):
+        """Test BOM traversal for multi-level and inherited BOMs"""
+
+        parts = [
+            Part.objects.create(name=f'Level {ii}', description='Multi-level BOM', assembly=True, component=True)
+            for ii in range(6)
+        ]
+
+        for ii in range(5):
+            BomItem.objects.create(part=parts[ii], sub_part=parts[ii + 1], quantity=1)
+
+        # Traversal requires one query per BOM level (and not one query per BOM item)
+        with self.assertNumQueries(7):
+            reachable = bom.BomGraph().get_reachable(parts[0].pk)
+
+        self.assertEqual(reachable, {p.pk for p in parts[1:]})
+        self.assertEqual(parts[0].getRequiredParts(recursive=True), set(parts[1:]))
+
+        self.assertTrue(parts[5].check_add_to_bom(parts[0]))
+        self.assertTrue(parts[0].check_add_to_bom(parts[3], recursive=False))
+
+        # Adding the top-level assembly anywhere in the BOM would create a loop
+        for p in parts[1:]:
+            self.assertFalse(parts[0].check_add_to_bom(p))
+
+        with self.assertRaises(django_exceptions.ValidationError):
+            parts[1].check_add_to_bom(parts[3], raise_error=True)
+
+        # Inherited BOM items are also used by variants of the template part
+        template = Part.objects.create(name='Template', description='A template assembly', assembly=True, is_template=True)
+        variant = Part.objects.create(name='Variant', description='A variant assembly', assembly=True, variant_of=template)
+
+        BomItem.objects.create(part=template, sub_part=parts[0], quantity=1, inherited=True)
+
+        self.assertEqual(set(parts[0].get_used_in()), {template, variant})
+        self.assertEqual(set(parts[0].get_used_in(include_inherited=False)), {template})
+
+        variant.refresh_from_db()
+        self.assertIn(parts[5], variant.getRequiredParts(recursive=True))
+        self.assertFalse(variant.check_add_to_bom(parts[5]))
+
+    def test_explode_bom(self):
+        """Test aggregated multi-level BOM explosion"""
+
+        template = Part.objects.create(name='T', description='Template assembly', assembly=True, is_template=True)
+        top = Part.objects.create(name='A', description='Top level assembly', assembly=True)
+        sub = Part.objects.create(name='B', description='Sub-assembly', assembly=True, component=True, variant_of=template)
+
+        c, d, e = [
+            Part.objects.create(name=name, description='Component', component=True) for name in ['C', 'D', 'E']
+        ]
+
+        BomItem.objects.create(part=top, sub_part=sub, quantity=2, overage='10%')
+        BomItem.objects.create(part=top, sub_part=c, quantity=3)
+        BomItem.objects.create(part=sub, sub_part=c, quantity=4)
+        BomItem.objects.create(part=sub, sub_part=d, quantity=1, consumable=True)
+        BomItem.objects.create(part=template, sub_part=e, quantity=2, inherited=True)
+
+        # One query for the top-level assembly, and one per BOM level
+        with self.assertNumQueries(3):
+            result = bom.explode_bom(top, quantity=5)
+
+        # 5 x A requires 11 x B (including overage)
+        self.assertEqual(result[(c.pk, False)]['quantity'], 15 + 44)
+        self.assertEqual(result[(d.pk, True)]['quantity'], 11)
+        self.assertEqual(result[(e.pk, False)]['quantity'], 22)
+        self.assertNotIn((sub.pk, False), result)
+
+        result = bom.explode_bom(top, quantity=5, include_consumable=False, include_assemblies=True)
+        self.assertNotIn((d.pk, True), result)
+        self.assertEqual(result[(sub.pk, False)]['quantity'], 11)
+        self.assertTrue(result[(sub.pk, False)]['assembly'])
+
+        # Limit to the top level only
+        result = bom.explode_bom(top, quantity=5, max_levels=1)
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[(c.pk, False)]['quantity'], 15)
+        self.assertFalse(result[(sub.pk, False)]['assembly'])
+
+        rows = list(bom.iterate_bom_requirements(result))
+        self.assertEqual(rows[0]['name'], 'B')
+        self.assertEqual(rows[1]['quantity'], 15)
+
     def test_self_reference(self):
         """Test that we get an appropriate error when we create a BomItem which points to itself."""
         with self.assertRaises(django_exceptions.ValidationError):
@@ -246,6 +330,58 @@ class BomItemTest(TestCase):
 
         self.assertEqual(assembly.can_build, 20)
 
+    def test_can_build_bulk(self):
+        """Test bulk calculation of 'can_build' quantities for multiple assemblies"""
+
+        import part.bom
+
+        template = Part.objects.create(name="Template assembly", description="An assembly template", assembly=True, is_template=True)
+        variant = Part.objects.create(name="Variant assembly", description="A variant assembly", assembly=True, variant_of=template)
+        other = Part.objects.create(name="Other assembly", description="Another assembly", assembly=True)
+
+        c1 = Part.objects.create(name="C1", description="Part C1 - this is just the part description", is_template=True)
+        c1_var = Part.objects.create(name="C1 variant", description="A variant of C1", variant_of=c1)
+        c2 = Part.objects.create(name="C2", description="Part C2 - this is just the part description")
+        c2_sub = Part.objects.create(name="C2 substitute", description="A substitute for C2")
+
+        stock.models.StockItem.objects.create(part=c1, quantity=100)
+        stock.models.StockItem.objects.create(part=c1_var, quantity=50)
+        stock.models.StockItem.objects.create(part=c2, quantity=30)
+        stock.models.StockItem.objects.create(part=c2_sub, quantity=20)
+
+        # Inherited BOM item, which allows variant stock
+        BomItem.objects.create(part=template, sub_part=c1, quantity=5, inherited=True, allow_variants=True)
+
+        # BOM item defined against the variant only
+        c2_item = BomItem.objects.create(part=variant, sub_part=c2, quantity=10)
+
+        # BOM item which does not allow variant stock
+        BomItem.objects.create(part=other, sub_part=c1, quantity=20)
+
+        # Reload from the database, to ensure that tree information is up to date
+        assemblies = [Part.objects.get(pk=p.pk) for p in [template, variant, other, c1]]
+
+        quantities = part.bom.get_can_build_quantities(assemblies)
+
+        self.assertEqual(quantities[template.pk], 30)
+        self.assertEqual(quantities[variant.pk], 3)
+        self.assertEqual(quantities[other.pk], 5)
+        self.assertEqual(quantities[c1.pk], 0)
+
+        # Substitute stock is available to the BOM item
+        BomItemSubstitute.objects.create(bom_item=c2_item, part=c2_sub)
+
+        quantities = part.bom.get_can_build_quantities(assemblies)
+        self.assertEqual(quantities[variant.pk], 5)
+
+        # Bulk calculation matches the single-part calculation
+        for assembly in assemblies:
+            self.assertEqual(assembly.can_build, quantities[assembly.pk])
+
+        # The number of queries does not depend on the number of assemblies
+        with self.assertNumQueries(7):
+            part.bom.get_can_build_quantities(Part.objects.filter(pk__in=[p.pk for p in assemblies]).prefetch_related(None))
+
     def test_metadata(self):
         """Unit tests for the metadata field."""
         for model in [BomItem]:
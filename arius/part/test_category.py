@@ -1,7 +1,9 @@
 """Unit tests for the PartCategory model"""
 
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from .models import Part, PartCategory, PartParameter, PartParameterTemplate
 
@@ -131,6 +133,62 @@ class CategoryTest(TestCase):
             cat.parent = child
             cat.save()
 
+    def test_path_string_subtree(self):
+        """Test that pathstring changes are applied to an entire subtree in bulk."""
+
+        top = PartCategory.objects.create(name='Top', description='Top level category')
+
+        parents = [top]
+
+        # Construct a tree with three levels below the top-level category
+        for level in range(3):
+            children = []
+
+            for parent in parents:
+                for idx in range(3):
+                    children.append(PartCategory.objects.create(
+                        name=f'Level {level} - {idx}',
+                        description='A subcategory',
+                        parent=parent,
+                    ))
+
+            parents = children
+
+        leaf = parents[-1]
+        self.assertEqual(leaf.pathstring, 'Top/Level 0 - 2/Level 1 - 2/Level 2 - 2')
+
+        # Renaming the top-level category does not require a query for each descendant
+        top.name = 'Renamed'
+
+        with CaptureQueriesContext(connection) as queries:
+            top.save()
+
+        self.assertLess(len(queries), 20)
+
+        leaf.refresh_from_db()
+        self.assertEqual(leaf.pathstring, 'Renamed/Level 0 - 2/Level 1 - 2/Level 2 - 2')
+
+        for category in top.get_descendants():
+            self.assertEqual(category.pathstring, '/'.join([item.name for item in category.path]))
+
+        # Move a subtree to a new parent
+        branch = PartCategory.objects.get(parent=top, name='Level 0 - 1')
+        branch.parent = self.electronics
+        branch.save()
+
+        self.assertEqual(
+            PartCategory.objects.get(parent__parent=branch, name='Level 2 - 0', parent__name='Level 1 - 0').pathstring,
+            'Electronics/Level 0 - 1/Level 1 - 0/Level 2 - 0'
+        )
+
+        # Pathstrings can also be rebuilt for all trees
+        PartCategory.objects.filter(pk=leaf.pk).update(pathstring='')
+        PartCategory.rebuild_pathstrings()
+
+        leaf.refresh_from_db()
+        self.assertEqual(leaf.pathstring, 'Renamed/Level 0 - 2/Level 1 - 2/Level 2 - 2')
+        self.assertEqual(PartCategory.rebuild_pathstrings(), 0)
+
     def test_url(self):
         """Test that the PartCategory URL works."""
         self.assertEqual(self.capacitors.get_absolute_url(), '/part/category/3/')
@@ -17,8 +17,8 @@ from arius import version
 from arius.unit_test import AriusTestCase
 
 from .models import (Part, PartCategory, PartCategoryStar, PartRelated,
-                     PartStar, PartStocktake, PartTestTemplate,
-                     rename_part_image)
+                     PartStar, PartStocktake, PartStockSummary,
+                     PartTestTemplate, rename_part_image)
 from .templatetags import arius_extras
 
 
@@ -352,6 +352,52 @@ class PartTest(TestCase):
         self.assertIsNotNone(p.last_stocktake)
         self.assertEqual(p.last_stocktake, ps.date)
 
+    def test_stock_summary(self):
+        """Test for the pre-calculated PartStockSummary table"""
+
+        from stock.models import StockItem
+
+        template = Part.objects.create(name='Template', description='A template part', is_template=True)
+        variant = Part.objects.create(name='Variant', description='A variant part', variant_of=template)
+
+        StockItem.objects.create(part=template, quantity=10)
+        StockItem.objects.create(part=variant, quantity=25)
+
+        # Updating the variant also updates the template part
+        self.assertEqual(PartStockSummary.update_parts([variant.pk]), 2)
+
+        template.refresh_from_db()
+        variant.refresh_from_db()
+
+        self.assertEqual(template.stock_summary.in_stock, 10)
+        self.assertEqual(template.stock_summary.variant_stock, 25)
+        self.assertEqual(variant.stock_summary.in_stock, 25)
+        self.assertEqual(variant.stock_summary.variant_stock, 0)
+
+        # Stock summary is read by the API serializer (when enabled)
+        AriusSetting.set_setting('PART_STOCK_SUMMARY', True, None)
+
+        from .serializers import PartSerializer
+
+        qs = PartSerializer.annotate_queryset(Part.objects.filter(pk=template.pk))
+        self.assertEqual(qs.first().total_in_stock, 35)
+
+        # Summary updates are deferred until the transaction is committed,
+        # so deleting a part (and the related stock) does not re-create a summary entry for that part
+        variant_id = variant.pk
+        variant.active = False
+        variant.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            variant.delete()
+
+        self.assertFalse(PartStockSummary.objects.filter(part_id=variant_id).exists())
+
+        # Rebuild the entire table
+        PartStockSummary.objects.all().delete()
+        self.assertEqual(PartStockSummary.rebuild(), Part.objects.count())
+        self.assertEqual(PartStockSummary.objects.count(), Part.objects.count())
+
 
 class TestTemplateTest(TestCase):
     """Unit test for the TestTemplate class"""
@@ -313,6 +313,97 @@ class PartPricingTests(AriusTestCase):
         self.assertEqual(pricing.overall_min, Money('366.666665', 'USD'))
         self.assertEqual(pricing.overall_max, Money('550', 'USD'))
 
+    def test_pricing_queue(self):
+        """Test that the pricing update queue updates dependent assemblies (in order)"""
+
+        common.models.AriusSetting.set_setting('PART_INTERNAL_PRICE', True, None)
+
+        currency = common.settings.currency_code_default()
+
+        leaf = part.models.Part.objects.create(name='Leaf', description='A component', component=True)
+        sub_assembly = part.models.Part.objects.create(name='Sub', description='A sub-assembly', assembly=True, component=True)
+
+        part.models.PartInternalPriceBreak.objects.create(
+            part=leaf,
+            quantity=1,
+            price=10,
+            price_currency=currency,
+        )
+
+        part.models.BomItem.objects.create(part=sub_assembly, sub_part=leaf, quantity=2)
+        part.models.BomItem.objects.create(part=self.part, sub_part=sub_assembly, quantity=3)
+
+        # Mark only the leaf part for update
+        leaf.pricing.save()
+        part.models.PartPricing.objects.filter(part=leaf).update(scheduled_for_update=True)
+
+        self.assertEqual(part.models.PartPricing.process_update_queue(), 3)
+
+        self.assertFalse(part.models.PartPricing.objects.filter(scheduled_for_update=True).exists())
+
+        self.assertEqual(sub_assembly.pricing.overall_min, Money(20, currency))
+        self.assertEqual(self.part.pricing.bom_cost_min, Money(60, currency))
+
+        # Nothing left to process
+        self.assertEqual(part.models.PartPricing.process_update_queue(), 0)
+
+    def test_bom_pricing_rollup(self):
+        """Test that the bulk BOM pricing rollup matches the per-part calculation"""
+
+        import part.bom
+
+        common.models.AriusSetting.set_setting('PART_INTERNAL_PRICE', True, None)
+
+        currency = common.settings.currency_code_default()
+
+        sub_assembly = part.models.Part.objects.create(name='Sub', description='A sub-assembly', assembly=True, component=True)
+
+        for ii in range(3):
+            component = part.models.Part.objects.create(name=f'C{ii}', description='A component', component=True)
+
+            part.models.PartInternalPriceBreak.objects.create(
+                part=component,
+                quantity=1,
+                price=ii + 1,
+                price_currency=currency,
+            )
+
+            component.pricing.update_pricing(cascade=False)
+
+            if ii < 2:
+                part.models.BomItem.objects.create(part=sub_assembly, sub_part=component, quantity=ii + 1)
+            else:
+                # Add the last component as a substitute for the first line
+                part.models.BomItemSubstitute.objects.create(
+                    bom_item=part.models.BomItem.objects.get(part=sub_assembly, sub_part__name='C0'),
+                    part=component,
+                )
+
+        part.models.BomItem.objects.create(part=self.part, sub_part=sub_assembly, quantity=10)
+
+        sub_assembly.pricing.save()
+        self.part.pricing.save()
+
+        self.assertEqual(part.bom.rollup_bom_pricing(), 2)
+
+        # Sub-assembly: line 1 = 1 x [1, 3], line 2 = 2 x [2, 2]
+        sub_pricing = sub_assembly.pricing
+        self.assertEqual(sub_pricing.bom_cost_min, Money(5, currency))
+        self.assertEqual(sub_pricing.bom_cost_max, Money(7, currency))
+        self.assertEqual(sub_pricing.overall_min, Money(5, currency))
+
+        pricing = self.part.pricing
+        self.assertEqual(pricing.bom_cost_min, Money(50, currency))
+        self.assertEqual(pricing.bom_cost_max, Money(70, currency))
+
+        # Results are the same as the per-part calculation
+        pricing.update_bom_cost()
+        self.assertEqual(pricing.bom_cost_min, Money(50, currency))
+        self.assertEqual(pricing.bom_cost_max, Money(70, currency))
+
+        # Running again does not change anything
+        self.assertEqual(part.bom.rollup_bom_pricing(), 0)
+
     def test_purchase_pricing(self):
         """Unit tests for historical purchase pricing"""
 
@@ -85,6 +85,84 @@ class BarcodeScan(APIView):
             return Response(response)
 
 
+class BarcodeScanBatch(APIView):
+    """Endpoint for scanning multiple barcodes in a single request.
+
+    This allows a client (e.g. a mobile scanner) to submit a large number of barcodes at once,
+    rather than making a separate request for each scanned barcode.
+
+    The following parameters must be provided:
+
+    - barcodes: A list of raw barcode data
+
+    Each barcode plugin is asked to resolve (in a single batch) any barcodes which have not yet been matched.
+    The response contains a result for each provided barcode, in the same order as the provided list.
+    """
+
+    permission_classes = [
+        permissions.IsAuthenticated,
+    ]
+
+    # Maximum number of barcodes which can be scanned in a single request
+    MAX_BARCODES = 1000
+
+    def post(self, request, *args, **kwargs):
+        """Respond to a batch barcode POST request."""
+
+        barcodes = request.data.get('barcodes', None)
+
+        if not barcodes or type(barcodes) is not list:
+            raise ValidationError({'barcodes': _('Missing barcode data')})
+
+        if len(barcodes) > self.MAX_BARCODES:
+            raise ValidationError({'barcodes': _('Too many barcodes provided') + f' (max {self.MAX_BARCODES})'})
+
+        results = [None] * len(barcodes)
+        matched_plugins = [None] * len(barcodes)
+
+        # Indices of the barcodes which have not (yet) been matched
+        pending = [idx for idx, barcode_data in enumerate(barcodes) if barcode_data]
+
+        # Note: the default barcode handlers are loaded (and thus run) first
+        for plugin in registry.with_mixin('barcode'):
+
+            if len(pending) == 0:
+                break
+
+            scanned = plugin.scan_batch([barcodes[idx] for idx in pending])
+
+            unmatched = []
+
+            for idx, result in zip(pending, scanned):
+                if result is None:
+                    unmatched.append(idx)
+                else:
+                    results[idx] = result
+                    matched_plugins[idx] = plugin.name
+
+            pending = unmatched
+
+        response = []
+
+        for idx, barcode_data in enumerate(barcodes):
+            data = results[idx] or {}
+
+            data['plugin'] = matched_plugins[idx]
+            data['barcode_data'] = barcode_data
+            data['barcode_hash'] = hash_barcode(barcode_data) if barcode_data else None
+
+            if results[idx] is not None:
+                data['success'] = _('Match found for barcode data')
+            elif barcode_data:
+                data['error'] = _('No match found for barcode data')
+            else:
+                data['error'] = _('Missing barcode data')
+
+            response.append(data)
+
+        return Response(response)
+
+
 class BarcodeAssign(APIView):
     """Endpoint for assigning a barcode to a stock item.
 
@@ -245,6 +323,9 @@ barcode_api_urls = [
     # Link a third-party barcode to an item (e.g. Part / StockItem / etc)
     path('link/', BarcodeAssign.as_view(), name='api-barcode-link'),
 
+    # Scan multiple barcodes in a single request
+    path('batch/', BarcodeScanBatch.as_view(), name='api-barcode-scan-batch'),
+
     # Unlink a third-pary barcode from an item
     path('unlink/', BarcodeUnassign.as_view(), name='api-barcode-unlink'),
 
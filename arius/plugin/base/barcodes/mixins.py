@@ -37,3 +37,21 @@ class BarcodeMixin:
         """
 
         return None
+
+    def scan_batch(self, barcodes: list) -> list:
+        """Scan multiple barcodes against this plugin.
+
+        This method is explicitly called from the /scan/batch/ API endpoint.
+
+        The default implementation calls scan() for each barcode in turn.
+        Plugins which can resolve many barcodes at once (e.g. using grouped database queries)
+        should override this method.
+
+        Arguments:
+            barcodes: List of raw barcode data
+
+        Returns:
+            list: A result for each provided barcode (in the same order), or None if the barcode does not match
+        """
+
+        return [self.scan(barcode_data) for barcode_data in barcodes]
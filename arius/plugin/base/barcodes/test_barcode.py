@@ -231,3 +231,45 @@ class BarcodeAPITest(AriusAPITestCase):
 
         self.assertIn('error', data)
         self.assertNotIn('success', data)
+
+    def test_batch_scan(self):
+        """Test that multiple barcodes can be scanned in a single request."""
+
+        url = reverse('api-barcode-scan-batch')
+
+        # Missing data
+        response = self.post(url, {}, expected_code=400)
+        self.assertIn('Missing barcode data', str(response.data['barcodes']))
+
+        # Too many barcodes
+        response = self.post(url, {'barcodes': ['x'] * 1001}, expected_code=400)
+
+        item = StockItem.objects.get(pk=522)
+        item.assign_barcode(barcode_data='BATCH-BARCODE')
+
+        items = StockItem.objects.all()[:50]
+
+        barcodes = [si.format_barcode() for si in items]
+        barcodes += ['BATCH-BARCODE', '{"stocklocation": 1}', '{"stockitem": 99999}', 'not-a-barcode', '']
+
+        with self.assertNumQueriesLessThan(20):
+            response = self.post(url, {'barcodes': barcodes}, expected_code=200)
+
+        results = response.data
+
+        # Results are returned in the same order as the provided barcodes
+        self.assertEqual(len(results), len(barcodes))
+
+        for si, result in zip(items, results):
+            self.assertIn('success', result)
+            self.assertEqual(result['stockitem']['pk'], si.pk)
+
+        self.assertEqual(results[-5]['stockitem']['pk'], item.pk)
+        self.assertEqual(results[-5]['plugin'], 'AriusBarcode')
+        self.assertEqual(results[-4]['stocklocation']['pk'], 1)
+
+        for result in results[-3:]:
+            self.assertIn('error', result)
+            self.assertIsNone(result['plugin'])
+
+        self.assertEqual(results[-1]['error'], 'Missing barcode data')
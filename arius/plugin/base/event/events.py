@@ -1,6 +1,10 @@
 """Functions for triggering and responding to server side events."""
 
 import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
 
 from django.conf import settings
 from django.db import transaction
@@ -13,12 +17,127 @@ from plugin.registry import registry
 
 logger = logging.getLogger('arius')
 
+# Events collected within a bulk_events() block (for the current thread)
+_bulk_events = threading.local()
+
+
+def event_matches(event: str, patterns) -> bool:
+    """Determine if an event name matches any of the provided subscription patterns.
+
+    Args:
+        event: The name of the event e.g. 'stock_stockitem.saved'
+        patterns: List of shell-style patterns e.g. ['stock_*.saved', 'build.completed'], or None to match all events
+    """
+    if patterns is None:
+        return True
+
+    return any(fnmatchcase(event, pattern) for pattern in patterns)
+
+
+def get_event_subscribers(event: str) -> list:
+    """Return the slugs of all active plugins which are subscribed to the provided event.
+
+    The subscriptions for each plugin are collected when the plugin registry is loaded,
+    and the result for each event name is cached in the registry routing table.
+    """
+    slugs = registry.event_routes.get(event, None)
+
+    if slugs is None:
+        slugs = [slug for slug, patterns in registry.event_subscriptions.items() if event_matches(event, patterns)]
+        registry.event_routes[event] = slugs
+
+    return slugs
+
+
+def events_enabled() -> bool:
+    """Return True if plugins are allowed to respond to events."""
+    from common.models import AriusSetting
+
+    return settings.PLUGIN_TESTING or AriusSetting.get_setting('ENABLE_PLUGINS_EVENTS')
+
+
+@contextmanager
+def bulk_events():
+    """Context manager which aggregates the events triggered within the block.
+
+    Per-instance events are not offloaded individually. Instead, when the block exits:
+
+    - Events with the same name (and the same arguments, other than 'id') are combined
+      into a single event, with an 'ids' argument listing all of the affected primary keys
+    - All of the combined events are offloaded in a single task (see trigger_events)
+    - If the block is inside a database transaction, the events are only triggered once the transaction is committed
+    - If the block raises an exception, the collected events are discarded
+
+    Blocks may be nested - events are only triggered when the outermost block exits.
+
+    Example:
+        with bulk_events(), transaction.atomic():
+            for item in items:
+                item.save()
+    """
+    if getattr(_bulk_events, 'buffer', None) is not None:
+        # Already collecting events in an outer block
+        yield
+        return
+
+    _bulk_events.buffer = {}
+
+    try:
+        yield
+        buffer = _bulk_events.buffer
+    finally:
+        _bulk_events.buffer = None
+
+    events = []
+
+    for (event, _key), (kwargs, ids) in buffer.items():
+        kwargs = dict(kwargs)
+
+        if ids:
+            kwargs['ids'] = list(ids)
+
+        events.append((event, kwargs))
+
+    if events:
+        transaction.on_commit(lambda: trigger_events(events))
+
+
+def collect_event(event, *args, **kwargs) -> bool:
+    """Add an event to the current bulk_events() block.
+
+    Returns:
+        bool: True if the event was collected, False if no bulk_events() block is active (or the event cannot be combined)
+    """
+    buffer = getattr(_bulk_events, 'buffer', None)
+
+    if buffer is None or args:
+        return False
+
+    common = {key: value for key, value in kwargs.items() if key != 'id'}
+
+    try:
+        key = (event, tuple(sorted(common.items())))
+        hash(key)
+    except TypeError:
+        # Arguments cannot be compared, so this event cannot be combined with any other
+        key = (event, len(buffer))
+
+    _common, ids = buffer.setdefault(key, (common, {}))
+
+    if kwargs.get('id', None) is not None:
+        ids[kwargs['id']] = True
+
+    return True
+
 
 def trigger_event(event, *args, **kwargs):
     """Trigger an event with optional arguments.
 
     This event will be stored in the database,
     and the worker will respond to it later on.
+
+    If no active plugins are subscribed to the event, it is discarded immediately.
+    If called within a bulk_events() block, the event is combined with other events in that block.
     """
     if not settings.PLUGINS_ENABLED:
         # Do nothing if plugins are not enabled
@@ -29,6 +148,14 @@ def trigger_event(event, *args, **kwargs):
         logger.debug(f"Ignoring triggered event '{event}' - database not ready")
         return
 
+    if not get_event_subscribers(event):
+        logger.debug(f"Ignoring triggered event '{event}' - no subscribed plugins")
+        return
+
+    if collect_event(event, *args, **kwargs):
+        # Event will be triggered when the bulk_events() block exits
+        return
+
     logger.debug(f"Event triggered: '{event}'")
 
     offload_task(
@@ -39,38 +166,89 @@ def trigger_event(event, *args, **kwargs):
     )
 
 
+def trigger_events(events):
+    """Trigger multiple events with a single background task.
+
+    Events are delivered to each subscribed plugin in a single batch (see EventMixin.process_events).
+
+    Args:
+        events: List of (event, kwargs) tuples
+    """
+    if not settings.PLUGINS_ENABLED:
+        # Do nothing if plugins are not enabled
+        return  # pragma: no cover
+
+    # Make sure the database can be accessed and is not being tested rn
+    if not canAppAccessDatabase() and not settings.PLUGIN_TESTING_EVENTS:
+        logger.debug("Ignoring triggered events - database not ready")
+        return
+
+    events = [(event, kwargs) for event, kwargs in events if get_event_subscribers(event)]
+
+    if not events:
+        return
+
+    logger.debug(f"Triggered {len(events)} events")
+
+    offload_task(
+        register_events,
+        events
+    )
+
+
 def register_event(event, *args, **kwargs):
     """Register the event with any interested plugins.
 
     Note: This function is processed by the background worker,
     as it performs multiple database access operations.
     """
-    from common.models import AriusSetting
-
     logger.debug(f"Registering triggered event: '{event}'")
 
     # Determine if there are any plugins which are interested in responding
-    if settings.PLUGIN_TESTING or AriusSetting.get_setting('ENABLE_PLUGINS_EVENTS'):
+    if events_enabled():
 
-        with transaction.atomic():
+        for slug in get_event_subscribers(event):
 
-            for slug, plugin in registry.plugins.items():
+            logger.debug(f"Registering callback for plugin '{slug}'")
 
-                if plugin.mixin_enabled('events'):
+            # Offload a separate task for each subscribed plugin
+            offload_task(
+                process_event,
+                slug,
+                event,
+                *args,
+                **kwargs
+            )
 
-                    if plugin.is_active():
-                        # Only allow event registering for 'active' plugins
 
-                        logger.debug(f"Registering callback for plugin '{slug}'")
+def register_events(events):
+    """Register multiple events with any interested plugins.
 
-                        # Offload a separate task for each plugin
-                        offload_task(
-                            process_event,
-                            slug,
-                            event,
-                            *args,
-                            **kwargs
-                        )
+    A single task is offloaded for each subscribed plugin, containing all of the events for that plugin.
+
+    Args:
+        events: List of (event, kwargs) tuples
+    """
+    logger.debug(f"Registering {len(events)} triggered events")
+
+    if not events_enabled():
+        return
+
+    batches = defaultdict(list)
+
+    for event, kwargs in events:
+        for slug in get_event_subscribers(event):
+            batches[slug].append((event, kwargs))
+
+    for slug, batch in batches.items():
+
+        logger.debug(f"Registering {len(batch)} callbacks for plugin '{slug}'")
+
+        offload_task(
+            process_events,
+            slug,
+            batch
+        )
 
 
 def process_event(plugin_slug, event, *args, **kwargs):
@@ -86,10 +264,36 @@ def process_event(plugin_slug, event, *args, **kwargs):
         logger.error(f"Could not find matching plugin for '{plugin_slug}'")
         return
 
+    if not plugin.is_active():
+        # Plugin may have been deactivated since the routing table was built
+        logger.debug(f"Plugin '{plugin_slug}' is not active - ignoring event '{event}'")
+        return
+
     plugin.process_event(event, *args, **kwargs)
     logger.debug(f"Plugin '{plugin_slug}' is processing triggered event '{event}'")
 
 
+def process_events(plugin_slug, events):
+    """Respond to a batch of triggered events.
+
+    This function is run by the background worker process.
+    """
+
+    plugin = registry.plugins.get(plugin_slug, None)
+
+    if plugin is None:  # pragma: no cover
+        logger.error(f"Could not find matching plugin for '{plugin_slug}'")
+        return
+
+    if not plugin.is_active():
+        # Plugin may have been deactivated since the routing table was built
+        logger.debug(f"Plugin '{plugin_slug}' is not active - ignoring {len(events)} events")
+        return
+
+    plugin.process_events(events)
+    logger.debug(f"Plugin '{plugin_slug}' is processing {len(events)} triggered events")
+
+
 def allow_table_event(table_name):
     """Determine if an automatic event should be fired for a given table.
 
@@ -124,6 +328,8 @@ def allow_table_event(table_name):
         return False
 
     ignore_tables = [
+        'common_barcodeindex',
+        'common_notificationdigestentry',
         'common_notificationentry',
         'common_notificationmessage',
         'common_webhookendpoint',
@@ -131,6 +337,7 @@ def allow_table_event(table_name):
         'part_partpricing',
         'part_partstocktake',
         'part_partstocktakereport',
+        'stock_serialnumberreservation',
     ]
 
     if table_name in ignore_tables:
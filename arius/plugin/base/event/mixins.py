@@ -1,14 +1,36 @@
 """Plugin mixin class for events."""
 
+import logging
+
 from plugin.helpers import MixinNotImplementedError
 
+logger = logging.getLogger('arius')
+
 
 class EventMixin:
     """Mixin that provides support for responding to triggered events.
 
     Implementing classes must provide a "process_event" function:
+
+    Implementing classes may also provide a list of SUBSCRIBED_EVENTS,
+    which restricts the events which are delivered to the plugin.
+    Each entry is a shell-style pattern which is matched against the event name, e.g.
+
+    SUBSCRIBED_EVENTS = [
+        'build.completed',
+        'stock_stockitem.*',
+        '*.deleted',
+    ]
+
+    If SUBSCRIBED_EVENTS is None (the default), all events are delivered to the plugin.
+
+    Events which are triggered during bulk operations (see bulk_events) are combined,
+    and delivered with an 'ids' argument (a list of primary keys) instead of a single 'id' argument.
     """
 
+    # Override this in subclass model
+    SUBSCRIBED_EVENTS = None
+
     def process_event(self, event, *args, **kwargs):
         """Function to handle events.
 
@@ -17,6 +39,30 @@ class EventMixin:
         # Default implementation does not do anything
         raise MixinNotImplementedError
 
+    def process_events(self, events):
+        """Function to handle multiple events, delivered in a single batch.
+
+        The default implementation calls process_event for each event in turn.
+        Plugins may override this function to process the events more efficiently.
+
+        Args:
+            events: List of (event, kwargs) tuples
+        """
+        for event, kwargs in events:
+            self.process_event(event, **kwargs)
+
+    def get_event_subscriptions(self):
+        """Return the list of event patterns which this plugin is subscribed to (or None for all events)."""
+        subscriptions = self.SUBSCRIBED_EVENTS
+
+        if subscriptions is None:
+            return None
+
+        if isinstance(subscriptions, str):
+            subscriptions = [subscriptions]
+
+        return [str(pattern).strip() for pattern in subscriptions]
+
     class MixinMeta:
         """Meta options for this mixin."""
 
@@ -26,3 +72,21 @@ class EventMixin:
         """Register the mixin."""
         super().__init__()
         self.add_mixin('events', True, __class__)
+
+    @classmethod
+    def _activate_mixin(cls, registry, plugins, *args, **kwargs):
+        """Build the event routing table from active plugins with the EventMixin."""
+        subscriptions = {}
+
+        for slug, plugin in plugins:
+
+            if plugin.mixin_enabled('events'):
+
+                if plugin.is_active():
+                    # Only route events to 'active' plugins
+                    subscriptions[slug] = plugin.get_event_subscriptions()
+
+        registry.event_subscriptions = subscriptions
+        registry.event_routes = {}
+
+        logger.info(f"Registered event subscriptions for {len(subscriptions)} plugins")
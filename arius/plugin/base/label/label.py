@@ -28,7 +28,29 @@ def print_label(plugin_slug: str, pdf_data, filename=None, label_instance=None,
         label_instance (Union[LabelTemplate, None], optional): The template instance that should be printed. Defaults to None.
         user (Union[User, None], optional): User that should be informed of errors. Defaults to None.
     """
-    logger.info(f"Plugin '{plugin_slug}' is printing a label '{filename}'")
+
+    labels = [{
+        'pdf_data': pdf_data,
+        'filename': filename,
+        'object_to_print': getattr(label_instance, 'object_to_print', None),
+    }]
+
+    print_labels(plugin_slug, labels, label_instance=label_instance, user=user)
+
+
+def print_labels(plugin_slug: str, labels: list, label_instance=None, user=None):
+    """Print multiple labels with the provided plugin, as a single background task.
+
+    This task is nominally handled by the background worker.
+    If the printing fails (throws an exception) then the user is notified.
+
+    Args:
+        plugin_slug (str): The unique slug (key) of the plugin.
+        labels (list): List of dicts, each containing 'pdf_data', 'filename' and 'object_to_print' for a single label.
+        label_instance (Union[LabelTemplate, None], optional): The template instance that should be printed. Defaults to None.
+        user (Union[User, None], optional): User that should be informed of errors. Defaults to None.
+    """
+    logger.info(f"Plugin '{plugin_slug}' is printing {len(labels)} labels")
 
     plugin = registry.get_plugin(plugin_slug)
 
@@ -38,16 +60,16 @@ def print_label(plugin_slug: str, pdf_data, filename=None, label_instance=None,
 
     # In addition to providing a .pdf image, we'll also provide a .png file
     dpi = AriusSetting.get_setting('LABEL_DPI', 300)
-    png_file = pdf2image.convert_from_bytes(
-        pdf_data,
-        dpi=dpi,
-    )[0]
+
+    for label in labels:
+        label['png_file'] = pdf2image.convert_from_bytes(
+            label['pdf_data'],
+            dpi=dpi,
+        )[0]
 
     try:
-        plugin.print_label(
-            pdf_data=pdf_data,
-            png_file=png_file,
-            filename=filename,
+        plugin.print_labels(
+            labels,
             label_instance=label_instance,
             width=label_instance.width,
             height=label_instance.height,
@@ -1,5 +1,7 @@
 """Plugin mixin classes for label plugins."""
 
+import copy
+
 from plugin.helpers import MixinNotImplementedError
 
 
@@ -34,3 +36,40 @@ class LabelPrintingMixin:
         """
         # Unimplemented (to be implemented by the particular plugin class)
         raise MixinNotImplementedError('This Plugin must implement a `print_label` method')
+
+    def print_labels(self, labels, **kwargs):
+        """Callback to print multiple labels in a single job.
+
+        The default implementation calls print_label() for each label in turn.
+        Plugins which can send multiple labels to a printer at once should override this method.
+
+        Arguments:
+            labels: List of dicts, each containing the following keys:
+                - pdf_data: Raw PDF data of the rendered label
+                - png_file: An in-memory PIL image file
+                - filename: The filename of this PDF label
+                - object_to_print: The object which this label was rendered against
+
+        kwargs:
+            label_instance: The instance of the label model which triggered the print_labels() method
+            width: The expected width of the label (in mm)
+            height: The expected height of the label (in mm)
+            user: The user who printed these labels
+        """
+
+        label_instance = kwargs.pop('label_instance', None)
+
+        for label in labels:
+
+            if label_instance is not None:
+                # Provide a separate label instance for each printed object
+                label_instance = copy.copy(label_instance)
+                label_instance.object_to_print = label.get('object_to_print', None)
+
+            self.print_label(
+                pdf_data=label['pdf_data'],
+                png_file=label['png_file'],
+                filename=label['filename'],
+                label_instance=label_instance,
+                **kwargs
+            )
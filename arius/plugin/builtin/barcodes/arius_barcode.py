@@ -14,6 +14,7 @@ from django.utils.translation import gettext_lazy as _
 from arius.helpers import hash_barcode
 from arius.helpers_model import getModelsWithMixin
 from arius.models import AriusBarcodeMixin
+from common.models import BarcodeIndex
 from plugin import AriusPlugin
 from plugin.mixins import BarcodeMixin
 
@@ -60,17 +61,16 @@ class AriusInternalBarcodePlugin(BarcodeMixin, AriusPlugin):
 
         return response
 
-    def scan(self, barcode_data):
-        """Scan a barcode against this plugin.
+    @staticmethod
+    def parse_barcode(barcode_data):
+        """Attempt to coerce the barcode data into a dict object.
 
-        Here we are looking for a dict object which contains a reference to a particular arius database object
-        """
+        This is the internal barcode representation that arius uses
 
-        # Create hash from raw barcode data
-        barcode_hash = hash_barcode(barcode_data)
+        Returns:
+            dict: The decoded barcode data, or None if the barcode is not in the internal format
+        """
 
-        # Attempt to coerce the barcode data into a dict object
-        # This is the internal barcode representation that arius uses
         barcode_dict = None
 
         if type(barcode_data) is dict:
@@ -81,7 +81,23 @@ class AriusInternalBarcodePlugin(BarcodeMixin, AriusPlugin):
             except json.JSONDecodeError:
                 pass
 
-        if barcode_dict is not None and type(barcode_dict) is dict:
+        if type(barcode_dict) is dict:
+            return barcode_dict
+
+        return None
+
+    def scan(self, barcode_data):
+        """Scan a barcode against this plugin.
+
+        Here we are looking for a dict object which contains a reference to a particular arius database object
+        """
+
+        # Create hash from raw barcode data
+        barcode_hash = hash_barcode(barcode_data)
+
+        barcode_dict = self.parse_barcode(barcode_data)
+
+        if barcode_dict is not None:
             # Look for various matches. First good match will be returned
             for model in self.get_supported_barcode_models():
                 label = model.barcode_model_type()
@@ -95,10 +111,70 @@ class AriusInternalBarcodePlugin(BarcodeMixin, AriusPlugin):
                         pass
 
         # If no "direct" hits are found, look for assigned third-party barcodes
-        for model in self.get_supported_barcode_models():
-            label = model.barcode_model_type()
+        instance = BarcodeIndex.lookup(barcode_hash, model_classes=self.get_supported_barcode_models())
+
+        if instance is not None:
+            model = instance.__class__
+            return self.format_matched_response(model.barcode_model_type(), model, instance)
+
+    def scan_batch(self, barcodes: list) -> list:
+        """Scan multiple barcodes against this plugin.
+
+        Barcodes are resolved using a single query per model type (rather than per barcode):
+
+        - Internal barcodes are grouped by model type, and each model is queried once
+        - Any remaining barcodes are resolved against the barcode index
+        """
+
+        models = self.get_supported_barcode_models()
+
+        results = [None] * len(barcodes)
+
+        # For each barcode, the (model, pk) candidates for a "direct" match, in order of preference
+        candidates = {}
+        pks = {model: set() for model in models}
+
+        for idx, barcode_data in enumerate(barcodes):
+            barcode_dict = self.parse_barcode(barcode_data)
+
+            if barcode_dict is None:
+                continue
+
+            for model in models:
+                label = model.barcode_model_type()
+
+                if label not in barcode_dict:
+                    continue
+
+                try:
+                    pk = int(barcode_dict[label])
+                except (TypeError, ValueError):
+                    continue
+
+                candidates.setdefault(idx, []).append((model, pk))
+                pks[model].add(pk)
+
+        instances = {}
+
+        for model, model_pks in pks.items():
+            if model_pks:
+                for instance in model.objects.filter(pk__in=model_pks):
+                    instances[(model, instance.pk)] = instance
+
+        for idx, options in candidates.items():
+            for model, pk in options:
+                if (instance := instances.get((model, pk), None)) is not None:
+                    results[idx] = self.format_matched_response(model.barcode_model_type(), model, instance)
+                    break
+
+        # If no "direct" hits are found, look for assigned third-party barcodes
+        hashes = {idx: hash_barcode(barcode_data) for idx, barcode_data in enumerate(barcodes) if results[idx] is None}
+
+        matches = BarcodeIndex.lookup_batch(hashes.values(), model_classes=models)
 
-            instance = model.lookup_barcode(barcode_hash)
+        for idx, barcode_hash in hashes.items():
+            if (instance := matches.get(barcode_hash, None)) is not None:
+                model = instance.__class__
+                results[idx] = self.format_matched_response(model.barcode_model_type(), model, instance)
 
-            if instance is not None:
-                return self.format_matched_response(label, model, instance)
+        return results
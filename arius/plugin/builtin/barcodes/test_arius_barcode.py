@@ -4,7 +4,10 @@ from django.urls import reverse
 
 import part.models
 import stock.models
+from arius.helpers import hash_barcode
 from arius.unit_test import AriusAPITestCase
+from common.models import BarcodeIndex
+from plugin.builtin.barcodes.arius_barcode import AriusInternalBarcodePlugin
 
 
 class TestAriusBarcode(AriusAPITestCase):
@@ -365,6 +368,84 @@ class TestAriusBarcode(AriusAPITestCase):
             self.assertIn('success', response.data)
             self.assertEqual(response.data['stockitem']['pk'], 1)
 
+    def test_barcode_index(self):
+        """Test that assigned barcodes are resolved via the barcode index"""
+
+        si = stock.models.StockItem.objects.get(pk=1)
+        loc = stock.models.StockLocation.objects.get(pk=1)
+
+        si.assign_barcode(barcode_data='index-test')
+
+        entry = BarcodeIndex.objects.get(barcode_hash=si.barcode_hash)
+        self.assertEqual(entry.object_id, si.pk)
+        self.assertEqual(entry.content_type.model_class(), stock.models.StockItem)
+
+        BarcodeIndex.clear_cache()
+
+        plugin = AriusInternalBarcodePlugin()
+
+        # First lookup requires the index query (and the object query)
+        with self.assertNumQueriesLessThan(4):
+            response = plugin.scan('index-test')
+
+        self.assertEqual(response['stockitem']['pk'], si.pk)
+
+        # Subsequent lookups are served from the cache
+        with self.assertNumQueriesLessThan(2):
+            response = plugin.scan('index-test')
+
+        self.assertEqual(response['stockitem']['pk'], si.pk)
+
+        # Move the barcode to a different object
+        si.unassign_barcode()
+        self.assertFalse(BarcodeIndex.objects.filter(object_id=si.pk, barcode_hash=entry.barcode_hash).exists())
+
+        loc.assign_barcode(barcode_data='index-test')
+
+        response = plugin.scan('index-test')
+        self.assertNotIn('stockitem', response)
+        self.assertEqual(response['stocklocation']['pk'], loc.pk)
+
+        # Deleting the object removes the index entry
+        item = stock.models.StockItem.objects.create(part=si.part, quantity=1)
+        item.assign_barcode(barcode_data='index-delete')
+
+        self.assertTrue(BarcodeIndex.objects.filter(barcode_hash=item.barcode_hash).exists())
+
+        item.delete()
+
+        self.assertFalse(BarcodeIndex.objects.filter(barcode_hash=item.barcode_hash).exists())
+        self.assertIsNone(plugin.scan('index-delete'))
+
+        # Barcodes which are missing from the index are resolved against the models directly
+        BarcodeIndex.objects.all().delete()
+        BarcodeIndex.clear_cache()
+
+        response = plugin.scan('blbla=10004')
+        pk = response['stockitem']['pk']
+
+        # ... and the index is updated with the match
+        self.assertTrue(BarcodeIndex.objects.filter(object_id=pk, barcode_hash=hash_barcode('blbla=10004')).exists())
+
+        # Barcodes assigned via a bulk update are also resolved (for both single and batch scans)
+        stock.models.StockItem.objects.filter(pk=si.pk).update(barcode_hash=hash_barcode('index-bulk'))
+        self.assertFalse(BarcodeIndex.objects.filter(barcode_hash=hash_barcode('index-bulk')).exists())
+
+        self.assertEqual(plugin.scan('index-bulk')['stockitem']['pk'], si.pk)
+        self.assertTrue(BarcodeIndex.objects.filter(object_id=si.pk, barcode_hash=hash_barcode('index-bulk')).exists())
+
+        stock.models.StockItem.objects.filter(pk=2).update(barcode_hash=hash_barcode('index-bulk-2'))
+
+        results = plugin.scan_batch(['index-bulk', 'index-bulk-2', 'index-missing'])
+        self.assertEqual(results[0]['stockitem']['pk'], si.pk)
+        self.assertEqual(results[1]['stockitem']['pk'], 2)
+        self.assertIsNone(results[2])
+
+        # Rebuild the index
+        BarcodeIndex.objects.all().delete()
+        self.assertGreater(BarcodeIndex.rebuild(), 0)
+        self.assertIsNotNone(plugin.scan('blbla=10004'))
+
     def test_scan_arius(self):
         """Test scanning of first-party barcodes"""
 
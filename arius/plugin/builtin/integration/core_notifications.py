@@ -7,6 +7,7 @@ import requests
 from allauth.account.models import EmailAddress
 
 import common.models
+import common.notifications
 import arius.email
 import arius.helpers
 import arius.tasks
@@ -104,17 +105,24 @@ class AriusCoreNotificationsPlugin(SettingsContentMixin, SettingsMixin, AriusPlu
             )
 
         def send_bulk(self):
-            """Send the notifications out via email."""
+            """Send the notifications out via email.
+
+            The email is rendered once, and sent to all targets together.
+            If email digests are enabled, the email is instead queued for each user (see send_email_digests).
+            """
             html_message = render_to_string(self.context['template']['html'], self.context)
-            targets = self.targets.values_list('email', flat=True)
 
             # Prefix the 'instance title' to the email subject
-            instance_title = common.models.AriusSetting.get_setting('ARIUS_INSTANCE')
+            subject = common.notifications.email_subject(self.context['template'].get('subject', ''))
 
-            subject = self.context['template'].get('subject', '')
+            if common.notifications.get_digest_window() > 0:
+                common.notifications.queue_email_digest(
+                    set(self.targets.values_list('user', flat=True)),
+                    self.category, self.context, subject, html_message,
+                )
+                return True
 
-            if instance_title:
-                subject = f'[{instance_title}] {subject}'
+            targets = self.targets.values_list('email', flat=True)
 
             arius.email.send_email(subject, '', targets, html_message=html_message)
 
@@ -2,6 +2,10 @@
 
 from django.core import mail
 
+from common.models import AriusSetting, NotificationDigestEntry
+from common.notifications import (UIMessageNotification, deliver_notification,
+                                  send_email_digests)
+from part.models import Part
 from part.test_part import BaseNotificationIntegrationTest
 from plugin import registry
 from plugin.builtin.integration.core_notifications import \
@@ -33,3 +37,59 @@ class CoreNotificationTestTests(BaseNotificationIntegrationTest):
 
         # Now one mail should be send
         self.assertEqual(len(mail.outbox), 1)
+
+    def test_email_digest(self):
+        """Test that multiple email notifications for the same user are combined into a digest."""
+
+        plugin = registry.plugins.get('ariuscorenotificationsplugin')
+        plugin.set_setting('ENABLE_NOTIFICATION_EMAILS', True)
+        NotificationUserSetting.set_setting(
+            key='NOTIFICATION_METHOD_MAIL',
+            value=True,
+            change_user=self.user,
+            user=self.user,
+            method=AriusCoreNotificationsPlugin.EmailNotification.METHOD_NAME
+        )
+
+        AriusSetting.set_setting('NOTIFICATION_DIGEST_WINDOW', 10, None)
+
+        parts = Part.objects.all()[:3]
+
+        for part in parts:
+            deliver_notification(
+                AriusCoreNotificationsPlugin.EmailNotification,
+                part,
+                'part.notify_low_stock',
+                {self.user},
+                {
+                    'part': part,
+                    'name': f'Low stock: {part.name}',
+                    'message': 'Stock is low',
+                    'template': {
+                        'html': 'email/low_stock_notification.html',
+                        'subject': 'Low stock',
+                    },
+                },
+            )
+
+            # UI messages are not affected by the digest setting
+            deliver_notification(UIMessageNotification, part, 'part.notify_low_stock', {self.user}, {'name': 'Low stock', 'message': 'Stock is low'})
+
+        # Emails are queued, not sent
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(NotificationDigestEntry.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(self.user.notificationmessage_set.count(), 3)
+
+        # The digest window has not yet elapsed
+        self.assertEqual(send_email_digests(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+        # A single digest email is sent for all queued notifications
+        self.assertEqual(send_email_digests(force=True), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('(3)', mail.outbox[0].subject)
+
+        for part in parts:
+            self.assertIn(f'Low stock: {part.name}', mail.outbox[0].alternatives[0][0])
+
+        self.assertEqual(NotificationDigestEntry.objects.count(), 0)
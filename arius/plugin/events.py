@@ -1,10 +1,16 @@
 """Import helper for events."""
 
-from plugin.base.event.events import (process_event, register_event,
-                                      trigger_event)
+from plugin.base.event.events import (bulk_events, process_event,
+                                      process_events, register_event,
+                                      register_events, trigger_event,
+                                      trigger_events)
 
 __all__ = [
+    'bulk_events',
     'process_event',
+    'process_events',
     'register_event',
+    'register_events',
     'trigger_event',
+    'trigger_events',
 ]
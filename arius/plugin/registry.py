@@ -64,6 +64,10 @@ class PluginsRegistry:
 
         self.installed_apps = []                                # Holds all added plugin_paths
 
+        # event routing
+        self.event_subscriptions: Dict[str, list] = {}         # Event patterns for each active events plugin
+        self.event_routes: Dict[str, list] = {}                # Subscribed plugins for each event name (built on demand)
+
     def get_plugin(self, slug):
         """Lookup plugin by slug (unique key)."""
         if slug not in self.plugins:
@@ -563,6 +567,8 @@ class PluginsRegistry:
         self.plugins: Dict[str, AriusPlugin] = {}
         self.plugins_inactive: Dict[str, AriusPlugin] = {}
         self.plugins_full: Dict[str, AriusPlugin] = {}
+        self.event_subscriptions: Dict[str, list] = {}
+        self.event_routes: Dict[str, list] = {}
 
     def _update_urls(self):
         from arius.urls import frontendpatterns as urlpattern
@@ -4,7 +4,9 @@ from django.conf import settings
 from django.test import TestCase
 
 from plugin import AriusPlugin, registry
-from plugin.base.event.events import trigger_event
+from plugin.base.event.events import (bulk_events, event_matches,
+                                      get_event_subscribers, trigger_event,
+                                      trigger_events)
 from plugin.helpers import MixinNotImplementedError
 from plugin.mixins import EventMixin
 
@@ -31,6 +33,110 @@ class EventPluginSampleTests(TestCase):
         # Disable again
         settings.PLUGIN_TESTING_EVENTS = False
 
+    def test_run_events(self):
+        """Check that multiple events are delivered to the plugin in a single batch."""
+        config = registry.get_plugin('sampleevent').plugin_config()
+        config.active = True
+        config.save()
+
+        self.assertIn('sampleevent', get_event_subscribers('test.event'))
+
+        settings.PLUGIN_TESTING_EVENTS = True
+
+        with self.assertLogs(logger=logger, level="DEBUG") as cm:
+            trigger_events([
+                ('test.event', {'id': 1}),
+                ('test.other_event', {'id': 2}),
+            ])
+
+        self.assertIn('DEBUG:arius:Event `test.event` triggered in sample plugin', cm[1])
+        self.assertIn('DEBUG:arius:Event `test.other_event` triggered in sample plugin', cm[1])
+        self.assertIn("DEBUG:arius:Plugin 'sampleevent' is processing 2 triggered events", cm[1])
+
+        settings.PLUGIN_TESTING_EVENTS = False
+
+    def test_bulk_events(self):
+        """Check that events triggered within a bulk_events() block are combined."""
+        config = registry.get_plugin('sampleevent').plugin_config()
+        config.active = True
+        config.save()
+
+        settings.PLUGIN_TESTING_EVENTS = True
+
+        with self.assertLogs(logger=logger, level="DEBUG") as cm:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                with bulk_events():
+                    for pk in [1, 2, 2, 3]:
+                        trigger_event('test.event', id=pk, model='Test')
+
+                    # Nested blocks are combined into the outer block
+                    with bulk_events():
+                        trigger_event('test.event', id=4, model='Test')
+
+                    trigger_event('test.other_event', id=5)
+
+        self.assertEqual(len(callbacks), 1)
+
+        self.assertEqual(cm[1].count('DEBUG:arius:Event `test.event` triggered in sample plugin'), 1)
+        self.assertEqual(cm[1].count('DEBUG:arius:Event `test.other_event` triggered in sample plugin'), 1)
+        self.assertIn("DEBUG:arius:Plugin 'sampleevent' is processing 2 triggered events", cm[1])
+
+        # Events are discarded if the block fails
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(ValueError):
+                with bulk_events():
+                    trigger_event('test.event', id=1)
+                    raise ValueError('Failed')
+
+        self.assertEqual(len(callbacks), 0)
+
+        settings.PLUGIN_TESTING_EVENTS = False
+
+    def test_subscriptions(self):
+        """Test that events are only routed to plugins which are subscribed to them."""
+        self.assertTrue(event_matches('build.completed', None))
+        self.assertTrue(event_matches('stock_stockitem.saved', ['build.*', 'stock_*.saved']))
+        self.assertFalse(event_matches('stock_stockitem.deleted', ['build.*', 'stock_*.saved']))
+        self.assertFalse(event_matches('build.completed', []))
+
+        class Subscribed(EventMixin, AriusPlugin):
+            SUBSCRIBED_EVENTS = 'build.*'
+
+        self.assertEqual(Subscribed().get_event_subscriptions(), ['build.*'])
+
+        subscriptions, routes = registry.event_subscriptions, registry.event_routes
+
+        try:
+            registry.event_subscriptions = {
+                'all': None,
+                'build': ['build.*'],
+                'nothing': [],
+            }
+            registry.event_routes = {}
+
+            self.assertEqual(get_event_subscribers('build.completed'), ['all', 'build'])
+            self.assertEqual(get_event_subscribers('part_part.saved'), ['all'])
+
+            # Results are cached in the routing table
+            self.assertEqual(registry.event_routes['build.completed'], ['all', 'build'])
+
+            registry.event_subscriptions = {}
+            registry.event_routes = {}
+
+            # Events with no subscribers are not offloaded
+            settings.PLUGIN_TESTING_EVENTS = True
+
+            with self.assertLogs(logger=logger, level="DEBUG") as cm:
+                trigger_event('build.completed', id=1)
+
+            settings.PLUGIN_TESTING_EVENTS = False
+
+            self.assertIn("DEBUG:arius:Ignoring triggered event 'build.completed' - no subscribed plugins", cm[1])
+
+        finally:
+            settings.PLUGIN_TESTING_EVENTS = False
+            registry.event_subscriptions, registry.event_routes = subscriptions, routes
+
     def test_mixin(self):
         """Test that MixinNotImplementedError is raised."""
         with self.assertRaises(MixinNotImplementedError):
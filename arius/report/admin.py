@@ -3,7 +3,7 @@
 from django.contrib import admin
 
 from .models import (BillOfMaterialsReport, BuildReport, PurchaseOrderReport,
-                     ReportAsset, ReportSnippet, ReturnOrderReport,
+                     ReportAsset, ReportJob, ReportSnippet, ReturnOrderReport,
                      SalesOrderReport, TestReport)
 
 
@@ -22,8 +22,15 @@ class ReportAssetAdmin(admin.ModelAdmin):
     list_display = ('id', 'asset', 'description')
 
 
+class ReportJobAdmin(admin.ModelAdmin):
+    """Admin class for the ReportJob model"""
+    list_display = ('created', 'user', 'endpoint', 'started', 'progress', 'total', 'complete')
+    list_filter = ('complete', 'user')
+
+
 admin.site.register(ReportSnippet, ReportSnippetAdmin)
 admin.site.register(ReportAsset, ReportAssetAdmin)
+admin.site.register(ReportJob, ReportJobAdmin)
 
 admin.site.register(TestReport, ReportTemplateAdmin)
 admin.site.register(BuildReport, ReportTemplateAdmin)
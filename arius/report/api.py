@@ -10,6 +10,7 @@ from django.utils.translation import gettext_lazy as _
 from django.views.decorators.cache import cache_page, never_cache
 
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import permissions, status
 from rest_framework.response import Response
 
 import build.models
@@ -18,16 +19,20 @@ import arius.helpers
 import order.models
 import part.models
 from arius.api import MetadataView
-from arius.filters import AriusSearchFilter
-from arius.mixins import ListAPI, RetrieveAPI, RetrieveUpdateDestroyAPI
+from arius.filters import ORDER_FILTER, AriusSearchFilter
+from arius.helpers import str2bool
+from arius.mixins import (ListAPI, RetrieveAPI, RetrieveDestroyAPI,
+                          RetrieveUpdateDestroyAPI)
 from stock.models import StockItem, StockItemAttachment
 
 from .models import (BillOfMaterialsReport, BuildReport, PurchaseOrderReport,
-                     ReturnOrderReport, SalesOrderReport, TestReport)
+                     ReportJob, ReturnOrderReport, SalesOrderReport,
+                     TestReport)
 from .serializers import (BOMReportSerializer, BuildReportSerializer,
-                          PurchaseOrderReportSerializer,
+                          PurchaseOrderReportSerializer, ReportJobSerializer,
                           ReturnOrderReportSerializer,
                           SalesOrderReportSerializer, TestReportSerializer)
+from .tasks import dispatch_report_jobs
 
 
 class ReportListView(ListAPI):
@@ -146,6 +151,10 @@ class ReportFilterMixin:
 class ReportPrintMixin:
     """Mixin for printing reports."""
 
+    # Attachment model (and foreign key field) used to attach generated reports to the printed items
+    ATTACHMENT_MODEL = None
+    ATTACHMENT_KEY = None
+
     @method_decorator(never_cache)
     def dispatch(self, *args, **kwargs):
         """Prevent caching when printing report templates"""
@@ -163,25 +172,23 @@ class ReportPrintMixin:
         """
         ...
 
-    def print(self, request, items_to_print):
-        """Print this report template against a number of pre-validated items."""
-        if len(items_to_print) == 0:
-            # No valid items provided, return an error message
-            data = {
-                'error': _('No valid objects provided to template'),
-            }
+    def render_outputs(self, request, items_to_print, debug_mode=False):
+        """Render this report template against each of the provided items.
 
-            return Response(data, status=400)
+        Arguments:
+            request: The request instance associated with this print call
+            items_to_print: The model instances to be printed
+            debug_mode: If True, render each report as a HTML string (rather than PDF)
 
-        outputs = []
+        Returns:
+            tuple: (report_name, outputs)
+        """
 
-        # In debug mode, generate single HTML output, rather than PDF
-        debug_mode = common.models.AriusSetting.get_setting('REPORT_DEBUG_MODE', cache=False)
+        outputs = []
 
         # Start with a default report name
         report_name = "report.pdf"
 
-        # Merge one or more PDF files into a single download
         for item in items_to_print:
             report = self.get_object()
             report.object_to_print = item
@@ -192,68 +199,148 @@ class ReportPrintMixin:
             # Run report callback for each generated report
             self.report_callback(item, output, request)
 
-            try:
-                if debug_mode:
-                    outputs.append(report.render_as_string(request))
-                else:
-                    outputs.append(output)
-            except TemplateDoesNotExist as e:
-                template = str(e)
-                if not template:
-                    template = report.template
-
-                return Response(
-                    {
-                        'error': _(f"Template file '{template}' is missing or does not exist"),
-                    },
-                    status=400,
-                )
+            if debug_mode:
+                outputs.append(report.render_as_string(request))
+            else:
+                outputs.append(output)
 
         if not report_name.endswith('.pdf'):
             report_name += '.pdf'
 
-        if debug_mode:
-            """Contatenate all rendered templates into a single HTML string, and return the string as a HTML response."""
+        return report_name, outputs
 
-            html = "\n".join(outputs)
+    @staticmethod
+    def merge_outputs(outputs, progress=None):
+        """Concatenate all rendered pages into a single PDF document.
 
-            return HttpResponse(html)
-        else:
-            """Concatenate all rendered pages into a single PDF object, and return the resulting document!"""
+        Arguments:
+            outputs: Rendered report outputs (as returned by render_outputs)
+            progress: Optional callback function, called with the number of documents rendered so far
+        """
 
-            pages = []
+        documents = []
+        pages = []
 
-            try:
-                for output in outputs:
-                    doc = output.get_document()
-                    for page in doc.pages:
-                        pages.append(page)
+        for idx, output in enumerate(outputs):
+            doc = output.get_document()
 
-                pdf = outputs[0].get_document().copy(pages).write_pdf()
+            documents.append(doc)
+            pages.extend(doc.pages)
 
-            except TemplateDoesNotExist as e:
+            if progress:
+                progress(idx + 1)
 
-                template = str(e)
+        return documents[0].copy(pages).write_pdf()
 
-                if not template:
-                    template = report.template
+    def attach_report(self, items, pdf, filename, user):
+        """Attach a copy of a generated report to each of the printed items.
 
-                return Response(
-                    {
-                        'error': _(f"Template file '{template}' is missing or does not exist"),
-                    },
-                    status=400,
-                )
+        Requires that the ATTACHMENT_MODEL and ATTACHMENT_KEY attributes are defined.
+        """
 
-            inline = common.models.AriusUserSetting.get_setting('REPORT_INLINE', user=request.user, cache=False)
+        if self.ATTACHMENT_MODEL is None:
+            return
 
-            return arius.helpers.DownloadFile(
-                pdf,
-                report_name,
-                content_type='application/pdf',
-                inline=inline,
+        for item in items:
+            self.ATTACHMENT_MODEL.objects.create(
+                attachment=ContentFile(pdf, filename),
+                user=user,
+                comment=_('Generated report'),
+                **{self.ATTACHMENT_KEY: item}
             )
 
+    def schedule_report(self, request, items_to_print):
+        """Create a ReportJob, which renders the report via the background worker.
+
+        Returns:
+            Response containing the details of the new report job (which can be polled for progress)
+        """
+
+        params = request.query_params.copy()
+
+        for key in ['background', 'attach']:
+            params.pop(key, None)
+
+        job = ReportJob.objects.create(
+            user=request.user,
+            endpoint=f"{self.__class__.__module__}.{self.__class__.__name__}",
+            params={key: params.getlist(key) for key in params.keys()},
+            kwargs=self.kwargs,
+            base_url=request.build_absolute_uri('/'),
+            attach=str2bool(request.query_params.get('attach', False)),
+            total=len(items_to_print),
+        )
+
+        dispatch_report_jobs()
+
+        job.refresh_from_db()
+
+        serializer = ReportJobSerializer(job, context={'request': request})
+
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    def template_missing(self, error):
+        """Return an error response for a missing template file"""
+
+        template = str(error)
+
+        if not template:
+            template = self.get_object().template
+
+        return Response(
+            {
+                'error': _(f"Template file '{template}' is missing or does not exist"),
+            },
+            status=400,
+        )
+
+    def print(self, request, items_to_print):
+        """Print this report template against a number of pre-validated items.
+
+        If the ?background=true parameter is provided, the report is rendered by the background worker.
+        """
+        if len(items_to_print) == 0:
+            # No valid items provided, return an error message
+            data = {
+                'error': _('No valid objects provided to template'),
+            }
+
+            return Response(data, status=400)
+
+        # In debug mode, generate single HTML output, rather than PDF
+        debug_mode = common.models.AriusSetting.get_setting('REPORT_DEBUG_MODE', cache=False)
+
+        if not debug_mode and str2bool(request.query_params.get('background', False)):
+            return self.schedule_report(request, items_to_print)
+
+        try:
+            report_name, outputs = self.render_outputs(request, items_to_print, debug_mode=debug_mode)
+
+            if debug_mode:
+                """Contatenate all rendered templates into a single HTML string, and return the string as a HTML response."""
+
+                html = "\n".join(outputs)
+
+                return HttpResponse(html)
+
+            """Concatenate all rendered pages into a single PDF object, and return the resulting document!"""
+            pdf = self.merge_outputs(outputs)
+
+        except TemplateDoesNotExist as e:
+            return self.template_missing(e)
+
+        if str2bool(request.query_params.get('attach', False)):
+            self.attach_report(items_to_print, pdf, report_name, request.user)
+
+        inline = common.models.AriusUserSetting.get_setting('REPORT_INLINE', user=request.user, cache=False)
+
+        return arius.helpers.DownloadFile(
+            pdf,
+            report_name,
+            content_type='application/pdf',
+            inline=inline,
+        )
+
     def get(self, request, *args, **kwargs):
         """Default implementation of GET for a print endpoint.
 
@@ -291,6 +378,9 @@ class StockItemTestReportDetail(StockItemTestReportMixin, RetrieveUpdateDestroyA
 class StockItemTestReportPrint(StockItemTestReportMixin, ReportPrintMixin, RetrieveAPI):
     """API endpoint for printing a TestReport object."""
 
+    ATTACHMENT_MODEL = StockItemAttachment
+    ATTACHMENT_KEY = 'stock_item'
+
     def report_callback(self, item, report, request):
         """Callback to (optionally) save a copy of the generated report"""
 
@@ -310,6 +400,18 @@ class StockItemTestReportPrint(StockItemTestReportMixin, ReportPrintMixin, Retri
                 comment=_("Test report")
             )
 
+    def attach_report(self, items, pdf, filename, user):
+        """Attach a copy of the generated report to each of the printed items.
+
+        If REPORT_ATTACH_TEST_REPORT is enabled, each item already has a copy attached (see report_callback),
+        so no duplicate attachment is created.
+        """
+
+        if common.models.AriusSetting.get_setting('REPORT_ATTACH_TEST_REPORT', cache=False):
+            return
+
+        super().attach_report(items, pdf, filename, user)
+
 
 class BOMReportMixin(ReportFilterMixin):
     """Mixin for BillOfMaterialsReport report template"""
@@ -339,7 +441,9 @@ class BOMReportDetail(BOMReportMixin, RetrieveUpdateDestroyAPI):
 
 class BOMReportPrint(BOMReportMixin, ReportPrintMixin, RetrieveAPI):
     """API endpoint for printing a BillOfMaterialReport object."""
-    pass
+
+    ATTACHMENT_MODEL = part.models.PartAttachment
+    ATTACHMENT_KEY = 'part'
 
 
 class BuildReportMixin(ReportFilterMixin):
@@ -370,7 +474,9 @@ class BuildReportDetail(BuildReportMixin, RetrieveUpdateDestroyAPI):
 
 class BuildReportPrint(BuildReportMixin, ReportPrintMixin, RetrieveAPI):
     """API endpoint for printing a BuildReport."""
-    pass
+
+    ATTACHMENT_MODEL = build.models.BuildOrderAttachment
+    ATTACHMENT_KEY = 'build'
 
 
 class PurchaseOrderReportMixin(ReportFilterMixin):
@@ -395,7 +501,9 @@ class PurchaseOrderReportDetail(PurchaseOrderReportMixin, RetrieveUpdateDestroyA
 
 class PurchaseOrderReportPrint(PurchaseOrderReportMixin, ReportPrintMixin, RetrieveAPI):
     """API endpoint for printing a PurchaseOrderReport object."""
-    pass
+
+    ATTACHMENT_MODEL = order.models.PurchaseOrderAttachment
+    ATTACHMENT_KEY = 'order'
 
 
 class SalesOrderReportMixin(ReportFilterMixin):
@@ -420,7 +528,9 @@ class SalesOrderReportDetail(SalesOrderReportMixin, RetrieveUpdateDestroyAPI):
 
 class SalesOrderReportPrint(SalesOrderReportMixin, ReportPrintMixin, RetrieveAPI):
     """API endpoint for printing a PurchaseOrderReport object."""
-    pass
+
+    ATTACHMENT_MODEL = order.models.SalesOrderAttachment
+    ATTACHMENT_KEY = 'order'
 
 
 class ReturnOrderReportMixin(ReportFilterMixin):
@@ -445,11 +555,56 @@ class ReturnOrderReportDetail(ReturnOrderReportMixin, RetrieveUpdateDestroyAPI):
 
 class ReturnOrderReportPrint(ReturnOrderReportMixin, ReportPrintMixin, RetrieveAPI):
     """API endpoint for printing a ReturnOrderReport object"""
+
+    ATTACHMENT_MODEL = order.models.ReturnOrderAttachment
+    ATTACHMENT_KEY = 'order'
+
+
+class ReportJobMixin:
+    """Generic mixin for the ReportJob model"""
+
+    queryset = ReportJob.objects.all()
+    serializer_class = ReportJobSerializer
+    permission_classes = [permissions.IsAuthenticated, ]
+
+    def get_queryset(self):
+        """Staff users can view all report jobs, other users only their own."""
+        queryset = super().get_queryset()
+
+        user = self.request.user
+
+        if not user.is_staff:
+            queryset = queryset.filter(user=user)
+
+        return queryset
+
+
+class ReportJobList(ReportJobMixin, ListAPI):
+    """API endpoint for viewing a list of background report jobs"""
+
+    filter_backends = ORDER_FILTER
+
+    ordering_fields = [
+        'created',
+        'complete',
+    ]
+
+    ordering = '-created'
+
+
+class ReportJobDetail(ReportJobMixin, RetrieveDestroyAPI):
+    """API endpoint for a single background report job"""
     pass
 
 
 report_api_urls = [
 
+    # Background report jobs
+    re_path(r'job/', include([
+        path(r'<int:pk>/', ReportJobDetail.as_view(), name='api-report-job-detail'),
+        re_path(r'^.*$', ReportJobList.as_view(), name='api-report-job-list'),
+    ])),
+
     # Purchase order reports
     re_path(r'po/', include([
         # Detail views
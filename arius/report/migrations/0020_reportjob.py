@@ -0,0 +1,36 @@
+# Generated by Django 3.2.19 on 2023-06-07 10:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import report.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('report', '0019_returnorderreport_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('started', models.DateTimeField(blank=True, help_text='Date / time when the report started rendering', null=True, verbose_name='Started')),
+                ('endpoint', models.CharField(help_text='API endpoint which prints the report', max_length=250, verbose_name='Endpoint')),
+                ('params', models.JSONField(blank=True, default=dict, help_text='Query parameters for the report', verbose_name='Parameters')),
+                ('kwargs', models.JSONField(blank=True, default=dict, help_text='URL keyword arguments for the API endpoint', verbose_name='Keyword Arguments')),
+                ('base_url', models.CharField(blank=True, help_text='Base URL of the original request', max_length=250, verbose_name='Base URL')),
+                ('attach', models.BooleanField(default=False, help_text='Attach the generated report to each printed item', verbose_name='Attach')),
+                ('total', models.PositiveIntegerField(default=0, help_text='Total number of items to render', verbose_name='Total')),
+                ('progress', models.PositiveIntegerField(default=0, help_text='Number of items rendered', verbose_name='Progress')),
+                ('complete', models.BooleanField(default=False, help_text='Report generation has finished', verbose_name='Complete')),
+                ('error', models.CharField(blank=True, help_text='Error message (if the report failed)', max_length=500, verbose_name='Error')),
+                ('output', models.FileField(blank=True, help_text='Generated report file', null=True, upload_to=report.models.rename_report_output, verbose_name='Output')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_jobs', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+        ),
+    ]
@@ -6,6 +6,7 @@ import os
 import sys
 
 from django.conf import settings
+from django.contrib.auth.models import User
 from django.core.cache import cache
 from django.core.validators import FileExtensionValidator
 from django.db import models
@@ -22,6 +23,7 @@ import stock.models
 from arius.helpers import validateFilterString
 from arius.helpers_model import get_base_url
 from arius.models import MetadataMixin
+from arius.template import AriusWeasyTemplateResponse
 from plugin.registry import registry
 
 try:
@@ -77,6 +79,8 @@ def validate_return_order_filters(filters):
 class WeasyprintReportMixin(WeasyTemplateResponseMixin):
     """Class for rendering a HTML template to a PDF."""
 
+    response_class = AriusWeasyTemplateResponse
+
     pdf_filename = 'report.pdf'
     pdf_attachment = True
 
@@ -619,3 +623,131 @@ class ReportAsset(models.Model):
         verbose_name=_('Description'),
         help_text=_("Asset file description")
     )
+
+
+def rename_report_output(instance, filename):
+    """Save generated report files to the correct subdirectory"""
+
+    filename = os.path.basename(filename)
+    return os.path.join('report_output', filename)
+
+
+class ReportJob(models.Model):
+    """A ReportJob is a request to generate a report, which is processed by the background worker.
+
+    Generating a large report (e.g. a BOM report for a complex assembly) may take several minutes,
+    so the report is rendered in the background and the generated file is saved for later download.
+
+    The number of report jobs which are rendered concurrently is limited by the REPORT_MAX_CONCURRENT_JOBS setting.
+    Any additional jobs remain queued until a running job has finished.
+
+    Attributes:
+        user: The user who requested the report
+        created: Date / time when the report was requested
+        started: Date / time when the report started rendering
+        endpoint: Import path of the API view class which prints the report
+        params: Query parameters (selected items) for the print endpoint
+        kwargs: URL keyword arguments for the print endpoint
+        base_url: Base URL of the original request
+        attach: Attach the generated report to each of the printed items
+        total: Total number of items to render
+        progress: Number of items rendered so far
+        complete: Set when the report job has finished
+        error: Error message (if the report failed)
+        output: Generated report file
+    """
+
+    @staticmethod
+    def get_api_url():
+        """Return the API URL for this model."""
+        return reverse('api-report-job-list')
+
+    def __str__(self):
+        """String representation of a ReportJob"""
+        return f"{self.endpoint} ({self.pk})"
+
+    def get_absolute_url(self):
+        """Return the URL for the generated report file"""
+        if self.output:
+            return self.output.url
+        else:
+            return None
+
+    user = models.ForeignKey(
+        User, blank=True, null=True,
+        on_delete=models.SET_NULL,
+        related_name='report_jobs',
+        verbose_name=_('User'),
+    )
+
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Created'),
+    )
+
+    started = models.DateTimeField(
+        blank=True, null=True,
+        verbose_name=_('Started'),
+        help_text=_('Date / time when the report started rendering'),
+    )
+
+    endpoint = models.CharField(
+        max_length=250,
+        verbose_name=_('Endpoint'),
+        help_text=_('API endpoint which prints the report'),
+    )
+
+    params = models.JSONField(
+        blank=True, default=dict,
+        verbose_name=_('Parameters'),
+        help_text=_('Query parameters for the report'),
+    )
+
+    kwargs = models.JSONField(
+        blank=True, default=dict,
+        verbose_name=_('Keyword Arguments'),
+        help_text=_('URL keyword arguments for the API endpoint'),
+    )
+
+    base_url = models.CharField(
+        max_length=250, blank=True,
+        verbose_name=_('Base URL'),
+        help_text=_('Base URL of the original request'),
+    )
+
+    attach = models.BooleanField(
+        default=False,
+        verbose_name=_('Attach'),
+        help_text=_('Attach the generated report to each printed item'),
+    )
+
+    total = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Total'),
+        help_text=_('Total number of items to render'),
+    )
+
+    progress = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Progress'),
+        help_text=_('Number of items rendered'),
+    )
+
+    complete = models.BooleanField(
+        default=False,
+        verbose_name=_('Complete'),
+        help_text=_('Report generation has finished'),
+    )
+
+    error = models.CharField(
+        max_length=500, blank=True,
+        verbose_name=_('Error'),
+        help_text=_('Error message (if the report failed)'),
+    )
+
+    output = models.FileField(
+        upload_to=rename_report_output,
+        blank=True, null=True,
+        verbose_name=_('Output'),
+        help_text=_('Generated report file'),
+    )
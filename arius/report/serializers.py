@@ -4,7 +4,8 @@ from arius.serializers import (AriusAttachmentSerializerField,
                                AriusModelSerializer)
 
 from .models import (BillOfMaterialsReport, BuildReport, PurchaseOrderReport,
-                     ReturnOrderReport, SalesOrderReport, TestReport)
+                     ReportJob, ReturnOrderReport, SalesOrderReport,
+                     TestReport)
 
 
 class ReportSerializerBase(AriusModelSerializer):
@@ -84,3 +85,28 @@ class ReturnOrderReportSerializer(ReportSerializerBase):
 
         model = ReturnOrderReport
         fields = ReportSerializerBase.report_fields()
+
+
+class ReportJobSerializer(AriusModelSerializer):
+    """Serializer for the ReportJob model."""
+
+    class Meta:
+        """Meta options for ReportJobSerializer."""
+
+        model = ReportJob
+        fields = [
+            'pk',
+            'user',
+            'created',
+            'started',
+            'attach',
+            'total',
+            'progress',
+            'complete',
+            'error',
+            'output',
+        ]
+
+        read_only_fields = fields
+
+    output = AriusAttachmentSerializerField(read_only=True, allow_null=True)
@@ -0,0 +1,185 @@
+"""Background tasks for the 'report' app"""
+
+import logging
+from datetime import timedelta
+
+from django.core.exceptions import AppRegistryNotReady
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from arius.tasks import ScheduledTask, offload_task, scheduled_task
+
+logger = logging.getLogger('arius')
+
+# Report jobs which have been running for longer than this are assumed to have failed,
+# and no longer count towards the concurrent job limit
+REPORT_JOB_TIMEOUT = timedelta(hours=1)
+
+
+def get_running_report_jobs():
+    """Return a queryset of the report jobs which are currently being rendered."""
+
+    from report.models import ReportJob
+
+    return ReportJob.objects.filter(
+        complete=False,
+        started__isnull=False,
+        started__gte=timezone.now() - REPORT_JOB_TIMEOUT,
+    )
+
+
+def dispatch_report_jobs():
+    """Start rendering queued report jobs, up to the concurrent job limit.
+
+    - Jobs are started in the order in which they were requested
+    - Each job is claimed (by setting the 'started' timestamp) before being offloaded,
+      so that a job cannot be started twice
+    - This function is called whenever a job is queued, and whenever a job finishes
+
+    Returns:
+        int: The number of jobs which were started
+    """
+
+    from common.models import AriusSetting
+    from report.models import ReportJob
+
+    limit = max(1, int(AriusSetting.get_setting('REPORT_MAX_CONCURRENT_JOBS', 2, cache=False)))
+
+    started = 0
+
+    while get_running_report_jobs().count() < limit:
+
+        job = ReportJob.objects.filter(complete=False, started__isnull=True).order_by('created', 'pk').first()
+
+        if job is None:
+            break
+
+        # Claim the job (another process may have claimed it first)
+        if ReportJob.objects.filter(pk=job.pk, started__isnull=True).update(started=timezone.now()) == 0:
+            continue
+
+        started += 1
+
+        offload_task('report.tasks.run_report_job', job.pk)
+
+    return started
+
+
+def run_report_job(job_id: int):
+    """Render the report for a ReportJob.
+
+    The print endpoint is reconstructed from the saved query parameters,
+    and the report is rendered exactly as if printed directly from that endpoint.
+    """
+
+    import arius.api
+    from common.notifications import trigger_notification
+    from report.models import ReportJob
+
+    try:
+        job = ReportJob.objects.get(pk=job_id)
+    except ReportJob.DoesNotExist:
+        logger.error(f"run_report_job: ReportJob <{job_id}> does not exist")
+        return
+
+    logger.info(f"Running report job <{job_id}> for '{job.endpoint}'")
+
+    def update_progress(count):
+        """Save the number of rendered items"""
+        ReportJob.objects.filter(pk=job.pk).update(progress=count)
+
+    try:
+        view = arius.api.construct_api_view(
+            job.endpoint, job.user,
+            params=job.params,
+            kwargs=job.kwargs,
+            base_url=job.base_url,
+        )
+
+        items = view.get_items()
+
+        job.total = len(items)
+        job.save()
+
+        if job.total == 0:
+            raise ValueError(_('No valid objects provided to template'))
+
+        report_name, outputs = view.render_outputs(view.request, items)
+
+        pdf = view.merge_outputs(outputs, progress=update_progress)
+
+        job.refresh_from_db()
+        job.output.save(report_name, ContentFile(pdf), save=False)
+
+        if job.attach:
+            view.attach_report(items, pdf, report_name, job.user)
+
+        job.complete = True
+        job.save()
+
+    except Exception as exc:
+        logger.exception(f"Report job <{job_id}> failed: {exc}")
+
+        job.error = str(exc)[:500]
+        job.complete = True
+        job.save()
+
+    if job.user:
+        trigger_notification(
+            job,
+            category='report_job',
+            context={
+                'name': _('Report Generation Failed') if job.error else _('Report Available'),
+                'message': job.error if job.error else _('Generated report is available for download'),
+            },
+            targets=[job.user],
+        )
+
+    # Start the next queued job (if any)
+    dispatch_report_jobs()
+
+
+@scheduled_task(ScheduledTask.MINUTES, 5)
+def check_report_jobs():
+    """Start any queued report jobs which have not yet been dispatched.
+
+    Queued jobs are normally started when a running job finishes,
+    this task ensures that the queue is processed even if a job fails unexpectedly.
+
+    Any jobs which have exceeded the REPORT_JOB_TIMEOUT period are marked as failed.
+    """
+
+    try:
+        from report.models import ReportJob
+    except AppRegistryNotReady:  # pragma: no cover
+        logger.info("Could not perform 'check_report_jobs' - App registry not ready")
+        return
+
+    ReportJob.objects.filter(
+        complete=False,
+        started__lt=timezone.now() - REPORT_JOB_TIMEOUT,
+    ).update(complete=True, error=str(_('Report generation timed out')))
+
+    dispatch_report_jobs()
+
+
+@scheduled_task(ScheduledTask.DAILY)
+def delete_old_report_jobs():
+    """Remove old report jobs (and the associated files) from the database.
+
+    Anything older than 30 days is removed
+    """
+    try:
+        from report.models import ReportJob
+    except AppRegistryNotReady:  # pragma: no cover
+        logger.info("Could not perform 'delete_old_report_jobs' - App registry not ready")
+        return
+
+    before = timezone.now() - timedelta(days=30)
+
+    for job in ReportJob.objects.filter(created__lte=before):
+        if job.output:
+            job.output.delete(save=False)
+
+        job.delete()
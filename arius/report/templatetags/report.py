@@ -10,6 +10,7 @@ from django.utils.safestring import SafeString, mark_safe
 
 import arius.helpers
 import arius.helpers_model
+import arius.template
 from common.models import AriusSetting
 from company.models import Company
 from part.models import Part
@@ -19,6 +20,28 @@ register = template.Library()
 
 logger = logging.getLogger('arius')
 
+# Results of image file validation, keyed by file path
+image_checks = arius.template.FileCache('image_checks', max_entries=1000)
+
+
+def is_valid_image(path):
+    """Test if the provided file is a valid image file.
+
+    The result is cached until the file is modified.
+    """
+
+    key = str(path)
+    signature = arius.template.file_signature(path)
+
+    if (valid := image_checks.get(key, signature)) is not None:
+        return valid
+
+    valid = arius.helpers.TestIfImage(path)
+
+    image_checks.set(key, valid, signature=signature)
+
+    return valid
+
 
 @register.simple_tag()
 def getindex(container: list, index: int):
@@ -128,7 +151,7 @@ def uploaded_image(filename, replace_missing=True, replacement_file='blank_image
         except Exception:
             exists = False
 
-    if exists and validate and not arius.helpers.TestIfImage(full_path):
+    if exists and validate and not is_valid_image(full_path):
         logger.warning(f"File '{filename}' is not a valid image")
         exists = False
 
@@ -7,16 +7,20 @@ from pathlib import Path
 from django.conf import settings
 from django.core.cache import cache
 from django.http.response import StreamingHttpResponse
+from django.template.loader import get_template
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.safestring import SafeString
 
 from PIL import Image
 
+import arius.template
 import report.models as report_models
 from build.models import Build
 from common.models import AriusSetting, AriusUserSetting
 from arius.unit_test import AriusAPITestCase
+from report.tasks import dispatch_report_jobs
 from report.templatetags import barcode as barcode_tags
 from report.templatetags import report as report_tags
 from stock.models import StockItem, StockItemAttachment
@@ -160,6 +164,72 @@ class ReportTagTest(TestCase):
         self.assertEqual(report_tags.divide(100, 5), 20)
 
 
+class TemplateCacheTest(TestCase):
+    """Unit tests for the report template and asset caches"""
+
+    def setUp(self):
+        """Create a temporary report template file"""
+        arius.template.clear_caches()
+
+        self.template_file = settings.MEDIA_ROOT.joinpath('report', 'test_template_cache.html')
+        self.template_file.parent.mkdir(parents=True, exist_ok=True)
+        self.template_file.write_text('value: {{ value }}')
+
+        return super().setUp()
+
+    def tearDown(self):
+        """Remove the temporary report template file"""
+        self.template_file.unlink(missing_ok=True)
+
+        return super().tearDown()
+
+    def test_template_cache(self):
+        """Compiled templates are cached until the template file changes"""
+
+        t1 = get_template(str(self.template_file))
+        t2 = get_template(str(self.template_file))
+
+        self.assertIs(t1.template, t2.template)
+        self.assertEqual(t2.render({'value': 1}), 'value: 1')
+
+        stats = arius.template.get_cache_stats()['templates']
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+
+        # Modify the template file
+        self.template_file.write_text('new value: {{ value }}')
+        st = os.stat(self.template_file)
+        os.utime(self.template_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1000))
+
+        t3 = get_template(str(self.template_file))
+
+        self.assertIsNot(t1.template, t3.template)
+        self.assertEqual(t3.render({'value': 2}), 'new value: 2')
+
+    def test_asset_cache(self):
+        """Asset files are served from the asset cache"""
+
+        asset_file = settings.MEDIA_ROOT.joinpath('report', 'assets', 'test_asset_cache.png')
+        asset_file.parent.mkdir(parents=True, exist_ok=True)
+        Image.new('RGB', (10, 10)).save(asset_file)
+
+        self.addCleanup(asset_file.unlink, missing_ok=True)
+
+        for _ in range(3):
+            data = arius.template.url_fetcher(f"file://{asset_file}")
+            self.assertTrue(data['string'].startswith(b'\x89PNG'))
+            self.assertEqual(data['mime_type'], 'image/png')
+
+        stats = arius.template.get_cache_stats()['assets']
+
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['entries'], 1)
+
+        # Files outside of the media / static directories are not cached
+        self.assertIsNone(arius.template.get_asset(__file__))
+
+
 class BarcodeTagTest(TestCase):
     """Unit tests for the barcode template tags"""
 
@@ -366,6 +436,10 @@ class TestReportTest(ReportTest):
         attachment = StockItemAttachment.objects.filter(stock_item=item).first()
         self.assertIsNotNone(attachment)
 
+        # Requesting an attachment as well does not create a duplicate copy
+        response = self.get(url, {'item': item.pk, 'attach': True}, expected_code=200)
+        self.assertEqual(StockItemAttachment.objects.filter(stock_item=item).count(), 2)
+
 
 class BuildReportTest(ReportTest):
     """Unit test class for the BuildReport model"""
@@ -416,6 +490,63 @@ class BuildReportTest(ReportTest):
         self.assertEqual(headers['Content-Type'], 'application/pdf')
         self.assertEqual(headers['Content-Disposition'], 'inline; filename="report.pdf"')
 
+    def test_print_background(self):
+        """Test that a BuildReport can be rendered via the background worker."""
+
+        report = self.model.objects.first()
+        build = Build.objects.first()
+
+        url = reverse(self.print_url, kwargs={'pk': report.pk})
+
+        response = self.get(url, {'build': build.pk, 'background': True, 'attach': True}, expected_code=202)
+
+        job = report_models.ReportJob.objects.get(pk=response.data['pk'])
+
+        # No background worker is running, so the report is rendered immediately
+        self.assertTrue(job.complete)
+        self.assertEqual(job.error, '')
+        self.assertEqual(job.total, 1)
+        self.assertEqual(job.progress, 1)
+        self.assertTrue(job.output.name.endswith('.pdf'))
+
+        # A copy of the report has been attached to the build order
+        self.assertEqual(build.attachments.count(), 1)
+
+        response = self.get(reverse('api-report-job-detail', kwargs={'pk': job.pk}))
+        self.assertTrue(response.data['complete'])
+
+    def test_report_job_limit(self):
+        """Test that the number of concurrent report jobs is limited."""
+
+        AriusSetting.set_setting('REPORT_MAX_CONCURRENT_JOBS', 1, None)
+
+        report = self.model.objects.first()
+
+        url = reverse(self.print_url, kwargs={'pk': report.pk})
+
+        running = report_models.ReportJob.objects.create(
+            user=self.user,
+            endpoint='report.api.BuildReportPrint',
+            started=timezone.now(),
+        )
+
+        response = self.get(url, {'build': 1, 'background': True}, expected_code=202)
+
+        # The job is queued, as another job is already running
+        job = report_models.ReportJob.objects.get(pk=response.data['pk'])
+        self.assertIsNone(job.started)
+        self.assertFalse(job.complete)
+
+        # Once the running job has finished, the queued job is started
+        running.complete = True
+        running.save()
+
+        self.assertEqual(dispatch_report_jobs(), 1)
+
+        job.refresh_from_db()
+        self.assertIsNotNone(job.started)
+        self.assertTrue(job.complete)
+
 
 class BOMReportTest(ReportTest):
     """Unit test class for the BillOfMaterialsReport model"""
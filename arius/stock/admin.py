@@ -13,8 +13,8 @@ from arius.admin import AriusResource
 from order.models import PurchaseOrder, SalesOrder
 from part.models import Part
 
-from .models import (StockItem, StockItemAttachment, StockItemTestResult,
-                     StockItemTracking, StockLocation)
+from .models import (SerialNumberReservation, StockItem, StockItemAttachment,
+                     StockItemTestResult, StockItemTracking, StockLocation)
 
 
 class LocationResource(AriusResource):
@@ -203,8 +203,19 @@ class StockItemTestResultAdmin(admin.ModelAdmin):
     ]
 
 
+class SerialNumberReservationAdmin(admin.ModelAdmin):
+    """Admin class for SerialNumberReservation."""
+
+    list_display = ('scope', 'serial', 'key', 'user', 'expiry')
+
+    list_filter = ('scope',)
+
+    search_fields = ('serial', 'key')
+
+
 admin.site.register(StockLocation, LocationAdmin)
 admin.site.register(StockItem, StockItemAdmin)
 admin.site.register(StockItemTracking, StockTrackingAdmin)
 admin.site.register(StockItemAttachment, StockAttachmentAdmin)
 admin.site.register(StockItemTestResult, StockItemTestResultAdmin)
+admin.site.register(SerialNumberReservation, SerialNumberReservationAdmin)
@@ -27,8 +27,8 @@ from arius.api import (APIDownloadMixin, AttachmentMixin,
                        ListCreateDestroyAPIView, MetadataView)
 from arius.filters import (ORDER_FILTER, SEARCH_ORDER_FILTER,
                            SEARCH_ORDER_FILTER_ALIAS)
-from arius.helpers import (DownloadFile, extract_serial_numbers, isNull,
-                           str2bool, str2int)
+from arius.helpers import (DownloadFileStream, extract_serial_numbers,
+                           isNull, str2bool, str2int)
 from arius.mixins import (CreateAPI, CustomRetrieveUpdateDestroyAPI,
                           ListAPI, ListCreateAPI, RetrieveAPI,
                           RetrieveUpdateDestroyAPI)
@@ -230,11 +230,10 @@ class StockLocationList(APIDownloadMixin, ListCreateAPI):
     def download_queryset(self, queryset, export_format):
         """Download the filtered queryset as a data file"""
 
-        dataset = LocationResource().export(queryset=queryset)
-        filedata = dataset.export(export_format)
+        stream = LocationResource().export_stream(queryset, export_format)
         filename = f"Arius_Locations.{export_format}"
 
-        return DownloadFile(filedata, filename)
+        return DownloadFileStream(stream, filename)
 
     def get_queryset(self, *args, **kwargs):
         """Return annotated queryset for the StockLocationList endpoint"""
@@ -775,16 +774,14 @@ class StockList(APIDownloadMixin, ListCreateDestroyAPIView):
 
         Uses the APIDownloadMixin mixin class
         """
-        dataset = StockItemResource().export(queryset=queryset)
-
-        filedata = dataset.export(export_format)
+        stream = StockItemResource().export_stream(queryset, export_format)
 
         filename = 'Arius_StockItems_{date}.{fmt}'.format(
             date=datetime.now().strftime("%d-%b-%Y"),
             fmt=export_format
         )
 
-        return DownloadFile(filedata, filename)
+        return DownloadFileStream(stream, filename)
 
     def list(self, request, *args, **kwargs):
         """Override the 'list' method, as the StockLocation objects are very expensive to serialize.
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.19 on 2023-06-09 14:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('stock', '0102_alter_stockitem_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SerialNumberReservation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=50)),
+                ('serial', models.CharField(max_length=100)),
+                ('serial_int', models.IntegerField(default=0)),
+                ('key', models.CharField(db_index=True, max_length=36)),
+                ('expiry', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('scope', 'serial')},
+            },
+        ),
+    ]
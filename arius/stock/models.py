@@ -29,6 +29,7 @@ import arius.ready
 import arius.tasks
 import label.models
 import report.models
+import stock.serial_numbers as serial_numbers
 from company import models as CompanyModels
 from arius.fields import AriusModelMoneyField, AriusURLField
 from arius.models import (AriusAttachment, AriusBarcodeMixin,
@@ -37,7 +38,8 @@ from arius.models import (AriusAttachment, AriusBarcodeMixin,
 from arius.status_codes import (SalesOrderStatusGroups, StockHistoryCode,
                                 StockStatus, StockStatusGroups)
 from part import models as PartModels
-from plugin.events import trigger_event
+from plugin.base.event.events import allow_table_event
+from plugin.events import trigger_event, trigger_events
 from users.models import Owner
 
 
@@ -450,6 +452,9 @@ class StockItem(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, common.models
 
         notes = kwargs.pop('notes', '')
 
+        # Has a serial number been assigned (or removed)?
+        serial_changed = bool(self.serial)
+
         if self.pk:
             # StockItem has already been saved
 
@@ -459,6 +464,8 @@ class StockItem(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, common.models
             try:
                 old = StockItem.objects.get(pk=self.pk)
 
+                serial_changed = old.serial != self.serial or old.part_id != self.part_id
+
                 deltas = {}
 
                 # Status changed?
@@ -478,6 +485,9 @@ class StockItem(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, common.models
 
         super(StockItem, self).save(*args, **kwargs)
 
+        if serial_changed:
+            serial_numbers.invalidate_part(self.part)
+
         # If user information is provided, and no existing note exists, create one!
         if user and self.tracking_info.count() == 0:
 
@@ -1403,50 +1413,261 @@ class StockItem(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, common.models
             msg = _("Serial numbers already exist") + f": {exists}"
             raise ValidationError({"serial_numbers": msg})
 
-        # Create a new stock item for each unique serial number
-        for serial in serials:
+        self.create_serialized_items(serials, user, notes=notes, location=location)
+
+        # Remove the equivalent number of items
+        self.take_stock(quantity, user, notes=notes)
+
+    @transaction.atomic
+    def create_serialized_items(self, serials, user, notes='', location=None):
+        """Create a new (serialized) child stock item for each of the provided serial numbers.
+
+        This is performed in bulk, with a fixed number of database queries (regardless of the number of serials):
+
+        - Each new item is a copy of this item, with a quantity of 1
+        - The tracking history and test results of this item are copied to each new item
+        - The new items are inserted into the stock item tree as the last children of this item
+
+        Note: The serial numbers must already have been validated (see Part.find_conflicting_serial_numbers),
+        and the quantity of this item is *not* adjusted.
+
+        Args:
+            serials: List of serial numbers
+            user: User object associated with action
+            notes: Optional notes for tracking
+            location: If specified, serialized items will be placed in the given location
+
+        Returns:
+            list: Primary key values of the new stock items
+        """
+
+        serials = [str(serial).strip() for serial in serials]
+        n = len(serials)
+
+        if n == 0:
+            return []
+
+        values = self.get_child_values(exclude=['serial', 'serial_int'])
+
+        if location:
+            values['location_id'] = location.pk
+
+        items = []
+
+        for idx, serial in enumerate(serials):
+            item = StockItem(**values, quantity=1, serial=serial)
+
+            if idx == 0:
+                # Validate the new items (other than the serial numbers) once
+                item.clean()
+
+            item.update_serial_number()
+            items.append(item)
 
-            # Create a copy of this StockItem
-            new_item = StockItem.objects.get(pk=self.pk)
-            new_item.quantity = 1
-            new_item.serial = serial
-            new_item.pk = None
-            new_item.parent = self
+        new_ids = self.bulk_create_children(items)
+
+        serial_numbers.invalidate_part(self.part)
+
+        # Copy tracking history, and add tracking entries for the new items
+        history = list(self.tracking_info.all().order_by('pk'))
+        now = datetime.now()
+        tracking = []
+
+        for serial, pk in zip(serials, new_ids):
+            if user:
+                deltas = {'status': self.status, 'quantity': 1.0}
+
+                if location or self.location:
+                    deltas['location'] = (location or self.location).pk
+
+                tracking.append(StockItemTracking(
+                    item_id=pk, tracking_type=StockHistoryCode.CREATED.value, user=user, date=now, notes=notes, deltas=deltas,
+                ))
+
+            for entry in history:
+                tracking.append(StockItemTracking(
+                    item_id=pk, tracking_type=entry.tracking_type, user_id=entry.user_id, date=entry.date, notes=entry.notes, deltas=entry.deltas,
+                ))
+
+            deltas = {'serial': serial}
 
             if location:
-                new_item.location = location
+                deltas['location'] = location.pk
 
-            # The item already has a transaction history, don't create a new note
-            new_item.save(user=user, notes=notes)
+            tracking.append(StockItemTracking(
+                item_id=pk, tracking_type=StockHistoryCode.ASSIGNED_SERIAL.value, user=user, date=now, notes=notes, deltas=deltas,
+            ))
 
-            # Copy entire transaction history
-            new_item.copyHistoryFrom(self)
+        StockItemTracking.objects.bulk_create(tracking, batch_size=1000)
 
-            # Copy test result history
-            new_item.copyTestResultsFrom(self)
+        # Copy test results
+        results = list(self.test_results.all().order_by('pk'))
 
-            # Create a new stock tracking item
-            new_item.add_tracking_entry(
-                StockHistoryCode.ASSIGNED_SERIAL,
-                user,
-                notes=notes,
-                deltas={
-                    'serial': serial,
-                },
-                location=location
-            )
+        if results:
+            fields = [field.attname for field in StockItemTestResult._meta.concrete_fields if field.name not in ['id', 'stock_item']]
 
-        # Remove the equivalent number of items
-        self.take_stock(quantity, user, notes=notes)
+            StockItemTestResult.objects.bulk_create([
+                StockItemTestResult(stock_item_id=pk, **{field: getattr(result, field) for field in fields})
+                for pk in new_ids for result in results
+            ], batch_size=1000)
+
+        return new_ids
+
+    def get_child_values(self, exclude=None) -> dict:
+        """Return the field values of this item, to be copied to new child items.
+
+        Tree structure fields, quantity and barcode fields are not copied.
+
+        Args:
+            exclude: Names of additional fields which should not be copied
+        """
+
+        exclude = {'id', 'parent', 'lft', 'rght', 'tree_id', 'level', 'quantity', 'barcode_data', 'barcode_hash', *(exclude or [])}
+
+        item = StockItem.objects.get(pk=self.pk)
+
+        return {
+            field.attname: getattr(item, field.attname) for field in StockItem._meta.concrete_fields if field.name not in exclude
+        }
+
+    def bulk_create_children(self, items):
+        """Insert new stock items into the tree as the last children of this item, with bulk database operations.
+
+        - The tree fields of the provided (unsaved) items are assigned here
+        - A single 'created' event is triggered for all of the new items
+
+        Args:
+            items: List of unsaved StockItem objects
+
+        Returns:
+            list: Primary key values of the new stock items (in the same order as the provided items)
+        """
+
+        n = len(items)
+
+        if n == 0:
+            return []
+
+        # Refresh the tree information for this item
+        tree_id, level, rght = StockItem.objects.filter(pk=self.pk).values_list('tree_id', 'level', 'rght').get()
+
+        # Make room in the tree for the new items, inserted after any existing children
+        StockItem.objects._create_space(2 * n, rght - 1, tree_id)
+
+        for idx, item in enumerate(items):
+            item.parent_id = self.pk
+            item.tree_id = tree_id
+            item.level = level + 1
+            item.lft = rght + 2 * idx
+            item.rght = rght + 2 * idx + 1
+
+        StockItem.objects.bulk_create(items, batch_size=500)
+
+        # Primary key values are not returned by bulk_create for all database backends
+        item_ids = dict(StockItem.objects.filter(tree_id=tree_id, parent=self.pk, lft__gte=rght).values_list('lft', 'pk'))
+
+        for item in items:
+            item.pk = item_ids[item.lft]
+
+        new_ids = [item.pk for item in items]
+
+        # Trigger a single event for all of the new items
+        table = StockItem._meta.db_table
+
+        if allow_table_event(table):
+            transaction.on_commit(lambda: trigger_events([(f'{table}.created', {'ids': new_ids, 'model': 'StockItem'})]))
+
+        self.refresh_from_db(fields=['lft', 'rght'])
+
+        return new_ids
+
+    @transaction.atomic
+    def bulk_split_stock(self, quantities, user, notes='', values=None):
+        """Split multiple new stock items from this item, with bulk database operations.
+
+        This is equivalent to calling splitStock for each of the provided quantities in turn:
+
+        - Each new item is a copy of this item (in the same location) with the specified quantity
+        - Tracking entries are added to each new item, and to this item
+        - The test results of this item are copied to each new item
+        - The total quantity is subtracted from this item
+
+        Args:
+            quantities: List of quantities to split from this item
+            user: User object associated with action
+            notes: Optional notes for tracking
+            values: Optional list of field values (dict) to set for each of the new items
+
+        Returns:
+            list: The new StockItem objects
+        """
+
+        try:
+            quantities = [Decimal(quantity) for quantity in quantities]
+        except (InvalidOperation, ValueError):
+            raise ValidationError({'quantity': _('Invalid quantity value')})
+
+        if len(quantities) == 0:
+            return []
+
+        if self.serialized or any(quantity <= 0 for quantity in quantities) or sum(quantities) >= self.quantity:
+            raise ValidationError({'quantity': _('Quantity must not exceed available stock quantity ({n})').format(n=self.quantity)})
+
+        defaults = self.get_child_values()
+
+        items = [
+            StockItem(**{**defaults, **(values[idx] if values else {})}, quantity=quantity)
+            for idx, quantity in enumerate(quantities)
+        ]
+
+        self.bulk_create_children(items)
+
+        now = datetime.now()
+        tracking = []
+        remaining = self.quantity
+
+        for item, quantity in zip(items, quantities):
+            remaining -= quantity
+
+            tracking.append(StockItemTracking(
+                item_id=item.pk, tracking_type=StockHistoryCode.SPLIT_FROM_PARENT.value, user=user, date=now, notes=notes,
+                deltas={'stockitem': self.pk, 'quantity': float(quantity)},
+            ))
+
+            tracking.append(StockItemTracking(
+                item_id=self.pk, tracking_type=StockHistoryCode.SPLIT_CHILD_ITEM.value, user=user, date=now, notes=notes,
+                deltas={'removed': float(quantity), 'quantity': float(remaining), 'stockitem': item.pk},
+            ))
+
+        StockItemTracking.objects.bulk_create(tracking, batch_size=1000)
+
+        # Copy test results
+        results = list(self.test_results.all().order_by('pk'))
+
+        if results:
+            fields = [field.attname for field in StockItemTestResult._meta.concrete_fields if field.name not in ['id', 'stock_item']]
+
+            StockItemTestResult.objects.bulk_create([
+                StockItemTestResult(stock_item_id=item.pk, **{field: getattr(result, field) for field in fields})
+                for item in items for result in results
+            ], batch_size=1000)
+
+        # Remove the total quantity from this item
+        self.quantity = remaining
+        self.save()
+
+        return items
 
     @transaction.atomic
     def copyHistoryFrom(self, other):
         """Copy stock history from another StockItem."""
-        for item in other.tracking_info.all():
+        history = list(other.tracking_info.all())
 
+        for item in history:
             item.item = self
             item.pk = None
-            item.save()
+
+        StockItemTracking.objects.bulk_create(history)
 
     @transaction.atomic
     def copyTestResultsFrom(self, other, filters=None):
@@ -1455,12 +1676,14 @@ class StockItem(AriusBarcodeMixin, AriusNotesMixin, MetadataMixin, common.models
         if filters is None:
             filters = {}
 
-        for result in other.test_results.all().filter(**filters):
+        results = list(other.test_results.all().filter(**filters))
 
+        for result in results:
             # Create a copy of the test result by nulling-out the pk
             result.pk = None
             result.stock_item = self
-            result.save()
+
+        StockItemTestResult.objects.bulk_create(results)
 
     def can_merge(self, other=None, raise_error=False, **kwargs):
         """Check if this stock item can be merged into another stock item."""
@@ -2065,6 +2288,9 @@ def after_delete_stock_item(sender, instance: StockItem, **kwargs):
     """Function to be executed after a StockItem object is deleted."""
     from part import tasks as part_tasks
 
+    if instance.serial:
+        serial_numbers.invalidate_part(instance.part)
+
     if not arius.ready.isImportingData():
         # Run this check in the background
         arius.tasks.offload_task(part_tasks.notify_low_stock_if_required, instance.part)
@@ -2073,18 +2299,42 @@ def after_delete_stock_item(sender, instance: StockItem, **kwargs):
         if arius.ready.canAppAccessDatabase(allow_test=True):
             instance.part.schedule_pricing_update(create=False)
 
+        # Schedule an update of the stock summary for the part
+        PartModels.PartStockSummary.schedule_update([instance.part_id])
+
 
 @receiver(post_save, sender=StockItem, dispatch_uid='stock_item_post_save_log')
 def after_save_stock_item(sender, instance: StockItem, created, **kwargs):
     """Hook function to be executed after StockItem object is saved/updated."""
+    stock_items_updated([instance.part])
+
+
+def stock_items_updated(parts):
+    """Update the information for parts which have had stock items created or updated.
+
+    This is called whenever a StockItem is saved,
+    and must be called after stock items are created or updated with bulk database operations
+    (which do not send the post_save signal).
+
+    Arguments:
+        parts: Iterable of Part instances
+    """
     from part import tasks as part_tasks
 
-    if not arius.ready.isImportingData():
+    if arius.ready.isImportingData():
+        return
+
+    parts = list({part.pk: part for part in parts}.values())
+
+    for part in parts:
         # Run this check in the background
-        arius.tasks.offload_task(part_tasks.notify_low_stock_if_required, instance.part)
+        arius.tasks.offload_task(part_tasks.notify_low_stock_if_required, part)
 
         if arius.ready.canAppAccessDatabase(allow_test=True):
-            instance.part.schedule_pricing_update(create=True)
+            part.schedule_pricing_update(create=True)
+
+    # Schedule an update of the stock summary for the parts
+    PartModels.PartStockSummary.schedule_update([part.pk for part in parts])
 
 
 class StockItemAttachment(AriusAttachment):
@@ -2279,3 +2529,60 @@ class StockItemTestResult(MetadataMixin, models.Model):
         auto_now_add=True,
         editable=False
     )
+
+
+class SerialNumberReservation(models.Model):
+    """A SerialNumberReservation prevents a serial number from being allocated by another operation.
+
+    Serial numbers are reserved (e.g. while build outputs are being created),
+    so that concurrent operations do not attempt to assign the same serial numbers.
+    Each serial number can only be reserved once within a given scope (see stock.serial_numbers)
+
+    Attributes:
+        scope: The serial number scope e.g. 'tree_3' or 'global'
+        serial: The reserved serial number
+        serial_int: Integer representation of the serial number (for sorting)
+        key: Reservation key, shared by all serial numbers which were reserved together
+        user: The user who made the reservation
+        expiry: The reservation is ignored after this time
+    """
+
+    class Meta:
+        """Metaclass defines extra model properties"""
+
+        unique_together = [
+            ('scope', 'serial'),
+        ]
+
+    scope = models.CharField(
+        max_length=50,
+        blank=False,
+    )
+
+    serial = models.CharField(
+        max_length=100,
+        blank=False,
+    )
+
+    serial_int = models.IntegerField(default=0)
+
+    key = models.CharField(
+        max_length=36,
+        blank=False,
+        db_index=True,
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        blank=True, null=True,
+        related_name='+',
+    )
+
+    expiry = models.DateTimeField(
+        db_index=True,
+    )
+
+    def __str__(self):
+        """Render a string representation of this reservation"""
+        return f"{self.scope} : {self.serial}"
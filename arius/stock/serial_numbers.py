@@ -0,0 +1,506 @@
+"""Serial number allocation helpers for the stock app.
+
+Serial numbers must be unique within a serial number "scope":
+either a single part tree, or all parts (if the SERIAL_NUMBER_GLOBALLY_UNIQUE setting is enabled).
+
+The serial numbers which are in use within a scope are loaded into a process-local range index,
+so that "next serial number" and range checks do not require a database query for each serial number.
+
+- Integer serial numbers are stored as a sorted list of disjoint ranges, which are searched in O(log n) time
+- The index is invalidated whenever a serial number is assigned or removed within the scope
+- A shared version key (stored in the cache) is used to notify other processes of the change
+- An index which is loaded within a database transaction may contain uncommitted data,
+  and is only used within that transaction (until it is committed or rolled back)
+
+Serial numbers can also be reserved (e.g. while build outputs are being created),
+so that concurrent operations are not allocated the same serial numbers.
+Reservations are stored in the database, and each serial number can only be reserved once within a scope.
+
+Note: The index is used for *allocating* serial numbers only.
+The database remains the authority for serial number conflicts (see Part.find_conflicting_serial_numbers)
+"""
+
+import logging
+import re
+import threading
+import uuid
+from bisect import bisect_right
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+logger = logging.getLogger('arius')
+
+# Scope used when serial numbers are globally unique
+GLOBAL_SCOPE = 'global'
+
+# Cache key used to share the current index version (for each scope) between processes
+INDEX_VERSION_KEY = 'serial_index_version_{scope}'
+
+# Default duration (seconds) of a serial number reservation
+RESERVATION_TIMEOUT = 600
+
+# Number of attempts made to reserve automatically allocated serial numbers
+RESERVATION_ATTEMPTS = 3
+
+# Serial numbers which are treated as plain integers (no leading zeros)
+INTEGER_SERIAL = re.compile(r'0|[1-9][0-9]*')
+
+# Process-local serial number indexes, keyed by scope
+_indexes = {}
+
+# Serial number indexes loaded within a database transaction (for the current thread)
+_transaction_indexes = threading.local()
+
+
+def serial_to_int(serial):
+    """Return the integer value of a plain integer serial number (e.g. '123'), or None."""
+
+    serial = str(serial).strip()
+
+    if INTEGER_SERIAL.fullmatch(serial):
+        return int(serial)
+
+    return None
+
+
+class SerialIndex:
+    """Serial numbers which are in use within a single scope, captured at a point in time.
+
+    Attributes:
+        scope: The serial number scope
+        serials: Set of all serial numbers which are in use (including reserved serial numbers)
+        starts: Start values of the ranges of integer serial numbers which are in use (sorted)
+        ends: End values (inclusive) of the ranges of integer serial numbers which are in use
+        latest: The "latest" serial number within the scope (or None)
+        version: Version key of the serial number data
+        expires: Time at which the index must be reloaded (when the earliest reservation expires), or None
+    """
+
+    def __init__(self, scope, serials=None, latest=None, version=None, expires=None):
+        """Initialize the index."""
+        self.scope = scope
+        self.serials = set(str(serial).strip() for serial in (serials or []))
+        self.latest = latest
+        self.version = version
+        self.expires = expires
+
+        self.starts = []
+        self.ends = []
+
+        values = sorted(set(filter(lambda x: x is not None, map(serial_to_int, self.serials))))
+
+        # Merge consecutive values into ranges
+        for value in values:
+            if self.ends and self.ends[-1] == value - 1:
+                self.ends[-1] = value
+            else:
+                self.starts.append(value)
+                self.ends.append(value)
+
+    def __contains__(self, serial):
+        """Return True if the provided serial number is in use."""
+        return str(serial).strip() in self.serials
+
+    def _find(self, value: int):
+        """Return the index of the range which contains the provided value (or None)."""
+
+        idx = bisect_right(self.starts, value) - 1
+
+        if idx >= 0 and self.ends[idx] >= value:
+            return idx
+
+        return None
+
+    def is_used(self, value: int) -> bool:
+        """Return True if the provided integer serial number is in use."""
+        return self._find(value) is not None
+
+    @property
+    def max_value(self):
+        """Return the highest integer serial number which is in use (or None)."""
+        return self.ends[-1] if self.ends else None
+
+    def next_free(self, start: int = 1) -> int:
+        """Return the first integer serial number (at or after the provided value) which is not in use."""
+
+        idx = self._find(start)
+
+        return start if idx is None else self.ends[idx] + 1
+
+    def is_range_free(self, start: int, end: int) -> bool:
+        """Return True if no integer serial numbers within the (inclusive) range are in use."""
+
+        idx = bisect_right(self.starts, end) - 1
+
+        return idx < 0 or self.ends[idx] < start
+
+    def used_ranges(self, start: int, end: int) -> list:
+        """Return the (inclusive) ranges of integer serial numbers within the provided range which are in use."""
+
+        ranges = []
+        idx = bisect_right(self.starts, end) - 1
+
+        while idx >= 0 and self.ends[idx] >= start:
+            ranges.append((max(start, self.starts[idx]), min(end, self.ends[idx])))
+            idx -= 1
+
+        ranges.reverse()
+
+        return ranges
+
+    def gaps(self, start: int, end: int) -> list:
+        """Return the (inclusive) ranges of integer serial numbers within the provided range which are *not* in use."""
+
+        gaps = []
+        value = start
+
+        for a, b in self.used_ranges(start, end):
+            if a > value:
+                gaps.append((value, a - 1))
+
+            value = b + 1
+
+        if value <= end:
+            gaps.append((value, end))
+
+        return gaps
+
+    def allocate(self, quantity: int, start=None) -> list:
+        """Return the next available integer serial numbers.
+
+        Arguments:
+            quantity: Number of serial numbers to allocate
+            start: The first serial number to consider (default = one past the highest integer serial number in use)
+
+        Returns:
+            list: Serial numbers (as strings) which are not in use, in ascending order
+        """
+
+        if start is None:
+            start = (self.max_value or 0) + 1
+
+        serials = []
+        value = self.next_free(start)
+
+        while len(serials) < quantity:
+            serials.append(str(value))
+            value = self.next_free(value + 1)
+
+        return serials
+
+
+def get_scope(part) -> str:
+    """Return the serial number scope for the provided part."""
+
+    from common.models import AriusSetting
+
+    if AriusSetting.get_setting('SERIAL_NUMBER_GLOBALLY_UNIQUE', False):
+        return GLOBAL_SCOPE
+
+    return f'tree_{part.tree_id}'
+
+
+def get_index_version(scope):
+    """Return the shared index version key for the provided scope (or None if not available)."""
+
+    try:
+        return cache.get(INDEX_VERSION_KEY.format(scope=scope))
+    except Exception:  # pragma: no cover
+        return None
+
+
+def invalidate_index(*scopes):
+    """Invalidate the serial number index for the provided scope(s).
+
+    - The index for the current process is discarded immediately
+    - Other processes will reload their index the next time it is used
+    - If called within a transaction, the version is updated again once the transaction is committed
+    """
+
+    def update_version():
+        try:
+            cache.set_many({INDEX_VERSION_KEY.format(scope=scope): uuid.uuid4().hex for scope in scopes}, None)
+        except Exception:  # pragma: no cover
+            pass
+
+    entries = get_transaction_indexes()
+
+    for scope in scopes:
+        _indexes.pop(scope, None)
+        entries.pop(scope, None)
+
+    update_version()
+
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(update_version)
+
+
+def invalidate_part(part):
+    """Invalidate any serial number index which contains serial numbers for the provided part."""
+    invalidate_index(f'tree_{part.tree_id}', GLOBAL_SCOPE)
+
+
+def get_transaction_indexes() -> dict:
+    """Return the indexes which have been loaded within a database transaction (for the current thread), keyed by scope."""
+
+    if not hasattr(_transaction_indexes, 'entries'):
+        _transaction_indexes.entries = {}
+
+    return _transaction_indexes.entries
+
+
+def get_transaction_index(scope):
+    """Return the index which was loaded for the provided scope within the current transaction (or None).
+
+    When an index is stored, an on_commit callback is registered against the current transaction.
+    Django discards the callbacks of any savepoint which is rolled back,
+    so the index is only returned while its callback is still pending.
+    """
+
+    entries = get_transaction_indexes()
+    entry = entries.get(scope, None)
+
+    if entry is None:
+        return None
+
+    index, marker = entry
+
+    if any(callback[1] is marker for callback in transaction.get_connection().run_on_commit):
+        return index
+
+    # The transaction (or savepoint) in which the index was loaded has been rolled back
+    entries.pop(scope, None)
+
+    return None
+
+
+def set_transaction_index(index):
+    """Store an index which has been loaded within the current transaction."""
+
+    entries = get_transaction_indexes()
+
+    def marker():
+        # The transaction has been committed, the index is no longer required
+        if entries.get(index.scope, (None, None))[1] is marker:
+            entries.pop(index.scope, None)
+
+    entries[index.scope] = (index, marker)
+
+    transaction.on_commit(marker)
+
+
+def load_index(part, scope, version=None) -> SerialIndex:
+    """Load the serial numbers which are in use (or reserved) within the scope of the provided part."""
+
+    from stock.models import SerialNumberReservation
+
+    serials = []
+    latest = None
+
+    for serial, serial_int, pk in part.get_serialized_stock().values_list('serial', 'serial_int', 'pk'):
+        serials.append(serial)
+
+        if latest is None or (serial_int, serial, pk) > latest:
+            latest = (serial_int, serial, pk)
+
+    reservations = SerialNumberReservation.objects.filter(scope=scope, expiry__gt=timezone.now())
+
+    expires = None
+
+    for serial, serial_int, expiry in reservations.values_list('serial', 'serial_int', 'expiry'):
+        serials.append(serial)
+
+        if latest is None or (serial_int, serial, 0) > latest:
+            latest = (serial_int, serial, 0)
+
+        if expires is None or expiry < expires:
+            expires = expiry
+
+    return SerialIndex(
+        scope,
+        serials,
+        latest=latest[1] if latest else None,
+        version=version,
+        expires=expires,
+    )
+
+
+def get_index(part) -> SerialIndex:
+    """Return the serial number index for the scope of the provided part, reloading it if it is out of date."""
+
+    scope = get_scope(part)
+    in_transaction = transaction.get_connection().in_atomic_block
+
+    index = get_transaction_index(scope) if in_transaction else _indexes.get(scope, None)
+
+    version = get_index_version(scope)
+
+    if version is None:
+        # No version information available (e.g. the cache has been cleared)
+        try:
+            cache.add(INDEX_VERSION_KEY.format(scope=scope), uuid.uuid4().hex, None)
+        except Exception:  # pragma: no cover
+            pass
+
+        version = get_index_version(scope)
+
+    if index is not None and version is not None and version == index.version:
+        if index.expires is None or index.expires > timezone.now():
+            return index
+
+    index = load_index(part, scope, version=version)
+
+    # An index loaded within a transaction may contain uncommitted data, and is not shared
+    if in_transaction:
+        set_transaction_index(index)
+    else:
+        _indexes[scope] = index
+
+    return index
+
+
+def get_reserved_serial_numbers(part, serials, exclude_key=None) -> set:
+    """Return the provided serial numbers which are currently reserved within the scope of the provided part.
+
+    Arguments:
+        part: The Part instance
+        serials: Serial numbers to check
+        exclude_key: Ignore any serial numbers reserved against this reservation key
+    """
+
+    from stock.models import SerialNumberReservation
+
+    reservations = SerialNumberReservation.objects.filter(
+        scope=get_scope(part),
+        serial__in=[str(serial).strip() for serial in serials],
+        expiry__gt=timezone.now(),
+    )
+
+    if exclude_key:
+        reservations = reservations.exclude(key=exclude_key)
+
+    return set(reservations.values_list('serial', flat=True))
+
+
+def reserve_serial_numbers(part, serials=None, quantity=None, user=None, key=None, timeout=None):
+    """Reserve serial numbers for the provided part.
+
+    Either a list of serial numbers, or a quantity of serial numbers to allocate, must be provided.
+    Any reservations which already exist for the provided key are extended.
+
+    Arguments:
+        part: The Part instance
+        serials: List of serial numbers to reserve
+        quantity: Number of (integer) serial numbers to allocate, if serial numbers are not provided
+        user: The user making the reservation (optional)
+        key: Reservation key (optional, a new key is generated if not provided)
+        timeout: Duration of the reservation in seconds (default = RESERVATION_TIMEOUT)
+
+    Returns:
+        tuple: (key, serials) - The reservation key, and the list of reserved serial numbers
+
+    Raises:
+        ValidationError: If any of the serial numbers are already in use (or reserved)
+    """
+
+    from stock.models import SerialNumberReservation, StockItem
+
+    if serials is None and quantity is None:
+        raise ValueError("Either 'serials' or 'quantity' must be provided")
+
+    scope = get_scope(part)
+    key = key or uuid.uuid4().hex
+    now = timezone.now()
+    expiry = now + timedelta(seconds=timeout or RESERVATION_TIMEOUT)
+
+    # Remove any expired reservations within this scope
+    SerialNumberReservation.objects.filter(scope=scope, expiry__lte=now).delete()
+
+    for attempt in range(RESERVATION_ATTEMPTS):
+
+        if serials is None:
+            values = get_index(part).allocate(int(quantity))
+        else:
+            values = [str(serial).strip() for serial in serials]
+
+        conflicts = part.find_conflicting_serial_numbers(values, reservation=key)
+
+        if conflicts:
+            raise ValidationError(
+                _("The following serial numbers already exist or are invalid") + " : " + ",".join(conflicts)
+            )
+
+        existing = SerialNumberReservation.objects.filter(scope=scope, key=key, serial__in=values)
+
+        try:
+            with transaction.atomic():
+                existing.update(expiry=expiry)
+                existing_serials = set(existing.values_list('serial', flat=True))
+
+                reservations = []
+
+                for serial in values:
+                    if serial in existing_serials:
+                        continue
+
+                    # Calculate the integer representation of the serial number (as per StockItem)
+                    item = StockItem(serial=serial)
+                    item.update_serial_number()
+
+                    reservations.append(SerialNumberReservation(
+                        scope=scope, serial=serial, serial_int=item.serial_int, key=key, user=user, expiry=expiry,
+                    ))
+
+                SerialNumberReservation.objects.bulk_create(reservations)
+
+        except IntegrityError:
+            # Serial number(s) were reserved by another process in the meantime
+            invalidate_index(scope)
+
+            if serials is None:
+                continue
+
+            raise ValidationError(
+                _("The following serial numbers are reserved") + " : " + ",".join(
+                    sorted(get_reserved_serial_numbers(part, values, exclude_key=key))
+                )
+            )
+
+        invalidate_index(scope)
+
+        return key, values
+
+    raise ValidationError(_("Could not reserve serial numbers"))
+
+
+def release_serial_numbers(key, serials=None):
+    """Release serial numbers which are reserved against the provided reservation key.
+
+    Arguments:
+        key: The reservation key
+        serials: Only release the provided serial numbers (default = release all serial numbers)
+
+    Returns:
+        int: The number of serial numbers which were released
+    """
+
+    from stock.models import SerialNumberReservation
+
+    reservations = SerialNumberReservation.objects.filter(key=key)
+
+    if serials is not None:
+        reservations = reservations.filter(serial__in=[str(serial).strip() for serial in serials])
+
+    scopes = set(reservations.values_list('scope', flat=True))
+
+    n, _deleted = reservations.delete()
+
+    if scopes:
+        invalidate_index(*scopes)
+
+    return n
@@ -26,6 +26,7 @@ from arius.models import extract_int
 from arius.serializers import (AriusCurrencySerializer,
                                AriusDecimalField)
 from part.serializers import PartBriefSerializer
+from plugin.events import bulk_events
 
 from .models import (StockItem, StockItemAttachment, StockItemTestResult,
                      StockItemTracking, StockLocation)
@@ -1211,7 +1212,7 @@ class StockCountSerializer(StockAdjustmentSerializer):
         items = data['items']
         notes = data.get('notes', '')
 
-        with transaction.atomic():
+        with bulk_events(), transaction.atomic():
             for item in items:
 
                 stock_item = item['pk']
@@ -1234,7 +1235,7 @@ class StockAddSerializer(StockAdjustmentSerializer):
         data = self.validated_data
         notes = data.get('notes', '')
 
-        with transaction.atomic():
+        with bulk_events(), transaction.atomic():
             for item in data['items']:
 
                 stock_item = item['pk']
@@ -1257,7 +1258,7 @@ class StockRemoveSerializer(StockAdjustmentSerializer):
         data = self.validated_data
         notes = data.get('notes', '')
 
-        with transaction.atomic():
+        with bulk_events(), transaction.atomic():
             for item in data['items']:
 
                 stock_item = item['pk']
@@ -1301,7 +1302,7 @@ class StockTransferSerializer(StockAdjustmentSerializer):
         notes = data.get('notes', '')
         location = data['location']
 
-        with transaction.atomic():
+        with bulk_events(), transaction.atomic():
             for item in items:
 
                 stock_item = item['pk']
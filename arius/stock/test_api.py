@@ -557,6 +557,48 @@ class StockItemListTest(StockAPITestCase):
 
         self.assertEqual(len(dataset), 17)
 
+        # Export to XLSX format (streamed from a write-only workbook)
+        response = self.client.get(self.list_url, data={'export': 'xlsx'})
+        self.assertEqual(response.status_code, 200)
+
+        dataset = tablib.Dataset().load(io.BytesIO(response.getvalue()), 'xlsx', headers=True)
+        self.assertEqual(len(dataset), StockItem.objects.count())
+        self.assertIn('Part ID', dataset.headers)
+
+    def test_export_background(self):
+        """Test exporting of Stock data via a background export job."""
+        from common.models import DataExportJob
+
+        # Background worker is not running, so the export job is processed immediately
+        response = self.get(
+            self.list_url,
+            {'export': 'csv', 'background': True, 'location': 1},
+            expected_code=202
+        )
+
+        job = DataExportJob.objects.get(pk=response.data['pk'])
+
+        self.assertTrue(job.complete)
+        self.assertEqual(job.error, '')
+        self.assertEqual(job.user, self.user)
+        self.assertEqual(job.params, {'location': ['1']})
+        self.assertEqual(job.total, 9)
+        self.assertEqual(job.progress, 9)
+        self.assertTrue(job.output.name.endswith('.csv'))
+
+        with job.output.open('r') as f:
+            dataset = tablib.Dataset().load(f.read(), 'csv', headers=True)
+
+        self.assertEqual(len(dataset), 9)
+
+        # Check the job detail endpoint
+        response = self.get(reverse('api-data-export-detail', kwargs={'pk': job.pk}))
+        self.assertTrue(response.data['complete'])
+        self.assertIsNotNone(response.data['output'])
+
+        response = self.get(reverse('api-data-export-list'))
+        self.assertEqual(len(response.data), 1)
+
     def test_query_count(self):
         """Test that the number of queries required to fetch stock items is reasonable."""
 
@@ -3,8 +3,10 @@
 import datetime
 
 from django.core.exceptions import ValidationError
+from django.db import connection, transaction
 from django.db.models import Sum
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 
 from build.models import Build
 from common.models import AriusSetting
@@ -750,6 +752,135 @@ class StockTest(StockTestBase):
         # Serialize the remainder of the stock
         item.serializeStock(2, [99, 100], self.user)
 
+    def test_serialize_stock_bulk(self):
+        """Test serialization of a large quantity of stock."""
+        item = StockItem.objects.get(pk=100)
+        item.quantity = 250
+        item.save()
+
+        AriusSetting.set_setting('SERIAL_NUMBER_GLOBALLY_UNIQUE', False, None)
+
+        StockItemTestResult.objects.create(stock_item=item, test='bulk test', result=True)
+
+        n_history = item.tracking_info.count()
+        n_children = item.get_descendant_count()
+
+        # Repeated serial numbers are rejected
+        with self.assertRaises(ValidationError):
+            item.serializeStock(3, [5000, 5001, 5000], self.user)
+
+        self.assertEqual(item.part.find_conflicting_serial_numbers([5000, '5001', 5000]), [5000, 5000])
+
+        # Note: the fixture data already contains serial numbers (up to 1000) for this part
+        serials = [str(x) for x in range(5000, 5200)]
+
+        # The number of queries does not depend on the number of serial numbers
+        with CaptureQueriesContext(connection) as queries:
+            item.serializeStock(200, serials, self.user, notes='bulk')
+
+        self.assertLess(len(queries), 100)
+
+        item.refresh_from_db()
+        self.assertEqual(item.quantity, 50)
+
+        children = StockItem.objects.filter(parent=item, serial__in=serials)
+        self.assertEqual(children.count(), 200)
+        self.assertEqual(children.filter(quantity=1, serial_int__gte=5000).count(), 200)
+
+        # All serial numbers are now in use
+        self.assertEqual(len(item.part.find_conflicting_serial_numbers(serials)), 200)
+
+        child = children.get(serial='5100')
+
+        # Created entry + copied history + serial assignment entry
+        self.assertEqual(child.tracking_info.count(), n_history + 2)
+        self.assertTrue(child.tracking_info.filter(tracking_type=StockHistoryCode.ASSIGNED_SERIAL.value).exists())
+        self.assertTrue(child.test_results.filter(test='bulk test').exists())
+
+        # The stock item tree is consistent
+        self.assertEqual(item.get_descendant_count(), n_children + 200)
+        self.assertEqual(child.get_ancestors().last(), item)
+        self.assertTrue(item.is_ancestor_of(child))
+
+        StockItem.objects.partial_rebuild(item.tree_id)
+
+        item.refresh_from_db()
+        self.assertEqual(item.get_descendant_count(), n_children + 200)
+
+    def test_serial_number_index(self):
+        """Test the serial number range index, and serial number reservations."""
+        from stock import serial_numbers
+
+        index = serial_numbers.SerialIndex('test', ['1', '2', '3', '5', '007', 'A10', '10', '11'])
+
+        self.assertEqual(index.starts, [1, 5, 10])
+        self.assertEqual(index.ends, [3, 5, 11])
+        self.assertIn('007', index)
+        self.assertFalse(index.is_used(7))
+
+        self.assertEqual(index.next_free(1), 4)
+        self.assertEqual(index.next_free(6), 6)
+        self.assertEqual(index.next_free(10), 12)
+
+        self.assertTrue(index.is_range_free(6, 9))
+        self.assertFalse(index.is_range_free(4, 5))
+        self.assertEqual(index.used_ranges(2, 10), [(2, 3), (5, 5), (10, 10)])
+        self.assertEqual(index.gaps(1, 15), [(4, 4), (6, 9), (12, 15)])
+
+        self.assertEqual(index.allocate(3), ['12', '13', '14'])
+        self.assertEqual(index.allocate(3, start=3), ['4', '6', '7'])
+
+        AriusSetting.set_setting('SERIAL_NUMBER_GLOBALLY_UNIQUE', False, None)
+
+        item = StockItem.objects.get(pk=100)
+        part = item.part
+
+        n = part.get_serialized_stock().count()
+
+        # Creating a serialized item invalidates the index
+        StockItem.objects.create(part=part, quantity=1, serial='50000')
+        self.assertEqual(part.get_latest_serial_number(), '50000')
+        self.assertEqual(part.get_next_serial_numbers(2), ['50001', '50002'])
+        self.assertEqual(len(serial_numbers.get_index(part).serials), n + 1)
+
+        # Within a transaction, the index is re-used until it is invalidated
+        index = serial_numbers.get_index(part)
+        self.assertIs(serial_numbers.get_index(part), index)
+
+        # An index loaded within a savepoint is discarded when the savepoint is rolled back
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                StockItem.objects.create(part=part, quantity=1, serial='60000')
+                self.assertEqual(part.get_latest_serial_number(), '60000')
+                raise ValueError
+
+        self.assertEqual(part.get_latest_serial_number(), '50000')
+
+        # Reserve the next available serial numbers
+        key, serials = serial_numbers.reserve_serial_numbers(part, quantity=3, user=self.user)
+        self.assertEqual(serials, ['50001', '50002', '50003'])
+        self.assertEqual(part.get_latest_serial_number(), '50003')
+
+        # Reserved serial numbers conflict with any other operation
+        self.assertEqual(part.find_conflicting_serial_numbers(['50002', '50004']), ['50002'])
+        self.assertEqual(part.find_conflicting_serial_numbers(['50002', '50004'], reservation=key), [])
+
+        with self.assertRaises(ValidationError):
+            serial_numbers.reserve_serial_numbers(part, serials=['50003', '50004'])
+
+        # The next allocation skips over the reserved serial numbers
+        other, serials = serial_numbers.reserve_serial_numbers(part, quantity=1)
+        self.assertEqual(serials, ['50004'])
+
+        # The reservation can be extended with the same key
+        serial_numbers.reserve_serial_numbers(part, serials=['50003', '50010'], key=key)
+
+        self.assertEqual(serial_numbers.release_serial_numbers(key), 4)
+        self.assertEqual(serial_numbers.release_serial_numbers(other), 1)
+
+        self.assertEqual(part.get_latest_serial_number(), '50000')
+        self.assertEqual(part.find_conflicting_serial_numbers(['50002', '50004']), [])
+
     def test_location_tree(self):
         """Unit tests for stock location tree structure (MPTT).
 
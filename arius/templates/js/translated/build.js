@@ -1887,6 +1887,7 @@ function autoAllocateStockToBuild(build_id, bom_items=[], options={}) {
         optional_items: {
             value: false,
         },
+        strategy: {},
     };
 
     constructForm(`{% url "api-build-list" %}${build_id}/auto-allocate/`, {
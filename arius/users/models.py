@@ -1,6 +1,8 @@
 """Database model definitions for the 'users' app"""
 
 import logging
+import time
+import uuid
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group, Permission
@@ -9,7 +11,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
 from django.db import models
 from django.db.models import Q, UniqueConstraint
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.db.utils import IntegrityError
 from django.dispatch import receiver
 from django.urls import reverse
@@ -91,6 +93,7 @@ class RuleSet(models.Model):
         'part': [
             'part_part',
             'part_partpricing',
+            'part_partstocksummary',
             'part_bomitem',
             'part_bomitemsubstitute',
             'part_partattachment',
@@ -121,6 +124,7 @@ class RuleSet(models.Model):
             'stock_stockitemattachment',
             'stock_stockitemtracking',
             'stock_stockitemtestresult',
+            'stock_serialnumberreservation',
             'report_testreport',
             'label_stockitemlabel',
         ],
@@ -191,11 +195,15 @@ class RuleSet(models.Model):
         'common_ariususersetting',
         'common_notificationentry',
         'common_notificationmessage',
+        'common_notificationdigestentry',
         'common_notesimage',
+        'common_barcodeindex',
+        'common_dataexportjob',
         'common_projectcode',
         'common_webhookendpoint',
         'common_webhookmessage',
         'users_owner',
+        'report_reportjob',
 
         # Third-party tables
         'error_report_error',
@@ -512,6 +520,52 @@ def update_group_roles(group, debug=False):
                         logger.debug(f"Adding permission {child_perm} to group {group.name}")
 
 
+# Cache key for the current version of the compiled user roles
+USER_ROLES_VERSION_KEY = 'user_roles_version'
+
+# The shared roles version is checked at most once every USER_ROLES_CHECK_INTERVAL seconds
+USER_ROLES_CHECK_INTERVAL = 1
+
+# Process-local copy of the roles version, as a (version, timestamp) tuple
+_user_roles_version = {}
+
+
+def get_user_roles_version():
+    """Return the current version of the compiled user roles.
+
+    The version is changed whenever any role information is updated (see invalidate_user_roles).
+    The shared version (stored in the cache) is checked at most once every USER_ROLES_CHECK_INTERVAL seconds.
+    """
+
+    now = time.monotonic()
+    state = _user_roles_version.get(USER_ROLES_VERSION_KEY, None)
+
+    if state is not None and now - state[1] < USER_ROLES_CHECK_INTERVAL:
+        return state[0]
+
+    version = cache.get(USER_ROLES_VERSION_KEY)
+
+    if version is None:
+        cache.add(USER_ROLES_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(USER_ROLES_VERSION_KEY)
+
+    _user_roles_version[USER_ROLES_VERSION_KEY] = (version, now)
+
+    return version
+
+
+def invalidate_user_roles():
+    """Invalidate the compiled roles for *all* users.
+
+    - This function is called whenever a group, or group membership, is updated
+    """
+
+    version = uuid.uuid4().hex
+
+    cache.set(USER_ROLES_VERSION_KEY, version, None)
+    _user_roles_version[USER_ROLES_VERSION_KEY] = (version, time.monotonic())
+
+
 def clear_user_role_cache(user):
     """Remove user role permission information from the cache.
 
@@ -521,76 +575,79 @@ def clear_user_role_cache(user):
         user: The User object to be expunged from the cache
     """
 
-    for role in RuleSet.RULESET_MODELS.keys():
-        for perm in ['add', 'change', 'view', 'delete']:
-            key = f"role_{user}_{role}_{perm}"
-            cache.delete(key)
+    cache.delete(f"user_roles_{get_user_roles_version()}_{user.pk}")
 
+    if hasattr(user, '_user_roles'):
+        del user._user_roles
 
-def get_user_roles(user):
-    """Return all roles available to a given user"""
+
+def compile_user_roles(user):
+    """Compile the complete set of roles available to a given user, using a single query.
+
+    Returns:
+        frozenset: Set of 'role.permission' strings, e.g. {'part.view', 'part.add'}
+    """
 
     roles = set()
 
-    for group in user.groups.all():
-        for rule in group.rule_sets.all():
-            name = rule.name
-            if rule.can_view:
-                roles.add(f'{name}.view')
-            if rule.can_add:
-                roles.add(f'{name}.add')
-            if rule.can_change:
-                roles.add(f'{name}.change')
-            if rule.can_delete:
-                roles.add(f'{name}.delete')
+    rulesets = RuleSet.objects.filter(group__user=user).values_list(
+        'name', 'can_view', 'can_add', 'can_change', 'can_delete'
+    )
 
-    return roles
+    for name, can_view, can_add, can_change, can_delete in rulesets:
+        if can_view:
+            roles.add(f'{name}.view')
+        if can_add:
+            roles.add(f'{name}.add')
+        if can_change:
+            roles.add(f'{name}.change')
+        if can_delete:
+            roles.add(f'{name}.delete')
 
+    return frozenset(roles)
 
-def check_user_role(user, role, permission):
-    """Check if a user has a particular role:permission combination.
 
-    If the user is a superuser, this will return True
+def get_user_roles(user):
+    """Return all roles available to a given user.
+
+    The compiled roles are cached (under a single key for each user),
+    and also stored against the User instance (so they are only loaded once per request).
+
+    Returns:
+        frozenset: Set of 'role.permission' strings
     """
-    if user.is_superuser:
-        return True
 
-    # First, check the cache
-    key = f"role_{user}_{role}_{permission}"
+    if user is None or not user.pk:
+        return frozenset()
 
-    result = cache.get(key)
+    version = get_user_roles_version()
 
-    if result is not None:
-        return result
+    # Roles already loaded for this User instance
+    if (compiled := getattr(user, '_user_roles', None)) and compiled[0] == version:
+        return compiled[1]
 
-    # Default for no match
-    result = False
+    key = f"user_roles_{version}_{user.pk}"
 
-    for group in user.groups.all():
+    roles = cache.get(key)
 
-        for rule in group.rule_sets.all():
+    if roles is None:
+        roles = compile_user_roles(user)
+        cache.set(key, roles, timeout=3600)
 
-            if rule.name == role:
+    user._user_roles = (version, roles)
 
-                if permission == 'add' and rule.can_add:
-                    result = True
-                    break
+    return roles
 
-                if permission == 'change' and rule.can_change:
-                    result = True
-                    break
 
-                if permission == 'view' and rule.can_view:
-                    result = True
-                    break
+def check_user_role(user, role, permission):
+    """Check if a user has a particular role:permission combination.
 
-                if permission == 'delete' and rule.can_delete:
-                    result = True
-                    break
+    If the user is a superuser, this will return True
+    """
+    if user.is_superuser:
+        return True
 
-    # Save result to cache
-    cache.set(key, result, timeout=3600)
-    return result
+    return f'{role}.{permission}' in get_user_roles(user)
 
 
 class Owner(models.Model):
@@ -754,6 +811,21 @@ def clear_user_cache(sender, instance, **kwargs):
     clear_user_role_cache(instance)
 
 
+@receiver(post_delete, sender=Group, dispatch_uid='group_deleted_clear_roles')
+def group_deleted(sender, instance, **kwargs):
+    """Callback function when a group is deleted (group membership is removed)"""
+
+    invalidate_user_roles()
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through, dispatch_uid='user_groups_changed')
+def user_groups_changed(sender, instance, action, **kwargs):
+    """Callback function when group membership is changed (from either the user or the group side)"""
+
+    if action in ['post_add', 'post_remove', 'post_clear']:
+        invalidate_user_roles()
+
+
 @receiver(post_save, sender=Group, dispatch_uid='create_missing_rule_sets')
 def create_missing_rule_sets(sender, instance, **kwargs):
     """Called *after* a Group object is saved.
@@ -762,5 +834,5 @@ def create_missing_rule_sets(sender, instance, **kwargs):
     """
     update_group_roles(instance)
 
-    for user in get_user_model().objects.filter(groups__name=instance.name):
-        clear_user_role_cache(user)
+    # Role information for every member of this group must be recompiled
+    invalidate_user_roles()
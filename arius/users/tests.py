@@ -1,6 +1,7 @@
 """Unit tests for the 'users' app"""
 
 from django.apps import apps
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.test import TestCase
 from django.urls import reverse
@@ -8,7 +9,7 @@ from django.urls import reverse
 from rest_framework.authtoken.models import Token
 
 from arius.unit_test import AriusTestCase
-from users.models import Owner, RuleSet
+from users.models import Owner, RuleSet, check_user_role, get_user_roles
 
 
 class RuleSetModelTest(TestCase):
@@ -154,6 +155,44 @@ class RuleSetModelTest(TestCase):
         self.assertEqual(group.permissions.count(), 0)
 
 
+class UserRoleTest(AriusTestCase):
+    """Unit tests for the compiled user roles"""
+
+    def test_user_roles(self):
+        """Test that user roles are compiled once, and updated when rules change"""
+
+        user = get_user_model().objects.get(pk=self.user.pk)
+
+        with self.assertNumQueries(1):
+            roles = get_user_roles(user)
+
+            for role in RuleSet.RULESET_NAMES:
+                for perm in RuleSet.RULESET_PERMISSIONS:
+                    self.assertEqual(check_user_role(user, role, perm), f'{role}.{perm}' in roles)
+
+            self.assertTrue(RuleSet.check_table_permission(user, 'part_part', 'view'))
+            self.assertFalse(RuleSet.check_table_permission(user, 'part_part', 'delete'))
+
+        # Compiled roles are also shared between User instances
+        other = get_user_model().objects.get(pk=self.user.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_roles(other), roles)
+
+        # Updating a rule invalidates the compiled roles
+        self.assignRole('part.delete')
+        self.assertTrue(check_user_role(user, 'part', 'delete'))
+        self.assertTrue(RuleSet.check_table_permission(user, 'part_part', 'delete'))
+
+        # Removing group membership invalidates the compiled roles
+        user.groups.clear()
+        self.assertFalse(check_user_role(user, 'part', 'view'))
+
+        # Adding group membership (from the group side) invalidates the compiled roles
+        self.group.user_set.add(user)
+        self.assertTrue(check_user_role(user, 'part', 'view'))
+
+
 class OwnerModelTest(AriusTestCase):
     """Some simplistic tests to ensure the Owner model is setup correctly."""
 